@@ -6,18 +6,25 @@ import os
 import structlog
 import uuid
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any, Optional, List
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
-import json
+import orjson
 import httpx
 
 # --- Configuration ---
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Connection pool bounds, shared by all agents calling the gateway
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
 
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set in the environment variables.")
@@ -123,8 +130,8 @@ class ResponseValidator:
         """Validates response from create_procurement"""
         if isinstance(result, str):
             try:
-                result = json.loads(result)
-            except json.JSONDecodeError:
+                result = orjson.loads(result)
+            except orjson.JSONDecodeError:
                 raise RPCError(ErrorCodes.INTERNAL_ERROR, "Invalid JSON response from database")
         
         if not isinstance(result, dict):
@@ -147,8 +154,8 @@ class ResponseValidator:
         """Validates response from search functions"""
         if isinstance(result, str):
             try:
-                result = json.loads(result)
-            except json.JSONDecodeError:
+                result = orjson.loads(result)
+            except orjson.JSONDecodeError:
                 raise RPCError(ErrorCodes.INTERNAL_ERROR, "Invalid JSON response from database")
         
         if not isinstance(result, list):
@@ -161,8 +168,8 @@ class ResponseValidator:
         """Validates response from status update"""
         if isinstance(result, str):
             try:
-                result = json.loads(result)
-            except json.JSONDecodeError:
+                result = orjson.loads(result)
+            except orjson.JSONDecodeError:
                 raise RPCError(ErrorCodes.INTERNAL_ERROR, "Invalid JSON response from database")
         
         return result
@@ -172,8 +179,8 @@ class ResponseValidator:
         """Validates response from save_protocol"""
         if isinstance(result, str):
             try:
-                result = json.loads(result)
-            except json.JSONDecodeError:
+                result = orjson.loads(result)
+            except orjson.JSONDecodeError:
                 raise RPCError(ErrorCodes.INTERNAL_ERROR, "Invalid JSON response from database")
         
         if result.get("status") == "success":
@@ -225,6 +232,7 @@ class SecurityValidator:
 # --- Database and App State ---
 class AppState:
     db_pool: Optional[asyncpg.Pool] = None
+    http_client: Optional[httpx.AsyncClient] = None
     service_catalog: Dict[str, Any] = {}
     acl_config: Dict[str, Any] = {}
     rate_limiter: RateLimiter = RateLimiter()
@@ -238,28 +246,9 @@ async def load_service_catalog(pool: asyncpg.Pool) -> Dict[str, Any]:
     """Loads service catalog from database with English method names."""
     try:
         async with pool.acquire() as conn:
-            # Check if table exists
-            table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'gateway_service_catalog'
-                );
-            """)
-            
-            if not table_exists:
-                logger.info("Service catalog table not found, using default configuration")
-                return get_default_service_catalog()
-            
-            # Check if function_metadata column exists
-            metadata_column_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.columns 
-                    WHERE table_name = 'gateway_service_catalog' 
-                    AND column_name = 'function_metadata'
-                );
-            """)
-            
-            if metadata_column_exists:
+            # The query itself tells us whether the table/column exists;
+            # no separate information_schema probes needed.
+            try:
                 # New structure with metadata
                 rows = await conn.fetch("""
                     SELECT service_name, service_type, function_key, 
@@ -267,13 +256,18 @@ async def load_service_catalog(pool: asyncpg.Pool) -> Dict[str, Any]:
                     FROM gateway_service_catalog
                     WHERE is_active = true
                 """)
-            else:
+                metadata_column_exists = True
+            except asyncpg.UndefinedTableError:
+                logger.info("Service catalog table not found, using default configuration")
+                return get_default_service_catalog()
+            except asyncpg.UndefinedColumnError:
                 # Old structure without metadata
                 rows = await conn.fetch("""
                     SELECT service_name, service_type, function_key, sql_function_name
                     FROM gateway_service_catalog
                     WHERE is_active = true
                 """)
+                metadata_column_exists = False
             
             catalog = {}
             for row in rows:
@@ -292,8 +286,8 @@ async def load_service_catalog(pool: asyncpg.Pool) -> Dict[str, Any]:
                     # If metadata is a string, parse it as JSON
                     if isinstance(raw_metadata, str):
                         try:
-                            metadata = json.loads(raw_metadata)
-                        except json.JSONDecodeError:
+                            metadata = orjson.loads(raw_metadata)
+                        except orjson.JSONDecodeError:
                             logger.warning(f"Invalid JSON in metadata for {service_name}.{row['function_key']}")
                             metadata = {}
                     # If metadata is already dict/JSONB
@@ -405,15 +399,13 @@ async def load_acl_config(pool: asyncpg.Pool) -> Dict[str, Any]:
     """Loads ACL configuration from database with English method names."""
     try:
         async with pool.acquire() as conn:
-            # Check if table exists
-            table_exists = await conn.fetchval("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'gateway_acl_config'
-                );
-            """)
-            
-            if not table_exists:
+            try:
+                rows = await conn.fetch("""
+                    SELECT agent_id, allowed_method
+                    FROM gateway_acl_config
+                    WHERE is_active = true
+                """)
+            except asyncpg.UndefinedTableError:
                 logger.info("ACL config table not found, using default configuration")
                 return {
                     "reasoning_orchestrator": {
@@ -428,12 +420,6 @@ async def load_acl_config(pool: asyncpg.Pool) -> Dict[str, Any]:
                     }
                 }
             
-            rows = await conn.fetch("""
-                SELECT agent_id, allowed_method
-                FROM gateway_acl_config
-                WHERE is_active = true
-            """)
-            
             acl = {}
             for row in rows:
                 agent_id = row['agent_id']
@@ -466,8 +452,8 @@ async def lifespan(app: FastAPI):
         # Create database connection pool with improved settings
         app_state.db_pool = await asyncpg.create_pool(
             DATABASE_URL,
-            min_size=1,
-            max_size=10,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
             command_timeout=60,
             statement_cache_size=0,  # For pgbouncer compatibility
             max_inactive_connection_lifetime=300.0,  # Close inactive connections after 5 min
@@ -492,9 +478,21 @@ async def lifespan(app: FastAPI):
                    services=list(app_state.service_catalog.keys()),
                    agents=list(app_state.acl_config.keys()))
         
+        # Shared keep-alive client for http_endpoint services
+        app_state.http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE
+            )
+        )
+        
         yield
         
     finally:
+        if app_state.http_client:
+            await app_state.http_client.aclose()
+            app_state.http_client = None
         if app_state.db_pool:
             logger.info("Closing database connection pool...")
             try:
@@ -534,9 +532,9 @@ async def execute_rpc_method(pool: asyncpg.Pool,
             try:
                 result = await conn.fetchval(
                     f"SELECT {sql_function}($1::jsonb)",
-                    json.dumps(params)
+                    orjson.dumps(params).decode()
                 )
-                return json.loads(result) if isinstance(result, str) else result
+                return orjson.loads(result) if isinstance(result, str) else result
             except asyncpg.PostgresError as e:
                 logger.error("Database operation failed", 
                            function=sql_function, 
@@ -551,19 +549,18 @@ async def execute_rpc_method(pool: asyncpg.Pool,
             raise RPCError(ErrorCodes.INTERNAL_ERROR, 
                           f"Endpoint URL not found for {service_name}.{function_key}")
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    endpoint_url,
-                    json=params,
-                    headers={"Content-Type": "application/json"},
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as e:
-                logger.error("HTTP request failed", url=endpoint_url, error=str(e))
-                raise RPCError(ErrorCodes.SERVICE_UNAVAILABLE, f"Service unavailable: {e}")
+        try:
+            response = await app_state.http_client.post(
+                endpoint_url,
+                json=params,
+                headers={"Content-Type": "application/json"},
+                timeout=30.0
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            logger.error("HTTP request failed", url=endpoint_url, error=str(e))
+            raise RPCError(ErrorCodes.SERVICE_UNAVAILABLE, f"Service unavailable: {e}")
     
     else:
         raise RPCError(ErrorCodes.INTERNAL_ERROR, 
@@ -611,12 +608,12 @@ app = FastAPI(
     title="RPC Gateway", 
     version="2.0",
     description="Secure RPC Gateway for AI Platform - English API",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-@app.post("/rpc")
-async def rpc_endpoint(request: Request, rpc_request: JsonRpcRequest) -> JsonRpcResponse:
-    """Main endpoint for JSON-RPC requests with English API."""
+async def process_rpc_request(rpc_request: JsonRpcRequest, agent_id: Optional[str]) -> JsonRpcResponse:
+    """Processes a single JSON-RPC request and wraps errors in the response."""
     request_id = str(uuid.uuid4())
     
     # Bind request_id to logger
@@ -628,7 +625,6 @@ async def rpc_endpoint(request: Request, rpc_request: JsonRpcRequest) -> JsonRpc
     
     try:
         # Validate agent ID
-        agent_id = request.headers.get("X-Agent-ID")
         if not agent_id:
             raise RPCError(ErrorCodes.UNAUTHORIZED, "X-Agent-ID header is required")
         
@@ -681,22 +677,34 @@ async def rpc_endpoint(request: Request, rpc_request: JsonRpcRequest) -> JsonRpc
             id=rpc_request.id
         )
 
+@app.post("/rpc")
+async def rpc_endpoint(request: Request, rpc_request: JsonRpcRequest) -> JsonRpcResponse:
+    """Main endpoint for JSON-RPC requests with English API."""
+    return await process_rpc_request(rpc_request, request.headers.get("X-Agent-ID"))
+
+@app.post("/rpc/batch")
+async def rpc_batch_endpoint(request: Request, rpc_requests: List[JsonRpcRequest]) -> List[JsonRpcResponse]:
+    """
+    JSON-RPC batch endpoint. Executes the requests in order and returns one
+    response per request, so bulk saves cost a single HTTP round trip.
+    """
+    agent_id = request.headers.get("X-Agent-ID")
+    return [await process_rpc_request(rpc_request, agent_id) for rpc_request in rpc_requests]
+
 @app.get("/health", response_model=HealthStatus)
 async def health_check():
     """Health check endpoint"""
     health = {
         "status": "healthy",
         "database": "unknown",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
     
     try:
         if app_state.db_pool:
-            async with app_state.db_pool.acquire() as conn:
-                await asyncio.wait_for(
-                    conn.fetchval("SELECT 1"),
-                    timeout=5.0
-                )
+            async with app_state.db_pool.acquire(timeout=5.0) as conn:
+                # asyncpg enforces the timeout itself; no wait_for wrapper task needed
+                await conn.fetchval("SELECT 1", timeout=5.0)
                 health["database"] = "healthy"
         else:
             health["database"] = "not_initialized"
@@ -712,10 +720,15 @@ async def health_check():
 async def metrics():
     """Enhanced metrics endpoint with agent-specific data."""
     metrics_data = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "agents": {},
         "services": list(app_state.service_catalog.keys()),
         "total_agents": len(app_state.acl_config),
+        "db_pool": {
+            "size": app_state.db_pool.get_size() if app_state.db_pool else 0,
+            "idle": app_state.db_pool.get_idle_size() if app_state.db_pool else 0,
+            "max_size": DB_POOL_MAX_SIZE
+        },
         "rate_limiter": {
             "default_limit": app_state.rate_limiter.requests_per_minute,
             "custom_limits": app_state.rate_limiter.limits
@@ -808,7 +821,7 @@ async def reload_configuration(request: Request):
     """Endpoint to reload configuration with cache invalidation."""
     # Requires admin authentication
     admin_token = request.headers.get("X-Admin-Token")
-    if admin_token != os.getenv("ADMIN_TOKEN"):
+    if admin_token != ADMIN_TOKEN:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     try:
@@ -838,7 +851,7 @@ async def reload_configuration(request: Request):
 async def debug_configuration(request: Request):
     """Debug endpoint to inspect current configuration (admin only)."""
     admin_token = request.headers.get("X-Admin-Token")
-    if admin_token != os.getenv("ADMIN_TOKEN"):
+    if admin_token != ADMIN_TOKEN:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     return {
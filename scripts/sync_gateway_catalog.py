@@ -17,8 +17,10 @@ sys.path.insert(0, project_root)
 # Import registry functions
 from src.agent_library.registry import (
     TOOL_REGISTRY, 
-    generate_gateway_catalog_sql, 
-    generate_acl_config_sql
+    GATEWAY_CATALOG_UPSERT_SQL,
+    ACL_CONFIG_UPSERT_SQL,
+    generate_gateway_catalog_rows, 
+    generate_acl_config_rows
 )
 
 # Import all agents to populate registry
@@ -47,11 +49,11 @@ async def sync_gateway_catalog():
         # Connect to database
         conn = await asyncpg.connect(database_url)
         
-        # Generate SQL statements from registry
-        catalog_sql = generate_gateway_catalog_sql()
-        acl_sql = generate_acl_config_sql()
+        # Generate parameter rows from registry
+        catalog_rows = generate_gateway_catalog_rows()
+        acl_rows = generate_acl_config_rows()
         
-        if not catalog_sql:
+        if not catalog_rows:
             logger.warning("No tools found in registry. Did you import the agent modules?")
             return False
         
@@ -59,15 +61,11 @@ async def sync_gateway_catalog():
         async with conn.transaction():
             # Update service catalog
             logger.info("Updating gateway_service_catalog...")
-            for statement in catalog_sql.split(';'):
-                if statement.strip():
-                    await conn.execute(statement)
+            await conn.executemany(GATEWAY_CATALOG_UPSERT_SQL, catalog_rows)
             
             # Update ACL config
             logger.info("Updating gateway_acl_config...")
-            for statement in acl_sql.split(';'):
-                if statement.strip():
-                    await conn.execute(statement)
+            await conn.executemany(ACL_CONFIG_UPSERT_SQL, acl_rows)
         
         # Report results
         tool_count = len(TOOL_REGISTRY)
@@ -89,7 +87,7 @@ async def sync_gateway_catalog():
         logger.error("Failed to sync gateway catalog", error=str(e), exc_info=True)
         return False
 
-async def verify_sync():
+async def verify_sync(agent_id: str = "reasoning_orchestrator"):
     """Verify that the sync was successful by querying the database."""
     load_dotenv()
     database_url = os.getenv("DATABASE_URL")
@@ -116,9 +114,9 @@ async def verify_sync():
         acl_rows = await conn.fetch("""
             SELECT DISTINCT allowed_method
             FROM gateway_acl_config
-            WHERE agent_id = 'reasoning_orchestrator' AND is_active = true
+            WHERE agent_id = $1 AND is_active = true
             ORDER BY allowed_method
-        """)
+        """, agent_id)
         
         print("\n✅ Orchestrator Permissions:")
         for row in acl_rows:
@@ -2,7 +2,7 @@
 """
 Registry system with dependency injection for automatic agent discovery.
 """
-from typing import Dict, Any, Optional, Type, List
+from typing import Dict, Any, Optional, Type, List, Tuple
 import structlog
 import json
 
@@ -129,12 +129,30 @@ def create_agent_from_registry(
     
     return agent_instance
 
-def generate_gateway_catalog_sql() -> str:
+# Parameterized upserts used by the catalog sync. Values are bound by the
+# driver ($1, $2, ...) instead of being escaped and interpolated in Python.
+GATEWAY_CATALOG_UPSERT_SQL = """
+INSERT INTO gateway_service_catalog 
+    (service_name, service_type, function_key, sql_function_name, function_metadata)
+VALUES 
+    ($1, $2, $3, $4, $5::jsonb)
+ON CONFLICT (service_name, function_key) DO UPDATE SET 
+    sql_function_name = EXCLUDED.sql_function_name,
+    function_metadata = EXCLUDED.function_metadata,
+    is_active = true;"""
+
+ACL_CONFIG_UPSERT_SQL = """
+INSERT INTO gateway_acl_config (agent_id, allowed_method)
+VALUES ($1, $2)
+ON CONFLICT (agent_id, allowed_method) DO UPDATE SET
+    is_active = true;"""
+
+def generate_gateway_catalog_rows() -> List[Tuple[str, str, str, str, str]]:
     """
-    Generate SQL INSERT statements for gateway_service_catalog.
+    Generate parameter rows for GATEWAY_CATALOG_UPSERT_SQL.
     This syncs the code registry with the database.
     """
-    statements = []
+    rows = []
     
     for method_name, tool_info in TOOL_REGISTRY.items():
         # Determine service name based on method pattern
@@ -142,43 +160,21 @@ def generate_gateway_catalog_sql() -> str:
         function_key = method_name.split('.', 1)[1] if '.' in method_name else method_name
         
         # Build SQL function name
-        if tool_info["service_type"] == "specialist_agent":
-            sql_function_name = f"{tool_info['class'].__name__}.execute"
-        else:  # automated_tool
-            sql_function_name = f"{tool_info['class'].__name__}.execute"
-        
-        # Convert metadata to JSON string
-        metadata_json = json.dumps(tool_info["metadata"])
-        metadata_json_escaped = metadata_json.replace("'", "''")
+        sql_function_name = f"{tool_info['class'].__name__}.execute"
         
-        statement = f"""
-INSERT INTO gateway_service_catalog 
-    (service_name, service_type, function_key, sql_function_name, function_metadata)
-VALUES 
-    ('{service_name}', '{tool_info["service_type"]}', '{function_key}', 
-     '{sql_function_name}', '{metadata_json_escaped}'::jsonb)
-ON CONFLICT (service_name, function_key) DO UPDATE SET 
-    sql_function_name = EXCLUDED.sql_function_name,
-    function_metadata = EXCLUDED.function_metadata,
-    is_active = true;"""
-        
-        statements.append(statement)
-    
-    return "\n".join(statements)
+        rows.append((
+            service_name,
+            tool_info["service_type"],
+            function_key,
+            sql_function_name,
+            json.dumps(tool_info["metadata"])
+        ))
+    
+    return rows
 
-def generate_acl_config_sql(agent_id: str = "reasoning_orchestrator") -> str:
+def generate_acl_config_rows(agent_id: str = "reasoning_orchestrator") -> List[Tuple[str, str]]:
     """
-    Generate SQL INSERT statements for gateway_acl_config.
+    Generate parameter rows for ACL_CONFIG_UPSERT_SQL.
     Grants the orchestrator access to all registered tools.
     """
-    statements = []
-    
-    for method_name in TOOL_REGISTRY.keys():
-        statement = f"""
-INSERT INTO gateway_acl_config (agent_id, allowed_method)
-VALUES ('{agent_id}', '{method_name}')
-ON CONFLICT (agent_id, allowed_method) DO UPDATE SET
-    is_active = true;"""
-        statements.append(statement)
-    
-    return "\n".join(statements)
\ No newline at end of file
+    return [(agent_id, method_name) for method_name in TOOL_REGISTRY.keys()]
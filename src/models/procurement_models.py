@@ -3,7 +3,7 @@
 Sentraliserte, standardiserte datamodeller for AI Agent SDK.
 Erstatter fragmenterte og dupliserte modeller med en enhetlig arkitektur.
 """
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 import uuid
 from enum import Enum
 from typing import Optional, List, Dict, Any
@@ -107,12 +107,6 @@ class ProcurementRequest(BaseModel):
     # Administrative detaljer
     estimated_suppliers: int = Field(0, description="Estimert antall tilbydere", ge=0)
     innovation_potential: bool = Field(False, description="Potensial for innovasjon")
-    
-    @field_validator('value')
-    def validate_value(cls, v):
-        if v < 0:
-            raise ValueError("Procurement value cannot be negative")
-        return v
 
 # ========================================
 # GENERISK KRAV-MODELL
@@ -5,6 +5,7 @@ No legacy code, uses dependency injection and enhanced prompts.
 """
 import asyncio
 import json
+import time
 import uuid
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
@@ -30,12 +31,21 @@ from pydantic import BaseModel, Field
 
 logger = structlog.get_logger()
 
+# Pydantic-modell for et agent-kall som kan kjøres samtidig med hovedhandlingen
+class ParallelAction(BaseModel):
+    method: str = Field(..., description="Agent-metoden som skal kalles, f.eks. 'agent.run_environmental'")
+    parameters: Dict[str, Any] = Field(default_factory=dict, description="Parametere for metoden")
+
 # Pydantic-modell for planen som LLM skal generere
 class ActionPlan(BaseModel):
     method: str = Field(..., description="Metoden som skal kalles, f.eks. 'database.create_procurement'")
     parameters: Dict[str, Any] = Field(default_factory=dict, description="Parametere for metoden")
     reasoning: str = Field(..., description="Kort begrunnelse for hvorfor denne handlingen ble valgt")
     expected_outcome: str = Field(..., description="Forventet resultat av handlingen")
+    parallel_actions: List[ParallelAction] = Field(
+        default_factory=list,
+        description="Andre agent-kall (agent.*) som er uavhengige av hovedhandlingen og kan kjøres samtidig"
+    )
 
 # Pydantic-modell for resultatet av målsjekken
 class GoalCompletionCheck(BaseModel):
@@ -43,7 +53,11 @@ class GoalCompletionCheck(BaseModel):
     unmet_criteria: List[str] = Field(default_factory=list, description="En liste over kriterier som ikke er møtt")
     reasoning: str = Field(..., description="Kort begrunnelse for konklusjonen")
 
-class GoalStatus(Enum):
+# JSON-skjemaene over, generert én gang i stedet for ved hver planlegging/målsjekk
+ACTION_PLAN_SCHEMA = ActionPlan.model_json_schema()
+GOAL_COMPLETION_SCHEMA = GoalCompletionCheck.model_json_schema()
+
+class GoalStatus(str, Enum):
     """Status of a goal in the reasoning process."""
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -51,6 +65,9 @@ class GoalStatus(Enum):
     FAILED = "failed"
     REQUIRES_HUMAN = "requires_human"
 
+# Statuses that end the reasoning loop
+TERMINAL_GOAL_STATUSES = frozenset({GoalStatus.COMPLETED, GoalStatus.FAILED, GoalStatus.REQUIRES_HUMAN})
+
 @dataclass
 class Goal:
     """Represents a goal to be achieved."""
@@ -59,6 +76,10 @@ class Goal:
     context: Dict[str, Any]
     success_criteria: List[str]
     status: GoalStatus = GoalStatus.PENDING
+    
+    def is_terminal(self) -> bool:
+        """True once the goal has reached a status the reasoning loop will not change."""
+        return self.status in TERMINAL_GOAL_STATUSES
 
 @dataclass
 class Action:
@@ -67,6 +88,8 @@ class Action:
     parameters: Dict[str, Any]
     reasoning: str
     expected_outcome: str
+    # Independent agent calls planned in the same step, dispatched concurrently with this one
+    parallel: List["Action"] = field(default_factory=list)
 
 @dataclass
 class ExecutionContext:
@@ -75,6 +98,15 @@ class ExecutionContext:
     available_tools: List[Dict[str, Any]]
     execution_history: List[Dict[str, Any]] = field(default_factory=list)
     current_state: Dict[str, Any] = field(default_factory=dict)
+    # Latest successful result per specialist agent, e.g. "triage" for agent.run_triage
+    results_by_agent: Dict[str, Any] = field(default_factory=dict)
+    # JSON of the goal's static inputs, encoded once instead of for every prompt
+    goal_context_json: str = field(init=False, repr=False)
+    success_criteria_json: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.goal_context_json = json.dumps(self.goal.context, indent=2)
+        self.success_criteria_json = json.dumps(self.goal.success_criteria, indent=2)
     
     def add_execution(self, action: Action, result: Dict[str, Any]):
         """Add an executed action to history."""
@@ -85,7 +117,7 @@ class ExecutionContext:
                 "reasoning": action.reasoning
             },
             "result": result,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.perf_counter()
         })
 
 class ReasoningOrchestrator:
@@ -161,7 +193,7 @@ class ReasoningOrchestrator:
         ) as gateway:
             
             iteration = 0
-            while iteration < self.max_iterations and goal.status == GoalStatus.IN_PROGRESS:
+            while iteration < self.max_iterations and not goal.is_terminal():
                 iteration += 1
                 logger.info("Reasoning iteration", 
                           iteration=iteration,
@@ -176,12 +208,25 @@ class ReasoningOrchestrator:
                         goal.status = GoalStatus.REQUIRES_HUMAN
                     break
                 
-                # Execute action
-                result = await self._execute_action(gateway, action, context)
+                # Execute action, fanning out to any independent agent calls planned with it
+                actions = [action, *action.parallel]
+                history_start = len(context.execution_history)
+                results = await asyncio.gather(
+                    *(self._execute_action(gateway, a, context) for a in actions)
+                )
+                
+                if action.parallel:
+                    # History is appended in completion order; restore the planned order
+                    planned_order = {a.method: i for i, a in enumerate(actions)}
+                    context.execution_history[history_start:] = sorted(
+                        context.execution_history[history_start:],
+                        key=lambda entry: planned_order[entry["action"]["method"]]
+                    )
                 
                 # Update state
-                if result and result.get("status") == "success":
-                    await self._update_state(action, result, context)
+                for executed, result in zip(actions, results):
+                    if result and result.get("status") == "success":
+                        await self._update_state(executed, result, context)
                 
                 # Check goal completion
                 if await self._check_goal_completion(context):
@@ -214,6 +259,7 @@ class ReasoningOrchestrator:
 2. **Analyser Datagrunnlaget:** Se på `INITIAL_DATA` for den opprinnelige konteksten og `CURRENT_STATE` for resultater av tidligere handlinger.
 3. **Vurder Verktøy:** Se på listen over `AVAILABLE_TOOLS` og deres beskrivelser.
 4. **Velg Neste Handling:** Velg det *eneste* verktøyet som er det mest logiske neste steget.
+   - Unntak: Skal flere agenter (`agent.*`) kjøres på de samme dataene uten å trenge hverandres resultater (f.eks. flere vurderinger av samme anskaffelse), legg de øvrige i `parallel_actions` så de kjøres samtidig. Databasekall skal aldri ligge i `parallel_actions`.
 5. **Fyll ut Parametre:** Hent all nødvendig data for verktøyets parametere fra `INITIAL_DATA` eller `CURRENT_STATE`. Dette er kritisk.
 6. **Formuler Resonnement:** Forklar kort hvorfor du valgte akkurat dette verktøyet.
 7. **Svar KUN med JSON:** Din respons må være et rent JSON-objekt.
@@ -223,11 +269,11 @@ class ReasoningOrchestrator:
 </GOAL>
 
 <SUCCESS_CRITERIA>
-{json.dumps(context.goal.success_criteria, indent=2)}
+{context.success_criteria_json}
 </SUCCESS_CRITERIA>
 
 <INITIAL_DATA>
-{json.dumps(context.goal.context, indent=2)}
+{context.goal_context_json}
 </INITIAL_DATA>
 
 <CURRENT_STATE>
@@ -251,7 +297,8 @@ EKSEMPEL på riktig svar hvis første steg:
     "description": "[hent fra INITIAL_DATA]"
   }},
   "reasoning": "Første steg er å opprette anskaffelsessaken i databasen",
-  "expected_outcome": "Procurement ID returnert"
+  "expected_outcome": "Procurement ID returnert",
+  "parallel_actions": []
 }}
 
 Svar nå KUN med JSON-objektet for neste handling."""
@@ -259,7 +306,7 @@ Svar nå KUN med JSON-objektet for neste handling."""
         try:
             action_data = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=ActionPlan.model_json_schema(), # Bruk Pydantic-modellen
+            response_schema=ACTION_PLAN_SCHEMA, # Bruk Pydantic-modellen
             purpose="action_planning",
             temperature=0.3
         )
@@ -267,11 +314,27 @@ Svar nå KUN med JSON-objektet for neste handling."""
             if not action_data.get("method"):
                 return None
             
+            # Only independent agent calls may fan out, each method at most once per step
+            parallel = []
+            seen_methods = {action_data["method"]}
+            for extra in action_data.get("parallel_actions") or []:
+                method = extra.get("method") if isinstance(extra, dict) else None
+                if not method or not method.startswith("agent.") or method in seen_methods:
+                    continue
+                seen_methods.add(method)
+                parallel.append(Action(
+                    method=method,
+                    parameters=extra.get("parameters", {}),
+                    reasoning=action_data.get("reasoning", ""),
+                    expected_outcome=action_data.get("expected_outcome", "")
+                ))
+            
             return Action(
                 method=action_data["method"],
                 parameters=action_data.get("parameters", {}),
                 reasoning=action_data.get("reasoning", ""),
-                expected_outcome=action_data.get("expected_outcome", "")
+                expected_outcome=action_data.get("expected_outcome", ""),
+                parallel=parallel
             )
             
         except Exception as e:
@@ -293,7 +356,7 @@ Svar nå KUN med JSON-objektet for neste handling."""
 </GOAL>
 
 <SUCCESS_CRITERIA>
-{json.dumps(context.goal.success_criteria, indent=2)}
+{context.success_criteria_json}
 </SUCCESS_CRITERIA>
 
 <CURRENT_STATE>
@@ -310,7 +373,7 @@ Svar med JSON:
         try:
             result = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=GoalCompletionCheck.model_json_schema(), # Bruk Pydantic-modellen
+            response_schema=GOAL_COMPLETION_SCHEMA, # Bruk Pydantic-modellen
             purpose="goal_evaluation",
             temperature=0.1
             )
@@ -372,6 +435,8 @@ Svar med JSON:
             elif action.method.startswith("agent."):
                 # Specialist agent call via SDK
                 result = await self._call_specialist_agent(action.method, action.parameters)
+                agent_key = action.method.split(".", 1)[1].removeprefix("run_")
+                context.results_by_agent[agent_key] = result
 
             else:
                 raise ValueError(f"Unknown method type: {action.method}")
@@ -5,6 +5,7 @@ No legacy code, uses dependency injection and enhanced prompts.
 """
 import asyncio
 import json
+import time
 import uuid
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
@@ -43,7 +44,11 @@ class GoalCompletionCheck(BaseModel):
     unmet_criteria: List[str] = Field(default_factory=list, description="En liste over kriterier som ikke er møtt")
     reasoning: str = Field(..., description="Kort begrunnelse for konklusjonen")
 
-class GoalStatus(Enum):
+# JSON-skjemaene over, generert én gang i stedet for ved hver planlegging/målsjekk
+ACTION_PLAN_SCHEMA = ActionPlan.model_json_schema()
+GOAL_COMPLETION_SCHEMA = GoalCompletionCheck.model_json_schema()
+
+class GoalStatus(str, Enum):
     """Status of a goal in the reasoning process."""
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -85,7 +90,7 @@ class ExecutionContext:
                 "reasoning": action.reasoning
             },
             "result": result,
-            "timestamp": asyncio.get_event_loop().time()
+            "timestamp": time.perf_counter()
         })
 
 class ReasoningOrchestrator:
@@ -260,7 +265,7 @@ Svar nå KUN med JSON-objektet for neste handling."""
         try:
             action_data = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=ActionPlan.model_json_schema(), # Bruk Pydantic-modellen
+            response_schema=ACTION_PLAN_SCHEMA, # Bruk Pydantic-modellen
             purpose="action_planning",
             temperature=0.3
         )
@@ -311,7 +316,7 @@ Svar med JSON:
         try:
             result = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=GoalCompletionCheck.model_json_schema(), # Bruk Pydantic-modellen
+            response_schema=GOAL_COMPLETION_SCHEMA, # Bruk Pydantic-modellen
             purpose="goal_evaluation",
             temperature=0.1
             )
@@ -31,6 +31,9 @@ ENVIRONMENTAL_METADATA = build_metadata(
     output_schema_class=EnvironmentalAssessmentResult
 )
 
+# JSON-skjema for LLM-svaret, generert én gang i stedet for ved hvert kall
+ENVIRONMENTAL_RESPONSE_SCHEMA = EnvironmentalAssessmentResult.model_json_schema()
+
 ENVIRONMENTAL_SYSTEM_PROMPT = """
 Du er ekspert på Oslo kommunes instruks om bruk av klima- og miljøkrav i bygge- og anleggsanskaffelser.
 Din oppgave er å vurdere anskaffelser mot gjeldende krav i instruksen.
@@ -203,19 +206,24 @@ class EnvironmentalAgent(BaseSpecialistAgent):
                 if "Standard klima- og miljøkrav" not in plan.get("themes", []):
                     plan["themes"].append("Standard klima- og miljøkrav")
             
-            for theme in plan.get("themes", []):
+            themes = plan.get("themes", [])
+            
+            # Build search queries using Pydantic object fields
+            search_queries = [
+                f"{theme} {procurement.category.value} {procurement.value} NOK"
+                for theme in themes
+            ]
+            
+            # Generate all query embeddings in one batch request
+            query_embeddings = await self.embedding_gateway.create_batch_embeddings(
+                texts=search_queries,
+                task_type="RETRIEVAL_QUERY",
+                output_dimensionality=1536
+            ) if search_queries else []
+            
+            for theme, query_embedding in zip(themes, query_embeddings):
                 logger.debug("Fetching context for theme", theme=theme)
                 
-                # Build search query using Pydantic object fields
-                search_query = f"{theme} {procurement.category.value} {procurement.value} NOK"
-                
-                # Generate embedding
-                query_embedding = await self.embedding_gateway.create_embedding(
-                    text=search_query,
-                    task_type="RETRIEVAL_QUERY",
-                    output_dimensionality=1536
-                )
-                
                 # Search via RPC
                 search_result = await rpc_client.call("database.search_miljokrav_documents", {
                     "queryEmbedding": query_embedding,
@@ -233,7 +241,7 @@ class EnvironmentalAgent(BaseSpecialistAgent):
                         
                         if doc["relevance_score"] > 0.6:
                             context_documents.append(doc)
-                            logger.debug(f"Added relevant doc: {doc.get('documentId')}")
+                            logger.debug("Added relevant doc", document_id=doc.get('documentId'))
                 else:
                     logger.warning(f"Search failed for theme: {theme}", 
                                  error=search_result.get('message'))
@@ -288,7 +296,7 @@ class EnvironmentalAgent(BaseSpecialistAgent):
         
         result = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=EnvironmentalAssessmentResult.model_json_schema(),
+            response_schema=ENVIRONMENTAL_RESPONSE_SCHEMA,
             purpose="complex_reasoning",
             temperature=0.3
         )
@@ -30,6 +30,9 @@ OSLOMODELL_METADATA = build_metadata(
     output_schema_class=OslomodellAssessmentResult
 )
 
+# JSON-skjema for LLM-svaret, generert én gang i stedet for ved hvert kall
+OSLOMODELL_RESPONSE_SCHEMA = OslomodellAssessmentResult.model_json_schema()
+
 OSLOMODELL_SYSTEM_PROMPT = """
 Du er ekspert på Oslo kommunes instruks for anskaffelser og Oslomodellen.
 Din oppgave er å identifisere hvilke KRAVKODER (A-V) som gjelder for en anskaffelse.
@@ -193,16 +196,19 @@ class OslomodelAgent(BaseSpecialistAgent):
             # Build search queries for relevant sections
             relevant_sections = plan.get("relevant_sections", ["4", "5", "6", "7"])
             
-            for section in relevant_sections:
-                search_query = f"punkt {section} {procurement.category.value} {procurement.value}"
-                
-                # Generate embedding
-                query_embedding = await self.embedding_gateway.create_embedding(
-                    text=search_query,
-                    task_type="RETRIEVAL_QUERY",
-                    output_dimensionality=1536
-                )
-                
+            search_queries = [
+                f"punkt {section} {procurement.category.value} {procurement.value}"
+                for section in relevant_sections
+            ]
+            
+            # Generate all query embeddings in one batch request
+            query_embeddings = await self.embedding_gateway.create_batch_embeddings(
+                texts=search_queries,
+                task_type="RETRIEVAL_QUERY",
+                output_dimensionality=1536
+            ) if search_queries else []
+            
+            for query_embedding in query_embeddings:
                 # Search knowledge base
                 search_result = await rpc_client.call("database.search_knowledge_documents", {
                     "queryEmbedding": query_embedding,
@@ -299,7 +305,7 @@ class OslomodelAgent(BaseSpecialistAgent):
         
         result = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=OslomodellAssessmentResult.model_json_schema(),
+            response_schema=OSLOMODELL_RESPONSE_SCHEMA,
             purpose="complex_reasoning",
             temperature=0.2
         )
@@ -69,19 +69,29 @@ class RefinedOslomodellAgent(BaseSpecialistAgent):
         self.chunks_file = chunks_file
         self.llm_gateway = None
         self.chunks_cache = None
+        self._initialization_lock = asyncio.Lock()
         
     async def initialize(self):
-        """Initialize LLM gateway and load chunks."""
-        self.llm_gateway = LLMGateway()
-        
-        # Load chunks from local JSON file
-        self.chunks_cache = await self._load_chunks_from_file()
-        
-        logger.info(
-            "RefinedOslomodellAgent initialized",
-            chunks_loaded=len(self.chunks_cache),
-            source=self.chunks_file
-        )
+        """Initialize LLM gateway and load chunks (once per agent instance)."""
+        # Fast path: no lock acquisition once initialized
+        if self.chunks_cache is not None:
+            return
+        
+        async with self._initialization_lock:
+            # Another caller may have finished initialization while we waited
+            if self.chunks_cache is not None:
+                return
+            
+            self.llm_gateway = LLMGateway()
+            
+            # Load chunks from local JSON file
+            self.chunks_cache = await self._load_chunks_from_file()
+            
+            logger.info(
+                "RefinedOslomodellAgent initialized",
+                chunks_loaded=len(self.chunks_cache),
+                source=self.chunks_file
+            )
         
     async def _load_chunks_from_file(self) -> List[Dict[str, Any]]:
         """Load chunks from local JSON file for testing."""
@@ -315,7 +325,7 @@ Returner et JSON-objekt med følgende struktur:
         actual_value = self._get_field_value(procurement, risk_profile, field)
         
         if actual_value is None:
-            logger.debug(f"Field {field} not found, skipping condition")
+            logger.debug("Field not found, skipping condition", field=field)
             return False
         
         # Normalize operator to enum if it's a string
@@ -399,7 +409,7 @@ Returner et JSON-objekt med følgende struktur:
                    procurement.duration_months > 3 and
                    procurement.category.value in ["bygg", "anlegg"])
         
-        logger.debug(f"Field {field} not mapped, returning None")
+        logger.debug("Field not mapped, returning None", field=field)
         return None
     
     def _find_semantic_context(
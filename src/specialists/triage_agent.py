@@ -29,6 +29,9 @@ TRIAGE_METADATA = build_metadata(
     output_schema_class=TriageResult
 )
 
+# JSON-skjema for LLM-svaret, generert én gang i stedet for ved hvert kall
+TRIAGE_RESPONSE_SCHEMA = LLM_TriageResponse.model_json_schema()
+
 # ENDRING 2: Prompten er oppdatert for å be om rikere informasjon
 TRIAGE_SYSTEM_PROMPT = """
 Du er ekspert på norsk anskaffelsesregelverk.
@@ -83,7 +86,7 @@ Anskaffelse til vurdering:
         
         llm_response_dict = await self.llm_gateway.generate_structured(
             prompt=prompt,
-            response_schema=LLM_TriageResponse.model_json_schema(),
+            response_schema=TRIAGE_RESPONSE_SCHEMA,
             purpose="fast_evaluation",
             temperature=0.3
         )
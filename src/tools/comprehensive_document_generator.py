@@ -14,7 +14,7 @@ class ComprehensiveDocumentGenerator:
     
     def __init__(self, output_dir: str = "procurement_documents"):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_from_assessment(self, assessment: ComprehensiveAssessment) -> str:
         """
@@ -185,22 +185,22 @@ class ComprehensiveDocumentGenerator:
         
         # Header med emoji
         lines.extend([
-            f"# 📊 Fullstendig Anskaffelsesnotat",
-            f"",
+            "# 📊 Fullstendig Anskaffelsesnotat",
+            "",
             f"**Generert:** {timestamp.strftime('%d.%m.%Y kl. %H:%M')}",
-            f"**Type:** ComprehensiveAssessment",
+            "**Type:** ComprehensiveAssessment",
             f"**Compliance Score:** {assessment.compliance_score*100:.1f}%",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Executive Dashboard
         lines.extend([
-            f"## 🎯 Executive Dashboard",
-            f"",
-            f"| Metrikk | Verdi |",
-            f"|---------|-------|"
+            "## 🎯 Executive Dashboard",
+            "",
+            "| Metrikk | Verdi |",
+            "|---------|-------|"
         ])
         
         lines.append(f"| **Anskaffelse** | {proc.name} |")
@@ -227,43 +227,43 @@ class ComprehensiveDocumentGenerator:
         
         # Samlet anbefaling
         lines.extend([
-            f"## 💡 Samlet anbefaling",
-            f"",
+            "## 💡 Samlet anbefaling",
+            "",
             f"> {assessment.overall_recommendation}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Detaljert anskaffelsesinformasjon
         lines.extend([
-            f"## 📋 Detaljert anskaffelsesinformasjon",
-            f"",
-            f"### Grunndata",
+            "## 📋 Detaljert anskaffelsesinformasjon",
+            "",
+            "### Grunndata",
             f"- **ID:** {proc.id}",
             f"- **Navn:** {proc.name}",
             f"- **Beskrivelse:** {proc.description or 'Ikke oppgitt'}",
             f"- **Verdi:** {proc.value:,} NOK ekskl. mva",
             f"- **Kategori:** {proc.category.value}",
             f"- **Varighet:** {proc.duration_months} måneder",
-            f""
+            ""
         ])
         
         if proc.includes_construction:
             lines.extend([
-                f"### Bygge-/anleggsdata",
+                "### Bygge-/anleggsdata",
                 f"- **Byggeplassstørrelse:** {proc.construction_site_size or 'Ikke oppgitt'} m²",
                 f"- **Inkluderer riving:** {'Ja' if proc.involves_demolition else 'Nei'}",
                 f"- **Inkluderer grunnarbeid:** {'Ja' if proc.involves_earthworks else 'Nei'}",
-                f""
+                ""
             ])
         
         if proc.involves_transport:
             lines.extend([
-                f"### Transportdata",
+                "### Transportdata",
                 f"- **Transporttype:** {proc.transport_type.value}",
                 f"- **Estimert volum:** {proc.estimated_transport_volume or 'Ikke oppgitt'}",
-                f""
+                ""
             ])
         
         lines.extend(["---", ""])
@@ -272,19 +272,19 @@ class ComprehensiveDocumentGenerator:
         if assessment.triage_result:
             triage = assessment.triage_result
             lines.extend([
-                f"## 🚦 Triage-vurdering",
-                f"",
+                "## 🚦 Triage-vurdering",
+                "",
                 f"**Klassifisering:** {triage.color.value}",
                 f"**Konfidens:** {triage.confidence*100:.0f}%",
-                f"",
+                "",
                 f"**Begrunnelse:** {triage.reasoning}",
-                f""
+                ""
             ])
             
             if triage.risk_factors:
                 lines.extend([
-                    f"### Risikofaktorer:",
-                    f""
+                    "### Risikofaktorer:",
+                    ""
                 ])
                 for factor in triage.risk_factors:
                     lines.append(f"- {factor}")
@@ -296,27 +296,27 @@ class ComprehensiveDocumentGenerator:
         if assessment.oslomodell_result:
             oslo = assessment.oslomodell_result
             lines.extend([
-                f"## 🏛️ Oslomodell-vurdering",
-                f"",
+                "## 🏛️ Oslomodell-vurdering",
+                "",
                 f"**Arbeidslivskriminalitet:** {oslo.vurdert_risiko_for_akrim.upper()}",
                 f"**Antall seriøsitetskrav:** {len(oslo.påkrevde_seriøsitetskrav)}",
                 f"**Underleverandørledd:** {oslo.anbefalt_antall_underleverandørledd}",
-                f""
+                ""
             ])
             
             if oslo.påkrevde_seriøsitetskrav:
                 lines.extend([
-                    f"### Påkrevde seriøsitetskrav:",
+                    "### Påkrevde seriøsitetskrav:",
                     f"**Koder:** {', '.join(sorted(oslo.påkrevde_seriøsitetskrav))}",
-                    f""
+                    ""
                 ])
             
             if oslo.krav_om_lærlinger:
                 lines.extend([
-                    f"### Lærlinger:",
+                    "### Lærlinger:",
                     f"**Status:** {'Påkrevd' if oslo.krav_om_lærlinger.get('status') else 'Ikke påkrevd'}",
                     f"**Begrunnelse:** {oslo.krav_om_lærlinger.get('begrunnelse', 'Ikke vurdert')}",
-                    f""
+                    ""
                 ])
             
             lines.extend(["---", ""])
@@ -325,17 +325,17 @@ class ComprehensiveDocumentGenerator:
         if assessment.miljokrav_result:
             env = assessment.miljokrav_result
             lines.extend([
-                f"## 🌱 Miljøvurdering",
-                f"",
+                "## 🌱 Miljøvurdering",
+                "",
                 f"**Miljørisiko:** {env.environmental_risk_level.value.upper()}",
                 f"**Standard miljøkrav:** {'JA' if env.standard_miljokrav_applies else 'NEI'}",
-                f""
+                ""
             ])
             
             if env.transport_requirements:
                 lines.extend([
                     f"### Transportkrav ({len(env.transport_requirements)} stk):",
-                    f""
+                    ""
                 ])
                 for req in env.transport_requirements:
                     lines.append(f"- {req.requirement_type.value}: {req.vehicle_class}")
@@ -348,9 +348,9 @@ class ComprehensiveDocumentGenerator:
         if all_requirements:
             lines.extend([
                 f"## 📑 Alle krav ({len(all_requirements)} stk)",
-                f"",
-                f"| Kode | Kategori | Kilde | Obligatorisk |",
-                f"|------|----------|-------|--------------|"
+                "",
+                "| Kode | Kategori | Kilde | Obligatorisk |",
+                "|------|----------|-------|--------------|"
             ])
             
             for req in all_requirements:
@@ -361,37 +361,37 @@ class ComprehensiveDocumentGenerator:
         
         # Handlingsplan
         lines.extend([
-            f"## 📝 Handlingsplan",
-            f"",
-            f"### Fase 1: Forberedelse",
+            "## 📝 Handlingsplan",
+            "",
+            "### Fase 1: Forberedelse",
             f"- [ ] Gjennomgå alle {assessment.total_requirements_count} identifiserte krav",
-            f"- [ ] Utarbeide detaljert konkurransegrunnlag",
-            f"- [ ] Gjennomføre markedsdialog",
-            f"",
-            f"### Fase 2: Konkurranse",
-            f"- [ ] Publisere konkurranse med alle krav",
-            f"- [ ] Gjennomføre prekvalifisering",
-            f"- [ ] Evaluere tilbud",
-            f"",
-            f"### Fase 3: Kontraktsoppfølging",
-            f"- [ ] Etablere kontrollrutiner",
-            f"- [ ] Implementere rapporteringssystem",
-            f"- [ ] Gjennomføre periodiske revisjoner",
-            f"",
-            f"---",
-            f""
+            "- [ ] Utarbeide detaljert konkurransegrunnlag",
+            "- [ ] Gjennomføre markedsdialog",
+            "",
+            "### Fase 2: Konkurranse",
+            "- [ ] Publisere konkurranse med alle krav",
+            "- [ ] Gjennomføre prekvalifisering",
+            "- [ ] Evaluere tilbud",
+            "",
+            "### Fase 3: Kontraktsoppfølging",
+            "- [ ] Etablere kontrollrutiner",
+            "- [ ] Implementere rapporteringssystem",
+            "- [ ] Gjennomføre periodiske revisjoner",
+            "",
+            "---",
+            ""
         ])
         
         # Metadata og sporbarhet
         lines.extend([
-            f"## 🔍 Metadata og sporbarhet",
-            f"",
+            "## 🔍 Metadata og sporbarhet",
+            "",
             f"**Opprettet:** {assessment.created_at}",
-            f"**Dokumentversjon:** 2.0",
-            f"**Status:** KOMPLETT",
-            f"**Generator:** ComprehensiveDocumentGenerator",
-            f"",
-            f"### Vurderinger inkludert:",
+            "**Dokumentversjon:** 2.0",
+            "**Status:** KOMPLETT",
+            "**Generator:** ComprehensiveDocumentGenerator",
+            "",
+            "### Vurderinger inkludert:",
             f"- Triage: {'✅' if assessment.triage_result else '❌'}",
             f"- Oslomodell: {'✅' if assessment.oslomodell_result else '❌'}",
             f"- Miljøkrav: {'✅' if assessment.miljokrav_result else '❌'}",
@@ -337,7 +337,7 @@ class DocumentIngester:
                 
                 if result.get('status') == 'success':
                     stats['success'] += 1
-                    logger.debug(f"Stored record: {record.get('id', 'unknown')}")
+                    logger.debug("Stored record", record_id=record.get('id', 'unknown'))
                 else:
                     stats['failed'] += 1
                     logger.error(f"Failed to store record: {result}")
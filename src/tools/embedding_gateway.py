@@ -1,14 +1,20 @@
 import structlog
 import os
+from collections import OrderedDict
 import google.generativeai as genai
-from typing import List
+from typing import Dict, List, Tuple
 
 logger = structlog.get_logger()
 
+# Antall embeddings som holdes i minnet (LRU), nøkkel: (tekst, task_type, dimensjon).
+# Verdiene lagres som tupler, og kallere får en ny liste, så cachen ikke kan endres utenfra.
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "256"))
+
 class EmbeddingGateway:
     def __init__(self, api_key: str):
         genai.configure(api_key=api_key)
         self.embedding_model_name = "gemini-embedding-001"
+        self._cache: "OrderedDict[Tuple[str, str, int], Tuple[float, ...]]" = OrderedDict()
         logger.info(f"EmbeddingGateway initialized with model: {self.embedding_model_name}")
 
     async def create_embedding(
@@ -18,6 +24,11 @@ class EmbeddingGateway:
         output_dimensionality: int = 1536
     ) -> List[float]:
         """Genererer en embedding for en gitt tekst med spesifikk task_type."""
+        key = (text, task_type, output_dimensionality)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return list(cached)
+        
         logger.info(
             "Creating embedding", 
             text_length=len(text), 
@@ -31,6 +42,7 @@ class EmbeddingGateway:
                 task_type=task_type,
                 output_dimensionality=output_dimensionality
             )
+            self._cache_put(key, result['embedding'])
             return result['embedding']
         except Exception as e:
             logger.error("Error creating embedding", error=str(e), exc_info=True)
@@ -42,23 +54,58 @@ class EmbeddingGateway:
         task_type: str = "RETRIEVAL_DOCUMENT",
         output_dimensionality: int = 1536
     ) -> List[List[float]]:
-        """Genererer embeddings for en liste med tekster ved å bruke riktig batch-metode."""
+        """
+        Genererer embeddings for en liste med tekster ved å bruke riktig batch-metode.
+        Tekster som allerede ligger i cachen sendes ikke til API-et.
+        """
+        embeddings: Dict[str, Tuple[float, ...]] = {}
+        missing: List[str] = []
+        missing_set = set()
+        for text in texts:
+            if text in embeddings or text in missing_set:
+                continue
+            cached = self._cache_get((text, task_type, output_dimensionality))
+            if cached is not None:
+                embeddings[text] = cached
+            else:
+                missing.append(text)
+                missing_set.add(text)
+        
         logger.info(
             "Creating batch embeddings", 
             num_texts=len(texts), 
+            num_cached=len(embeddings),
             task_type=task_type,
             output_dimensionality=output_dimensionality
         )
+        if not missing:
+            return [list(embeddings[text]) for text in texts]
+        
         try:
             # Bruk riktig batch-funksjon: embed_content
             response = await genai.embed_content_async(
                 model=self.embedding_model_name,
-                content=texts,
+                content=missing,
                 task_type=task_type,
                 output_dimensionality=output_dimensionality
             )
             # Batch-responsen er en liste av embeddings
-            return response['embedding']
+            for text, embedding in zip(missing, response['embedding']):
+                embeddings[text] = self._cache_put((text, task_type, output_dimensionality), embedding)
+            return [list(embeddings[text]) for text in texts]
         except Exception as e:
             logger.error("Error creating batch embeddings", error=str(e), exc_info=True)
             raise
+    
+    def _cache_get(self, key: Tuple[str, str, int]):
+        embedding = self._cache.get(key)
+        if embedding is not None:
+            self._cache.move_to_end(key)
+        return embedding
+    
+    def _cache_put(self, key: Tuple[str, str, int], embedding: List[float]) -> Tuple[float, ...]:
+        frozen = self._cache[key] = tuple(embedding)
+        self._cache.move_to_end(key)
+        while len(self._cache) > EMBEDDING_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return frozen
@@ -12,7 +12,7 @@ class EnvironmentalDocumentGenerator:
     
     def __init__(self, output_dir: str = "procurement_documents"):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_document(self, procurement_data: Dict[str, Any], 
                          environmental_result: Dict[str, Any]) -> str:
@@ -54,33 +54,33 @@ class EnvironmentalDocumentGenerator:
         
         # Header
         lines.extend([
-            f"# Miljøkravvurdering",
-            f"",
+            "# Miljøkravvurdering",
+            "",
             f"**Generert:** {timestamp.strftime('%d.%m.%Y kl. %H:%M')}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 1: Anskaffelsesinformasjon
         lines.extend([
-            f"## 1. Anskaffelsesinformasjon",
-            f"",
+            "## 1. Anskaffelsesinformasjon",
+            "",
             f"**Navn:** {procurement.get('name', 'Ikke oppgitt')}",
             f"**Verdi:** {procurement.get('value', 0):,} NOK ekskl. mva",
             f"**Kategori:** {procurement.get('category', 'Ikke spesifisert')}",
             f"**Varighet:** {procurement.get('duration_months', 0)} måneder",
-            f"",
-            f"**Beskrivelse:**",
+            "",
+            "**Beskrivelse:**",
             f"> {procurement.get('description', 'Ingen beskrivelse oppgitt')}",
-            f""
+            ""
         ])
         
         # Spesifikk info for bygge/anlegg
         if procurement.get('includes_construction'):
             lines.extend([
-                f"",
-                f"### Bygge-/anleggsinformasjon:",
+                "",
+                "### Bygge-/anleggsinformasjon:",
                 f"- Byggeplassstørrelse: {procurement.get('construction_site_size', 'Ikke oppgitt')} m²",
                 f"- Inkluderer riving: {'Ja' if procurement.get('involves_demolition') else 'Nei'}",
                 f"- Inkluderer grunnarbeid: {'Ja' if procurement.get('involves_earthworks') else 'Nei'}",
@@ -89,8 +89,8 @@ class EnvironmentalDocumentGenerator:
         # Transport-info
         if procurement.get('involves_transport'):
             lines.extend([
-                f"",
-                f"### Transportinformasjon:",
+                "",
+                "### Transportinformasjon:",
                 f"- Transporttype: {procurement.get('transport_type', 'Ikke spesifisert')}",
                 f"- Estimert volum: {procurement.get('estimated_transport_volume', 'Ikke oppgitt')} tonn/turer",
             ])
@@ -102,32 +102,32 @@ class EnvironmentalDocumentGenerator:
         risk_emoji = {"høy": "🔴", "middels": "🟡", "lav": "🟢"}.get(risk_level.lower(), "⚪")
         
         lines.extend([
-            f"## 2. Miljørisikovurdering",
-            f"",
+            "## 2. Miljørisikovurdering",
+            "",
             f"**Risikonivå:** {risk_emoji} **{risk_level.upper()}**",
-            f"",
-            f"### Begrunnelse:",
+            "",
+            "### Begrunnelse:",
             f"> {assessment.get('reasoning', 'Ingen begrunnelse oppgitt')}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 3: Standard miljøkrav
         standard_req = assessment.get('standard_miljokrav_applies', False)
         lines.extend([
-            f"## 3. Standard klima- og miljøkrav",
-            f"",
+            "## 3. Standard klima- og miljøkrav",
+            "",
             f"**Gjelder:** {'✅ JA' if standard_req else '❌ NEI'}",
-            f"**Hjemmel:** Instruks om bruk av klima- og miljøkrav",
-            f""
+            "**Hjemmel:** Instruks om bruk av klima- og miljøkrav",
+            ""
         ])
         
         if standard_req:
             lines.extend([
-                f"Standard klima- og miljøkrav skal benyttes for denne anskaffelsen.",
-                f"Se mal for konkurransegrunnlag for detaljerte krav.",
-                f""
+                "Standard klima- og miljøkrav skal benyttes for denne anskaffelsen.",
+                "Se mal for konkurransegrunnlag for detaljerte krav.",
+                ""
             ])
         
         lines.extend(["---", ""])
@@ -136,8 +136,8 @@ class EnvironmentalDocumentGenerator:
         transport_reqs = assessment.get('transport_requirements', [])
         if transport_reqs:
             lines.extend([
-                f"## 4. Transportkrav",
-                f""
+                "## 4. Transportkrav",
+                ""
             ])
             
             for req in transport_reqs:
@@ -152,7 +152,7 @@ class EnvironmentalDocumentGenerator:
                     f"- Frist: {deadline}",
                     f"- Status: {'Obligatorisk' if mandatory else 'Premiering'}",
                     f"- Begrunnelse: {req.get('rationale', 'Ikke oppgitt')}",
-                    f""
+                    ""
                 ])
             
             lines.extend(["---", ""])
@@ -161,8 +161,8 @@ class EnvironmentalDocumentGenerator:
         additional = assessment.get('additional_requirements', [])
         if additional:
             lines.extend([
-                f"## 5. Tilleggskrav",
-                f""
+                "## 5. Tilleggskrav",
+                ""
             ])
             for req in additional:
                 lines.append(f"- {req}")
@@ -172,8 +172,8 @@ class EnvironmentalDocumentGenerator:
         exceptions = assessment.get('exceptions', [])
         if exceptions:
             lines.extend([
-                f"## 6. Unntak fra standard krav",
-                f""
+                "## 6. Unntak fra standard krav",
+                ""
             ])
             for exc in exceptions:
                 lines.extend([
@@ -181,46 +181,46 @@ class EnvironmentalDocumentGenerator:
                     f"- Årsak: {exc.get('reason', 'Ikke oppgitt')}",
                     f"- Godkjent av: {exc.get('approved_by', 'Ikke spesifisert')}",
                     f"- Dato: {exc.get('approval_date', 'Ikke oppgitt')}",
-                    f""
+                    ""
                 ])
             lines.extend(["---", ""])
         
         # Seksjon 7: Oppfølgingspunkter
         lines.extend([
-            f"## 7. Oppfølgingspunkter",
-            f"",
-            f"### Før konkurranse:",
-            f"- [ ] Gjennomfør markedsdialog om miljøkrav",
-            f"- [ ] Kartlegg tilgjengelige løsninger",
-            f"- [ ] Vurder behov for innovasjonspartnerskap",
-            f""
+            "## 7. Oppfølgingspunkter",
+            "",
+            "### Før konkurranse:",
+            "- [ ] Gjennomfør markedsdialog om miljøkrav",
+            "- [ ] Kartlegg tilgjengelige løsninger",
+            "- [ ] Vurder behov for innovasjonspartnerskap",
+            ""
         ])
         
         if transport_reqs:
             lines.extend([
-                f"### Transportoppfølging:",
-                f"- [ ] Spesifiser transportbehov i konkurransegrunnlag",
-                f"- [ ] Etabler rapporteringsrutiner for utslipp",
-                f"- [ ] Planlegg kontrollmekanismer",
-                f""
+                "### Transportoppfølging:",
+                "- [ ] Spesifiser transportbehov i konkurransegrunnlag",
+                "- [ ] Etabler rapporteringsrutiner for utslipp",
+                "- [ ] Planlegg kontrollmekanismer",
+                ""
             ])
         
         lines.extend([
-            f"### Under kontraktsperioden:",
-            f"- [ ] Månedlig miljørapportering",
-            f"- [ ] Kvartalsvis utslippsrapportering",
-            f"- [ ] Årlig miljørevisjon",
-            f"",
-            f"---",
-            f""
+            "### Under kontraktsperioden:",
+            "- [ ] Månedlig miljørapportering",
+            "- [ ] Kvartalsvis utslippsrapportering",
+            "- [ ] Årlig miljørevisjon",
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 8: Anbefalinger
         recommendations = assessment.get('recommendations', [])
         if recommendations:
             lines.extend([
-                f"## 8. Anbefalinger",
-                f""
+                "## 8. Anbefalinger",
+                ""
             ])
             for rec in recommendations:
                 lines.append(f"- {rec}")
@@ -228,28 +228,28 @@ class EnvironmentalDocumentGenerator:
         
         # Seksjon 9: Dokumentasjonskrav
         lines.extend([
-            f"## 9. Dokumentasjonskrav",
-            f"",
-            f"Leverandør må dokumentere følgende:",
-            f"- [ ] Miljøsertifisering (ISO 14001 eller tilsvarende)",
-            f"- [ ] Utslippsdata for kjøretøy og maskiner",
-            f"- [ ] Avfallshåndteringsplan",
-            f"- [ ] Materialoversikt med miljømerking",
-            f"- [ ] Plan for utslippsreduksjon",
-            f"",
-            f"---",
-            f""
+            "## 9. Dokumentasjonskrav",
+            "",
+            "Leverandør må dokumentere følgende:",
+            "- [ ] Miljøsertifisering (ISO 14001 eller tilsvarende)",
+            "- [ ] Utslippsdata for kjøretøy og maskiner",
+            "- [ ] Avfallshåndteringsplan",
+            "- [ ] Materialoversikt med miljømerking",
+            "- [ ] Plan for utslippsreduksjon",
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 10: Metadata
         lines.extend([
-            f"## 10. Metadata",
-            f"",
+            "## 10. Metadata",
+            "",
             f"**Konfidens:** {assessment.get('confidence', 0)*100:.0f}%",
             f"**Kilder brukt:** {', '.join(assessment.get('sources_used', ['Ingen']))}",
             f"**Vurdert av:** {assessment.get('assessed_by', 'environmental_agent')}",
-            f"**Dokumentversjon:** 1.0",
-            f"**Status:** UTKAST"
+            "**Dokumentversjon:** 1.0",
+            "**Status:** UTKAST"
         ])
         
         return "\n".join(lines)
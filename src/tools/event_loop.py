@@ -0,0 +1,18 @@
+# src/tools/event_loop.py
+"""
+Felles inngang for å kjøre asynkrone skript.
+Bruker uvloop når det er installert, ellers standard asyncio-loop.
+"""
+import asyncio
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """Kjører korutinen til den er ferdig, på uvloop hvis tilgjengelig."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    return uvloop.run(main)
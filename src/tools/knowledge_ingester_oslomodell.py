@@ -55,7 +55,7 @@ class KnowledgeIngester:
 
         for index, row in approved_df.iterrows():
             chunk_id_for_log = row.get('chunk_id', 'ukjent-id')
-            logger.info(f"Prosesserer chunk: {chunk_id_for_log}")
+            logger.info("Prosesserer chunk", chunk_id=chunk_id_for_log)
             
             try:
                 # 1. Parse JSON-metadata
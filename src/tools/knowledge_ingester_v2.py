@@ -297,7 +297,7 @@ class KnowledgeIngester:
             )
             
             if result.get('status') == 'success':
-                logger.debug(f"Stored document: {document['documentId']}")
+                logger.debug("Stored document", document_id=document['documentId'])
                 return True
             else:
                 logger.error(f"Failed to store {document['documentId']}: {result}")
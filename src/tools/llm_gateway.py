@@ -1,12 +1,15 @@
 # src/tools/llm_gateway.py - Enhanced version
 import os
 import google.generativeai as genai
-from typing import Literal, Dict, Any, Optional
+from typing import Literal, Dict, Any, Optional, Tuple
 import structlog
 import asyncio
+import time
 import json
+import weakref
 from dataclasses import dataclass
 
+from src.tools.llm_response_cache import LLMResponseCache
 
 logger = structlog.get_logger()
 
@@ -27,6 +30,7 @@ class LLMUsageMetrics:
     failed_calls: int = 0
     total_tokens_input: int = 0
     total_tokens_output: int = 0
+    cache_hits: int = 0
     
     def record_call(self, success: bool, input_tokens: int = 0, output_tokens: int = 0):
         self.total_calls += 1
@@ -47,10 +51,13 @@ class LLMGateway:
     - Automatic model selection based on purpose
     - Built-in retry logic with exponential backoff
     - Usage tracking and metrics
+    - Optional persistent response cache (LLM_RESPONSE_CACHE_PATH)
+    - Concurrency limit on outbound calls (LLM_MAX_CONCURRENCY)
+    - Model clients reused per event loop, so connections are kept alive between calls
     - Support for latest Gemini 2.5 capabilities
     """
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             logger.error("GEMINI_API_KEY_NOT_FOUND", 
@@ -105,6 +112,26 @@ class LLMGateway:
         # Usage tracking
         self.metrics = LLMUsageMetrics()
         
+        # Cap concurrent requests to stay under provider rate limits. One semaphore per event
+        # loop, created on first use; an asyncio.Semaphore must not be shared across loops.
+        self.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self._concurrency_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # GenerativeModel instances per event loop and generation config. Each model opens its
+        # async transport lazily and keeps it; the transport is bound to the loop it was created on.
+        self._models_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, genai.GenerativeModel]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # Response cache: explicit instance, or opt-in via environment
+        cache_path = os.getenv("LLM_RESPONSE_CACHE_PATH")
+        if response_cache is None and cache_path:
+            cache_ttl = os.getenv("LLM_RESPONSE_CACHE_TTL")
+            response_cache = LLMResponseCache(cache_path, ttl_seconds=float(cache_ttl) if cache_ttl else None)
+        self.response_cache = response_cache
+        
         logger.info("LLMGateway initialized with Gemini 2.5 models", 
                    models=self.model_map,
                    purposes=list(self.purpose_config.keys()))
@@ -150,20 +177,19 @@ class LLMGateway:
                     thinking_budget=final_thinking_budget,
                     prompt_length=len(full_prompt))
         
-        # Build generation config
-        generation_config = genai.GenerationConfig(
-            temperature=final_temperature,
-            response_mime_type=response_mime_type,
-        )
+        # Serve identical requests from the response cache
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = LLMResponseCache.make_key(
+                model_name, final_temperature, response_mime_type, final_thinking_budget, full_prompt
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.metrics.cache_hits += 1
+                logger.debug("LLM cache hit", model=model_name, purpose=purpose)
+                return cached
         
-        # Add thinking budget for 2.5 models
-        if "2.5" in model_name and final_thinking_budget:
-            generation_config.thinking_budget = final_thinking_budget
-        
-        model = genai.GenerativeModel(
-            model_name,
-            generation_config=generation_config
-        )
+        model = self._get_model(model_name, final_temperature, response_mime_type, final_thinking_budget)
         
         # Retry logic with exponential backoff
         max_retries = config["max_retries"]
@@ -172,23 +198,29 @@ class LLMGateway:
         for attempt in range(max_retries + 1):
             try:
                 # Execute with timeout
-                response = await asyncio.wait_for(
-                    model.generate_content_async(full_prompt),
-                    timeout=timeout
-                )
+                async with self._get_concurrency():
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(full_prompt),
+                        timeout=timeout
+                    )
                 
                 # Track successful call
+                input_tokens = getattr(response.usage_metadata, 'prompt_token_count', 0)
+                output_tokens = getattr(response.usage_metadata, 'candidates_token_count', 0)
                 self.metrics.record_call(
                     success=True,
-                    input_tokens=getattr(response.usage_metadata, 'prompt_token_count', 0),
-                    output_tokens=getattr(response.usage_metadata, 'candidates_token_count', 0)
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens
                 )
                 
                 logger.debug("LLM call successful", 
                            model=model_name,
                            attempt=attempt + 1,
-                           input_tokens=getattr(response.usage_metadata, 'prompt_token_count', 0),
-                           output_tokens=getattr(response.usage_metadata, 'candidates_token_count', 0))
+                           input_tokens=input_tokens,
+                           output_tokens=output_tokens)
+                
+                if cache_key is not None:
+                    self.response_cache.set(cache_key, response.text)
                 
                 return response.text
                 
@@ -219,6 +251,49 @@ class LLMGateway:
         self.metrics.record_call(success=False)
         return self._create_error_response("Max retries exceeded", "MAX_RETRIES")
     
+    def _get_concurrency(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._concurrency_by_loop.get(loop)
+        if semaphore is None:
+            semaphore = self._concurrency_by_loop[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+    
+    def _get_model(self,
+                   model_name: str,
+                   temperature: float,
+                   response_mime_type: str,
+                   thinking_budget: Optional[int]) -> genai.GenerativeModel:
+        """Return the cached model for this event loop and config, creating it on first use."""
+        # Thinking budget only applies to 2.5 models
+        if "2.5" not in model_name:
+            thinking_budget = None
+        
+        loop = asyncio.get_running_loop()
+        loop_models = self._models_by_loop.get(loop)
+        if loop_models is None:
+            loop_models = self._models_by_loop[loop] = {}
+        
+        model_key = (model_name, temperature, response_mime_type, thinking_budget)
+        model = loop_models.get(model_key)
+        if model is None:
+            # Build generation config
+            generation_config = genai.GenerationConfig(
+                temperature=temperature,
+                response_mime_type=response_mime_type,
+            )
+            
+            # Add thinking budget for 2.5 models
+            if thinking_budget:
+                generation_config.thinking_budget = thinking_budget
+            
+            model = loop_models[model_key] = genai.GenerativeModel(
+                model_name,
+                generation_config=generation_config
+            )
+        
+        return model
+    
     def _create_error_response(self, error_message: str, error_code: str) -> str:
         """Creates standardized error response in JSON format."""
         return json.dumps({
@@ -258,7 +333,7 @@ class LLMGateway:
         
         try:
             parsed = json.loads(response)
-            logger.debug("Structured response parsed successfully", schema_keys=list(response_schema.get("properties", {}).keys()))
+            logger.debug("Structured response parsed successfully", schema_title=response_schema.get("title"))
             return parsed
         except json.JSONDecodeError as e:
             logger.error("Failed to parse structured response", response=response[:500], error=str(e))
@@ -318,6 +393,7 @@ class LLMGateway:
             "success_rate": round(success_rate, 3),
             "total_input_tokens": self.metrics.total_tokens_input,
             "total_output_tokens": self.metrics.total_tokens_output,
+            "cache_hits": self.metrics.cache_hits,
             "estimated_cost_usd": self._estimate_cost()
         }
     
@@ -340,13 +416,13 @@ class LLMGateway:
         test_prompt = "Respond with exactly: {'status': 'healthy', 'timestamp': '<current_timestamp>'}"
         
         try:
-            start_time = asyncio.get_event_loop().time()
+            start_time = time.perf_counter()
             response = await self.generate(
                 prompt=test_prompt,
                 purpose="fast_evaluation",
                 temperature=0.0
             )
-            end_time = asyncio.get_event_loop().time()
+            end_time = time.perf_counter()
             
             # Try to parse response
             parsed = json.loads(response)
@@ -0,0 +1,69 @@
+# src/tools/llm_response_cache.py
+"""
+Persistent exact-match cache for LLM responses.
+Lets repeated runs (e.g. integration tests in CI) skip identical LLM round-trips.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed cache of LLM responses keyed on model, generation settings and prompt.
+
+    Only exact prompt matches are served from the cache, so a hit always
+    returns the response the same request produced earlier.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info("LLM response cache opened", path=str(self.path), ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, response_mime_type: str,
+                 thinking_budget: Optional[int], prompt: str) -> str:
+        """Builds a stable cache key for one generation request."""
+        payload = json.dumps(
+            [model, temperature, response_mime_type, thinking_budget, prompt],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response, or None if missing or expired."""
+        row = self._conn.execute(
+            "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        response, created_at = row
+        if self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds:
+            return None
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Stores a response, replacing any earlier entry for the key."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, time.time())
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
@@ -13,7 +13,7 @@ class OrchestratedDocumentGenerator:
     
     def __init__(self, output_dir: str = "procurement_documents"):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_from_context(self, orchestration_context: Dict[str, Any]) -> str:
         """
@@ -84,19 +84,19 @@ class OrchestratedDocumentGenerator:
         
         # Header
         lines.extend([
-            f"# 📋 Samlet Anskaffelsesnotat",
-            f"",
+            "# 📋 Samlet Anskaffelsesnotat",
+            "",
             f"**Generert:** {timestamp.strftime('%d.%m.%Y kl. %H:%M')}",
-            f"**Type:** Komplett vurdering (Triage + Oslomodell + Miljøkrav)",
-            f"",
-            f"---",
-            f""
+            "**Type:** Komplett vurdering (Triage + Oslomodell + Miljøkrav)",
+            "",
+            "---",
+            ""
         ])
         
         # Executive Summary
         lines.extend([
-            f"## 📊 Sammendrag",
-            f""
+            "## 📊 Sammendrag",
+            ""
         ])
         
         # Triage status
@@ -120,40 +120,40 @@ class OrchestratedDocumentGenerator:
         
         # Seksjon 1: Anskaffelsesinformasjon
         lines.extend([
-            f"## 1. Anskaffelsesinformasjon",
-            f"",
-            f"### Grunndata",
+            "## 1. Anskaffelsesinformasjon",
+            "",
+            "### Grunndata",
             f"**ID:** {procurement.get('id', 'Ikke oppgitt')}",
             f"**Navn:** {procurement.get('name', 'Ikke oppgitt')}",
             f"**Verdi:** {procurement.get('value', 0):,} NOK ekskl. mva",
             f"**Kategori:** {procurement.get('category', 'Ikke spesifisert')}",
             f"**Varighet:** {procurement.get('duration_months', 0)} måneder",
-            f"",
-            f"**Beskrivelse:**",
+            "",
+            "**Beskrivelse:**",
             f"> {procurement.get('description', 'Ingen beskrivelse oppgitt')}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 2: Triage-vurdering
         if triage:
             lines.extend([
-                f"## 2. Triage-vurdering",
-                f"",
+                "## 2. Triage-vurdering",
+                "",
                 f"### Klassifisering: {triage.get('color', 'UKJENT')}",
-                f"",
+                "",
                 f"**Begrunnelse:** {triage.get('reasoning', 'Ikke oppgitt')}",
-                f"",
+                "",
                 f"**Konfidens:** {triage.get('confidence', 0)*100:.0f}%",
-                f""
+                ""
             ])
             
             risk_factors = triage.get('risk_factors', [])
             if risk_factors:
                 lines.extend([
-                    f"### Risikofaktorer:",
-                    f""
+                    "### Risikofaktorer:",
+                    ""
                 ])
                 for factor in risk_factors:
                     lines.append(f"- {factor}")
@@ -164,13 +164,13 @@ class OrchestratedDocumentGenerator:
         # Seksjon 3: Oslomodell-vurdering
         if oslomodell:
             lines.extend([
-                f"## 3. Oslomodell-vurdering",
-                f"",
-                f"### Arbeidslivskriminalitet",
+                "## 3. Oslomodell-vurdering",
+                "",
+                "### Arbeidslivskriminalitet",
                 f"**Risikonivå:** {oslomodell.get('vurdert_risiko_for_akrim', 'ukjent').upper()}",
-                f"",
+                "",
                 f"### Seriøsitetskrav ({len(oslomodell.get('påkrevde_seriøsitetskrav', []))} stk)",
-                f""
+                ""
             ])
             
             krav = oslomodell.get('påkrevde_seriøsitetskrav', [])
@@ -180,19 +180,19 @@ class OrchestratedDocumentGenerator:
             
             # Underleverandører
             lines.extend([
-                f"### Underleverandører",
+                "### Underleverandører",
                 f"**Maks antall ledd:** {oslomodell.get('anbefalt_antall_underleverandørledd', 2)}",
-                f""
+                ""
             ])
             
             # Lærlinger
             apprentice = oslomodell.get('krav_om_lærlinger', {})
             if apprentice:
                 lines.extend([
-                    f"### Lærlinger",
+                    "### Lærlinger",
                     f"**Status:** {'Påkrevd' if apprentice.get('status') else 'Ikke påkrevd'}",
                     f"**Begrunnelse:** {apprentice.get('begrunnelse', 'Ikke vurdert')}",
-                    f""
+                    ""
                 ])
             
             lines.extend(["---", ""])
@@ -200,14 +200,14 @@ class OrchestratedDocumentGenerator:
         # Seksjon 4: Miljøvurdering
         if environmental:
             lines.extend([
-                f"## 4. Miljøvurdering",
-                f"",
-                f"### Miljørisiko",
+                "## 4. Miljøvurdering",
+                "",
+                "### Miljørisiko",
                 f"**Nivå:** {environmental.get('environmental_risk_level', 'ukjent').upper()}",
-                f"",
-                f"### Standard miljøkrav",
+                "",
+                "### Standard miljøkrav",
                 f"**Gjelder:** {'JA' if environmental.get('standard_miljokrav_applies') else 'NEI'}",
-                f""
+                ""
             ])
             
             # Transportkrav
@@ -215,7 +215,7 @@ class OrchestratedDocumentGenerator:
             if transport_reqs:
                 lines.extend([
                     f"### Transportkrav ({len(transport_reqs)} stk)",
-                    f""
+                    ""
                 ])
                 for req in transport_reqs:
                     lines.append(f"- {req.get('requirement_type', 'Ukjent')}: {req.get('vehicle_class', 'Alle')}")
@@ -225,8 +225,8 @@ class OrchestratedDocumentGenerator:
         
         # Seksjon 5: Samlet kravliste
         lines.extend([
-            f"## 5. Samlet kravliste",
-            f""
+            "## 5. Samlet kravliste",
+            ""
         ])
         
         all_requirements = []
@@ -250,8 +250,8 @@ class OrchestratedDocumentGenerator:
         
         if all_requirements:
             lines.extend([
-                f"| Type | Kode | Kilde |",
-                f"|------|------|-------|"
+                "| Type | Kode | Kilde |",
+                "|------|------|-------|"
             ])
             for req in all_requirements:
                 lines.append(f"| {req['type']} | {req['kode']} | {req['kilde']} |")
@@ -264,8 +264,8 @@ class OrchestratedDocumentGenerator:
         
         # Seksjon 6: Anbefalinger
         lines.extend([
-            f"## 6. Samlede anbefalinger",
-            f""
+            "## 6. Samlede anbefalinger",
+            ""
         ])
         
         all_recommendations = []
@@ -291,39 +291,39 @@ class OrchestratedDocumentGenerator:
         
         # Seksjon 7: Handlingsplan
         lines.extend([
-            f"## 7. Handlingsplan",
-            f"",
-            f"### Umiddelbare tiltak",
-            f"- [ ] Gjennomgå alle identifiserte krav",
-            f"- [ ] Utarbeide konkurransegrunnlag",
-            f"- [ ] Planlegge markedsdialog hvis nødvendig",
-            f"",
-            f"### Før kontraktsinngåelse",
-            f"- [ ] Verifisere leverandørdokumentasjon",
-            f"- [ ] Gjennomføre prekvalifisering",
-            f"- [ ] Etablere kontrollrutiner",
-            f"",
-            f"### Under kontraktsperioden",
-            f"- [ ] Månedlig rapportering",
-            f"- [ ] Kvartalsvise kontroller",
-            f"- [ ] Årlig evaluering",
-            f"",
-            f"---",
-            f""
+            "## 7. Handlingsplan",
+            "",
+            "### Umiddelbare tiltak",
+            "- [ ] Gjennomgå alle identifiserte krav",
+            "- [ ] Utarbeide konkurransegrunnlag",
+            "- [ ] Planlegge markedsdialog hvis nødvendig",
+            "",
+            "### Før kontraktsinngåelse",
+            "- [ ] Verifisere leverandørdokumentasjon",
+            "- [ ] Gjennomføre prekvalifisering",
+            "- [ ] Etablere kontrollrutiner",
+            "",
+            "### Under kontraktsperioden",
+            "- [ ] Månedlig rapportering",
+            "- [ ] Kvartalsvise kontroller",
+            "- [ ] Årlig evaluering",
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 8: Metadata
         lines.extend([
-            f"## 8. Metadata",
-            f"",
-            f"### Vurderinger gjennomført:",
+            "## 8. Metadata",
+            "",
+            "### Vurderinger gjennomført:",
             f"- Triage: {'✅' if triage else '❌'}",
             f"- Oslomodell: {'✅' if oslomodell else '❌'}",
             f"- Miljøkrav: {'✅' if environmental else '❌'}",
-            f"",
-            f"**Dokumentversjon:** 1.0",
-            f"**Status:** KOMPLETT",
-            f"**Generert av:** Orchestrated Document Generator"
+            "",
+            "**Dokumentversjon:** 1.0",
+            "**Status:** KOMPLETT",
+            "**Generert av:** Orchestrated Document Generator"
         ])
         
         return "\n".join(lines)
\ No newline at end of file
@@ -16,7 +16,7 @@ class OslomodelDocumentGenerator:
     
     def __init__(self, output_dir: str = "procurement_documents"):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_document(self, procurement_data: ProcurementRequest, 
                          oslomodell_result: OslomodellAssessmentResult) -> str:
@@ -58,29 +58,29 @@ class OslomodelDocumentGenerator:
         
         # Header
         lines.extend([
-            f"# Anskaffelsesnotat - Oslomodellen",
-            f"",
+            "# Anskaffelsesnotat - Oslomodellen",
+            "",
             f"**Generert:** {timestamp.strftime('%d.%m.%Y kl. %H:%M')}",
             f"**Anskaffelses-ID:** {procurement.id}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 1: Anskaffelsesinformasjon
         lines.extend([
-            f"## 1. Anskaffelsesinformasjon",
-            f"",
+            "## 1. Anskaffelsesinformasjon",
+            "",
             f"**Navn:** {procurement.name}",
             f"**Verdi:** {procurement.value:,} NOK ekskl. mva",
             f"**Kategori:** {procurement.category.value}",
             f"**Varighet:** {procurement.duration_months} måneder",
-            f"",
-            f"**Beskrivelse:**",
+            "",
+            "**Beskrivelse:**",
             f"> {procurement.description or 'Ingen beskrivelse oppgitt'}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 2: Risikovurdering
@@ -88,26 +88,26 @@ class OslomodelDocumentGenerator:
         risk_emoji = {"høy": "🔴", "moderat": "🟡", "lav": "🟢"}.get(risk_level.lower(), "⚪")
         
         lines.extend([
-            f"## 2. Risikovurdering",
-            f"",
+            "## 2. Risikovurdering",
+            "",
             f"**Vurdert risiko for arbeidslivskriminalitet:** {risk_emoji} **{risk_level.upper()}**",
             f"**Risiko for sosial dumping:** {assessment.social_dumping_risk.upper()}",
             f"**Risiko for brudd på menneskerettigheter:** {assessment.dd_risk_assessment.upper()}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 3: Påkrevde seriøsitetskrav
         required_reqs = assessment.required_requirements
         lines.extend([
-            f"## 3. Påkrevde seriøsitetskrav",
-            f"",
+            "## 3. Påkrevde seriøsitetskrav",
+            "",
             f"**Antall krav:** {len(required_reqs)} stk",
-            f"**Hjemmel:** Instruks for Oslo kommunes anskaffelser, punkt 4",
-            f"",
-            f"### Kravliste:",
-            f""
+            "**Hjemmel:** Instruks for Oslo kommunes anskaffelser, punkt 4",
+            "",
+            "### Kravliste:",
+            ""
         ])
         
         for req in sorted(required_reqs, key=lambda r: r.code):
@@ -118,47 +118,47 @@ class OslomodelDocumentGenerator:
         
         # Seksjon 4: Underleverandørbegrensninger
         lines.extend([
-            f"## 4. Underleverandørbegrensninger",
-            f"",
+            "## 4. Underleverandørbegrensninger",
+            "",
             f"**Maksimalt antall ledd:** {assessment.subcontractor_levels}",
-            f"**Hjemmel:** Instruks punkt 5",
-            f"",
-            f"### Begrunnelse:",
+            "**Hjemmel:** Instruks punkt 5",
+            "",
+            "### Begrunnelse:",
             f"> {assessment.subcontractor_justification}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 5: Lærlingkrav
         apprentice_req = assessment.apprenticeship_requirement
         lines.extend([
-            f"## 5. Lærlingkrav",
-            f"",
+            "## 5. Lærlingkrav",
+            "",
             f"**Status:** {'Påkrevd' if apprentice_req.required else 'Ikke påkrevd'}",
             f"**Begrunnelse:** {apprentice_req.reason}",
             f"**Minimum antall:** {apprentice_req.minimum_count}",
             f"**Relevante fag:** {', '.join(apprentice_req.applicable_trades) or 'N/A'}",
-            f"",
-            f"---",
-            f""
+            "",
+            "---",
+            ""
         ])
         
         # Seksjon 6: Aktsomhetsvurdering
         dd_requirement = assessment.due_diligence_requirement or 'Ikke påkrevd'
         lines.extend([
-            f"## 6. Aktsomhetsvurdering",
-            f"",
+            "## 6. Aktsomhetsvurdering",
+            "",
             f"**Kravsett:** {dd_requirement}",
-            f"**Hjemmel:** Instruks punkt 7",
-            f""
+            "**Hjemmel:** Instruks punkt 7",
+            ""
         ])
         
         if dd_requirement != "Ikke påkrevd":
             lines.extend([
-                f"### Krav om aktsomhetsvurdering:",
+                "### Krav om aktsomhetsvurdering:",
                 f"Leverandør må gjennomføre aktsomhetsvurdering iht. kravsett {dd_requirement}.",
-                f""
+                ""
             ])
         
         lines.extend(["---", ""])
@@ -166,8 +166,8 @@ class OslomodelDocumentGenerator:
         # Seksjon 7: Anbefalinger
         if assessment.recommendations:
             lines.extend([
-                f"## 7. Anbefalinger",
-                f""
+                "## 7. Anbefalinger",
+                ""
             ])
             for rec in assessment.recommendations:
                 lines.append(f"- {rec}")
@@ -175,39 +175,39 @@ class OslomodelDocumentGenerator:
         
         # Seksjon 8: Oppfølgingspunkter
         lines.extend([
-            f"## 8. Oppfølgingspunkter",
-            f"",
-            f"### Før kontraktsinngåelse:",
-            f"- [ ] Verifiser alle seriøsitetskrav",
-            f"- [ ] Gjennomfør prekvalifisering",
-            f"- [ ] Kontroller underleverandører",
-            f""
+            "## 8. Oppfølgingspunkter",
+            "",
+            "### Før kontraktsinngåelse:",
+            "- [ ] Verifiser alle seriøsitetskrav",
+            "- [ ] Gjennomfør prekvalifisering",
+            "- [ ] Kontroller underleverandører",
+            ""
         ])
         
         if apprentice_req.required:
             lines.extend([
-                f"### Lærlingoppfølging:",
-                f"- [ ] Avklar lærlingbehov med leverandør",
-                f"- [ ] Etabler oppfølgingsrutiner for lærlinger",
-                f""
+                "### Lærlingoppfølging:",
+                "- [ ] Avklar lærlingbehov med leverandør",
+                "- [ ] Etabler oppfølgingsrutiner for lærlinger",
+                ""
             ])
         
         lines.extend([
-            f"### Under kontraktsperioden:",
-            f"- [ ] Månedlig rapportering HMSREG (hvis relevant)",
-            f"- [ ] Kvartalsvis kontroll av lønns- og arbeidsvilkår",
-            f"- [ ] Stedlige kontroller ved behov",
-            f"",
-            f"---",
-            f"",
-            f"## 9. Metadata",
-            f"",
+            "### Under kontraktsperioden:",
+            "- [ ] Månedlig rapportering HMSREG (hvis relevant)",
+            "- [ ] Kvartalsvis kontroll av lønns- og arbeidsvilkår",
+            "- [ ] Stedlige kontroller ved behov",
+            "",
+            "---",
+            "",
+            "## 9. Metadata",
+            "",
             f"**Vurdert av:** {assessment.assessed_by}",
             f"**Vurderingstidspunkt:** {assessment.assessment_date}",
             f"**Konfidens:** {assessment.confidence*100:.0f}%",
             f"**Kilder brukt:** {', '.join(assessment.context_documents_used) or 'Ingen'}",
-            f"**Dokumentversjon:** 1.0",
-            f"**Status:** UTKAST"
+            "**Dokumentversjon:** 1.0",
+            "**Status:** UTKAST"
         ])
         
         return "\n".join(lines)
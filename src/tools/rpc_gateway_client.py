@@ -1,9 +1,12 @@
 # tools/rpc_gateway_client.py
+import asyncio
 import httpx
+import orjson
 import structlog
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from pydantic import BaseModel
 import os
+import weakref
 from dotenv import load_dotenv
 
 # Assuming models are now in a central place
@@ -12,6 +15,10 @@ from src.models.procurement_models import TriageResult, ProcurementRequest
 load_dotenv()
 logger = structlog.get_logger()
 
+# Gateway URLs whose health has already been verified in this process.
+# The health probe only needs to run on the first client entry per gateway.
+_HEALTH_CHECKED: set = set()
+
 class RPCError(Exception):
     def __init__(self, code: int, message: str, data: Optional[Any] = None):
         self.code = code
@@ -19,7 +26,22 @@ class RPCError(Exception):
         self.data = data
         super().__init__(f"RPC Error {code}: {message}")
 
+class RPCBatchError(RPCError):
+    """
+    Raised by call_batch when one or more calls in the batch failed.
+    `results` has one entry per call, in order: the result, or the RPCError for a failed call.
+    """
+    def __init__(self, results: List[Any]):
+        self.results = results
+        self.errors = [result for result in results if isinstance(result, RPCError)]
+        first = self.errors[0]
+        super().__init__(code=first.code,
+                         message=f"{len(self.errors)} of {len(results)} batch calls failed; first: {first.message}",
+                         data=first.data)
+
 class RPCGatewayClient:
+    _json_headers = {"Content-Type": "application/json"}
+
     def __init__(self, agent_id: str, **kwargs):
         base_url = kwargs.get("base_url") or kwargs.get("gateway_url")
         self.base_url = base_url or os.getenv("RPC_GATEWAY_URL", "http://localhost:8000")
@@ -30,10 +52,18 @@ class RPCGatewayClient:
     
     async def __aenter__(self):
         await self.client.__aenter__()
+        if self.base_url in _HEALTH_CHECKED:
+            return self
         try:
             health = await self.client.get("/health")
             if health.json().get("database") != "healthy":
                 logger.warning("Gateway database not healthy", health=health.json())
+            else:
+                _HEALTH_CHECKED.add(self.base_url)
+        except asyncio.CancelledError:
+            # __aexit__ is not called when __aenter__ fails, so release the client here
+            await self.client.aclose()
+            raise
         except Exception as e:
             logger.error("Failed to check gateway health", error=str(e))
         return self
@@ -46,9 +76,9 @@ class RPCGatewayClient:
         request_data = {"jsonrpc": "2.0", "method": method, "params": params or {}, "id": self._request_id}
         logger.info("Making RPC call", method=method, request_id=self._request_id)
         try:
-            response = await self.client.post("/rpc", json=request_data)
+            response = await self.client.post("/rpc", content=orjson.dumps(request_data), headers=self._json_headers)
             response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             if result.get("error") is not None:
                 error = result["error"]
                 raise RPCError(code=error.get("code", -1), message=error.get("message", "Unknown error"), data=error.get("data"))
@@ -61,14 +91,49 @@ class RPCGatewayClient:
             logger.error("Unexpected error during RPC call", method=method, error=str(e), exc_info=True)
             raise
 
+    async def call_batch(self, calls: List[Tuple[str, Optional[Dict[str, Any]]]]) -> List[Any]:
+        """
+        Sends several calls in one JSON-RPC batch request (one HTTP round trip).
+        Returns the results in the same order as `calls`. If any call failed, raises RPCBatchError,
+        whose `results` still holds the results of the calls that succeeded.
+        """
+        if not calls:
+            return []
+        request_data = []
+        for method, params in calls:
+            self._request_id += 1
+            request_data.append({"jsonrpc": "2.0", "method": method, "params": params or {}, "id": self._request_id})
+        logger.info("Making RPC batch call", calls=len(request_data))
+        try:
+            response = await self.client.post("/rpc/batch", content=orjson.dumps(request_data), headers=self._json_headers)
+            response.raise_for_status()
+            results = []
+            failed = 0
+            for result in orjson.loads(response.content):
+                error = result.get("error")
+                if error is not None:
+                    failed += 1
+                    results.append(RPCError(code=error.get("code", -1), message=error.get("message", "Unknown error"), data=error.get("data")))
+                else:
+                    results.append(result.get("result"))
+            if failed:
+                logger.error("RPC batch call had failures", calls=len(results), failed=failed)
+                raise RPCBatchError(results)
+            logger.info("RPC batch call successful", calls=len(results))
+            return results
+        except httpx.HTTPError as e:
+            logger.error("HTTP error during RPC batch call", error=str(e))
+            raise
+
     # --- New, refactored convenience methods ---
 
     async def create_procurement(self, request: ProcurementRequest) -> Dict[str, Any]:
         params = {"name": request.name, "value": request.value, "description": request.description}
         return await self.call("database.create_procurement", params)
 
-    async def save_triage_result(self, procurement_id: str, triage_result: TriageResult) -> Dict[str, Any]:
-        params = {
+    @staticmethod
+    def _triage_result_params(procurement_id: str, triage_result: TriageResult) -> Dict[str, Any]:
+        return {
             "procurementId": procurement_id,
             "color": triage_result.color.value,  # Use enum value
             "reasoning": triage_result.reasoning,
@@ -78,8 +143,17 @@ class RPCGatewayClient:
             "requiresSpecialAttention": triage_result.requires_special_attention,
             "escalationRecommended": triage_result.escalation_recommended
         }
+
+    async def save_triage_result(self, procurement_id: str, triage_result: TriageResult) -> Dict[str, Any]:
+        params = self._triage_result_params(procurement_id, triage_result)
         return await self.call("database.save_triage_result", params)
 
+    async def save_triage_results(self, results: List[Tuple[str, TriageResult]]) -> List[Dict[str, Any]]:
+        """Saves several triage results in a single batch round trip (see call_batch for partial failures)."""
+        calls = [("database.save_triage_result", self._triage_result_params(procurement_id, triage_result))
+                 for procurement_id, triage_result in results]
+        return await self.call_batch(calls)
+
     async def set_procurement_status(self, procurement_id: str, status: str) -> Dict[str, Any]:
         params = {"procurementId": procurement_id, "status": status}
         return await self.call("database.set_procurement_status", params)
@@ -87,3 +161,47 @@ class RPCGatewayClient:
     async def save_protocol(self, procurement_id: str, protocol_content: str, confidence: float) -> Dict[str, Any]:
         params = {"procurementId": procurement_id, "protocolContent": protocol_content, "confidence": confidence}
         return await self.call("database.save_protocol", params)
+
+
+# Long-lived clients shared per event loop, then per (agent_id, base_url), within the process.
+# httpx connections and asyncio locks are bound to the loop they were created on,
+# so every running loop gets its own clients and its own creation lock. Both maps are
+# weakly keyed by loop, and clients of loops that have been closed are dropped on the next lookup.
+_SHARED_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], RPCGatewayClient]]" = weakref.WeakKeyDictionary()
+_SHARED_CLIENTS_LOCKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+def _drop_closed_loops() -> None:
+    """Forgets clients and locks of loops that were closed without close_shared_clients()."""
+    for loop in [loop for loop in _SHARED_CLIENTS if loop.is_closed()]:
+        del _SHARED_CLIENTS[loop]
+    for loop in [loop for loop in _SHARED_CLIENTS_LOCKS if loop.is_closed()]:
+        del _SHARED_CLIENTS_LOCKS[loop]
+
+async def get_shared_client(agent_id: str, base_url: Optional[str] = None) -> RPCGatewayClient:
+    """
+    Returns an already-entered RPCGatewayClient that is reused across callers on the running loop.
+    Connection setup and the health probe only happen on first use.
+    Call close_shared_clients() before the event loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    base_url = base_url or os.getenv("RPC_GATEWAY_URL", "http://localhost:8000")
+    key = (agent_id, base_url)
+    clients = _SHARED_CLIENTS.get(loop)
+    client = clients.get(key) if clients is not None else None
+    if client is None:
+        _drop_closed_loops()
+        lock = _SHARED_CLIENTS_LOCKS.get(loop)
+        if lock is None:
+            lock = _SHARED_CLIENTS_LOCKS[loop] = asyncio.Lock()
+        async with lock:
+            clients = _SHARED_CLIENTS.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = await RPCGatewayClient(agent_id, base_url=base_url).__aenter__()
+    return client
+
+async def close_shared_clients() -> None:
+    """Closes the clients that get_shared_client() handed out on the running loop."""
+    clients = _SHARED_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.__aexit__(None, None, None)
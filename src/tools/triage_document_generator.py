@@ -2,244 +2,251 @@
 """
 Triage Document Generator - Genererer strukturerte notater for triage-vurderinger.
 """
+import io
 import json
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+# Faste tekstblokker for seksjon 5-7. Hver blokk slutter med linjeskift
+# slik at de kan settes rett inn i dokumentmalen.
+SPECIAL_ATTENTION_BLOCK = "⚠️ **KREVER SPESIELL OPPMERKSOMHET**\n\n"
+ESCALATION_BLOCK = (
+    "⚠️ **ESKALERING ANBEFALES**\n"
+    "\n"
+    "Denne anskaffelsen bør gjennomgås av overordnet nivå.\n"
+    "\n"
+)
+NO_SPECIAL_CONSIDERATIONS_BLOCK = "Ingen spesielle hensyn identifisert.\n"
+
+PROCESS_GREEN = (
+    "### Forenklet prosess\n"
+    "- Direkte anskaffelse kan gjennomføres\n"
+    "- Minimale kontrollkrav\n"
+    "- Standard dokumentasjon\n"
+)
+PROCESS_YELLOW = (
+    "### Standard prosess\n"
+    "- Konkurranseutsetting anbefales\n"
+    "- Standard seriøsitetskrav (A-E)\n"
+    "- Vurder ytterligere krav ved behov\n"
+    "- Normal oppfølging og kontroll\n"
+)
+PROCESS_RED = (
+    "### Omfattende prosess\n"
+    "- Full konkurranseutsetting påkrevd\n"
+    "- Alle relevante seriøsitetskrav må vurderes\n"
+    "- Grundig prekvalifisering av leverandører\n"
+    "- Tett oppfølging under kontraktsperioden\n"
+    "- Vurder ekstern bistand ved behov\n"
+)
+
+CHECKLIST_GREEN = (
+    "- [ ] Verifiser at verdi er under 100.000 kr\n"
+    "- [ ] Dokumenter anskaffelsen\n"
+    "- [ ] Innhent tilbud fra minst én leverandør\n"
+)
+CHECKLIST_YELLOW = (
+    "- [ ] Gjennomfør markedsundersøkelse\n"
+    "- [ ] Utarbeid konkurransegrunnlag\n"
+    "- [ ] Fastsett evalueringskriterier\n"
+    "- [ ] Vurder behov for seriøsitetskrav\n"
+    "- [ ] Planlegg kontraktsoppfølging\n"
+)
+CHECKLIST_RED = (
+    "- [ ] Gjennomfør full Oslomodell-vurdering\n"
+    "- [ ] Vurder miljøkrav\n"
+    "- [ ] Utarbeid detaljert konkurransegrunnlag\n"
+    "- [ ] Etabler evalueringskomité\n"
+    "- [ ] Planlegg prekvalifisering\n"
+    "- [ ] Forbered kontraktsoppfølgingsplan\n"
+    "- [ ] Vurder behov for ekstern bistand\n"
+)
+
+# Faste overskrifter for de valgfrie seksjonene 3 og 4
+RISK_SECTION_HEADER = "## 3. Identifiserte risikofaktorer\n\n"
+MITIGATION_SECTION_HEADER = "## 4. Anbefalte risikoreduserende tiltak\n\n"
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+COLOR_EMOJI = {"GRØNN": "🟢", "GUL": "🟡", "RØD": "🔴"}
+PROCESS_BLOCKS = {"GRØNN": PROCESS_GREEN, "GUL": PROCESS_YELLOW, "RØD": PROCESS_RED}
+CHECKLIST_BLOCKS = {"GRØNN": CHECKLIST_GREEN, "GUL": CHECKLIST_YELLOW, "RØD": CHECKLIST_RED}
+
+# Skrivebuffer for dokumentfiler; et helt notat får normalt plass i ett flush
+WRITE_BUFFER_SIZE = 131072
+
+SUMMARY_TABLE_HEADER = (
+    "| Anskaffelse | Verdi (NOK) | Klassifisering | Konfidens | Eskalering |\n"
+    "|-------------|-------------|----------------|-----------|------------|"
+)
+# Ferdig bundet format-metode for tabellrader; `.30` kutter navnet uten utfylling
+SUMMARY_ROW_FORMAT = "| {name:.30} | {value:,} | {color} | {confidence:.0f}% | {escalation} |".format
+
+@lru_cache(maxsize=8)
+def _format_timestamp(timestamp: datetime) -> Tuple[str, str]:
+    """Returnerer (filnavn-suffiks, visningstekst) for et tidspunkt, formatert én gang."""
+    return timestamp.strftime('%Y%m%d_%H%M%S'), timestamp.strftime('%d.%m.%Y kl. %H:%M')
 
 class TriageDocumentGenerator:
     """Genererer markdown-dokumenter for triage-vurderinger."""
     
     def __init__(self, output_dir: str = "procurement_documents"):
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
     
     def generate_document(self, procurement_data: Dict[str, Any], 
-                         triage_result: Dict[str, Any]) -> str:
+                         triage_result: Dict[str, Any],
+                         timestamp: Optional[datetime] = None,
+                         batch_index: Optional[int] = None) -> str:
         """
         Genererer triage-notat.
         
         Args:
             procurement_data: Data om anskaffelsen
             triage_result: Resultat fra triage-vurdering
+            timestamp: Genereringstidspunkt (standard: nå)
+            batch_index: Løpenummer i en batch; legges til filnavnet så dokumenter
+                med samme id (eller uten id) og felles tidspunkt ikke overskriver hverandre
             
         Returns:
             Filsti til generert dokument
         """
-        timestamp = datetime.now()
-        doc_id = f"triage_{procurement_data.get('id', 'unknown')}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
-        
-        # Generer markdown-innhold
-        content = self._generate_markdown_content(
-            procurement_data, 
-            triage_result,
-            timestamp
-        )
+        timestamp = timestamp or datetime.now()
+        doc_id = f"triage_{procurement_data.get('id', 'unknown')}_{_format_timestamp(timestamp)[0]}"
+        if batch_index is not None:
+            doc_id = f"{doc_id}_{batch_index:03d}"
         
         # Lagre dokument
         filename = f"{doc_id}.md"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Katalogen kan være slettet (eller cwd endret) siden __init__; mkdir er billig når den finnes
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Skriv markdown-innholdet seksjon for seksjon rett til en bufret fil
+        with open(filepath, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER_SIZE) as f:
+            self._write_markdown_content(f, procurement_data, triage_result, timestamp)
         
         return str(filepath)
     
+    def generate_documents(self, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> List[str]:
+        """
+        Genererer triage-notater for flere anskaffelser.
+        
+        Args:
+            batch: Liste med (procurement_data, triage_result)-par
+            
+        Returns:
+            Filstier til genererte dokumenter, i samme rekkefølge
+        """
+        # Felles tidspunkt for hele batchen; løpenummeret holder filnavnene unike
+        timestamp = datetime.now()
+        return [
+            self.generate_document(procurement_data, triage_result, timestamp, batch_index=index)
+            for index, (procurement_data, triage_result) in enumerate(batch)
+        ]
+    
     def _generate_markdown_content(self, procurement: Dict[str, Any], 
                                   triage: Dict[str, Any],
                                   timestamp: datetime) -> str:
         """Genererer markdown-innhold for triage-dokumentet."""
+        buffer = io.StringIO()
+        self._write_markdown_content(buffer, procurement, triage, timestamp)
+        return buffer.getvalue()
+    
+    def _write_markdown_content(self, f, procurement: Dict[str, Any], 
+                                triage: Dict[str, Any],
+                                timestamp: datetime) -> None:
+        """Skriver markdown-innholdet for triage-dokumentet til en åpen tekststrøm."""
         
-        lines = []
-        
-        # Header
-        lines.extend([
-            f"# Triage-vurdering",
-            f"",
-            f"**Generert:** {timestamp.strftime('%d.%m.%Y kl. %H:%M')}",
-            f"",
-            f"---",
-            f""
-        ])
-        
-        # Seksjon 1: Anskaffelsesinformasjon
-        lines.extend([
-            f"## 1. Anskaffelsesinformasjon",
-            f"",
-            f"**ID:** {procurement.get('id', 'Ikke oppgitt')}",
-            f"**Navn:** {procurement.get('name', 'Ikke oppgitt')}",
-            f"**Verdi:** {procurement.get('value', 0):,} NOK ekskl. mva",
-            f"**Kategori:** {procurement.get('category', 'Ikke spesifisert')}",
-            f"**Varighet:** {procurement.get('duration_months', 0)} måneder",
-            f"",
-            f"**Beskrivelse:**",
-            f"> {procurement.get('description', 'Ingen beskrivelse oppgitt')}",
-            f"",
-            f"---",
-            f""
-        ])
-        
-        # Seksjon 2: Triage-klassifisering
         color = triage.get('color', 'UKJENT')
-        color_emoji = {"GRØNN": "🟢", "GUL": "🟡", "RØD": "🔴"}.get(color, "⚪")
+        color_emoji = COLOR_EMOJI.get(color, "⚪")
+        requires_attention = triage.get('requires_special_attention', False)
+        escalation = triage.get('escalation_recommended', False)
         
-        lines.extend([
-            f"## 2. Triage-klassifisering",
-            f"",
-            f"### Resultat: {color_emoji} **{color}**",
-            f"",
-            f"**Konfidens:** {triage.get('confidence', 0)*100:.0f}%",
-            f"",
-            f"### Begrunnelse:",
-            f"> {triage.get('reasoning', 'Ingen begrunnelse oppgitt')}",
-            f"",
-            f"---",
-            f""
-        ])
+        # Seksjon 1 og 2
+        f.write(f"""# Triage-vurdering
+
+**Generert:** {_format_timestamp(timestamp)[1]}
+
+---
+
+## 1. Anskaffelsesinformasjon
+
+**ID:** {procurement.get('id', 'Ikke oppgitt')}
+**Navn:** {procurement.get('name', 'Ikke oppgitt')}
+**Verdi:** {procurement.get('value', 0):,} NOK ekskl. mva
+**Kategori:** {procurement.get('category', 'Ikke spesifisert')}
+**Varighet:** {procurement.get('duration_months', 0)} måneder
+
+**Beskrivelse:**
+> {procurement.get('description', 'Ingen beskrivelse oppgitt')}
+
+---
+
+## 2. Triage-klassifisering
+
+### Resultat: {color_emoji} **{color}**
+
+**Konfidens:** {triage.get('confidence', 0)*100:.0f}%
+
+### Begrunnelse:
+> {triage.get('reasoning', 'Ingen begrunnelse oppgitt')}
+
+---
+
+""")
         
-        # Seksjon 3: Risikofaktorer
+        # Seksjon 3 og 4 tas bare med når det finnes innhold
         risk_factors = triage.get('risk_factors', [])
         if risk_factors:
-            lines.extend([
-                f"## 3. Identifiserte risikofaktorer",
-                f""
-            ])
-            for factor in risk_factors:
-                lines.append(f"- {factor}")
-            lines.extend(["", "---", ""])
+            f.write(RISK_SECTION_HEADER)
+            f.write("\n".join(f"- {factor}" for factor in risk_factors))
+            f.write(SECTION_SEPARATOR)
         
-        # Seksjon 4: Risikoreduserende tiltak
         mitigation = triage.get('mitigation_measures', [])
         if mitigation:
-            lines.extend([
-                f"## 4. Anbefalte risikoreduserende tiltak",
-                f""
-            ])
-            for measure in mitigation:
-                lines.append(f"- {measure}")
-            lines.extend(["", "---", ""])
+            f.write(MITIGATION_SECTION_HEADER)
+            f.write("\n".join(f"- {measure}" for measure in mitigation))
+            f.write(SECTION_SEPARATOR)
         
         # Seksjon 5: Spesielle hensyn
-        lines.extend([
-            f"## 5. Spesielle hensyn",
-            f""
-        ])
-        
-        if triage.get('requires_special_attention', False):
-            lines.extend([
-                f"⚠️ **KREVER SPESIELL OPPMERKSOMHET**",
-                f""
-            ])
-        
-        if triage.get('escalation_recommended', False):
-            lines.extend([
-                f"⚠️ **ESKALERING ANBEFALES**",
-                f"",
-                f"Denne anskaffelsen bør gjennomgås av overordnet nivå.",
-                f""
-            ])
-        
-        if not triage.get('requires_special_attention') and not triage.get('escalation_recommended'):
-            lines.append("Ingen spesielle hensyn identifisert.")
-        
-        lines.extend(["", "---", ""])
-        
-        # Seksjon 6: Videre prosess
-        lines.extend([
-            f"## 6. Anbefalt videre prosess",
-            f""
-        ])
-        
-        if color == "GRØNN":
-            lines.extend([
-                f"### Forenklet prosess",
-                f"- Direkte anskaffelse kan gjennomføres",
-                f"- Minimale kontrollkrav",
-                f"- Standard dokumentasjon"
-            ])
-        elif color == "GUL":
-            lines.extend([
-                f"### Standard prosess",
-                f"- Konkurranseutsetting anbefales",
-                f"- Standard seriøsitetskrav (A-E)",
-                f"- Vurder ytterligere krav ved behov",
-                f"- Normal oppfølging og kontroll"
-            ])
-        elif color == "RØD":
-            lines.extend([
-                f"### Omfattende prosess",
-                f"- Full konkurranseutsetting påkrevd",
-                f"- Alle relevante seriøsitetskrav må vurderes",
-                f"- Grundig prekvalifisering av leverandører",
-                f"- Tett oppfølging under kontraktsperioden",
-                f"- Vurder ekstern bistand ved behov"
-            ])
-        
-        lines.extend(["", "---", ""])
-        
-        # Seksjon 7: Sjekkliste
-        lines.extend([
-            f"## 7. Sjekkliste for videre arbeid",
-            f""
-        ])
-        
-        if color == "GRØNN":
-            lines.extend([
-                f"- [ ] Verifiser at verdi er under 100.000 kr",
-                f"- [ ] Dokumenter anskaffelsen",
-                f"- [ ] Innhent tilbud fra minst én leverandør"
-            ])
-        elif color == "GUL":
-            lines.extend([
-                f"- [ ] Gjennomfør markedsundersøkelse",
-                f"- [ ] Utarbeid konkurransegrunnlag",
-                f"- [ ] Fastsett evalueringskriterier",
-                f"- [ ] Vurder behov for seriøsitetskrav",
-                f"- [ ] Planlegg kontraktsoppfølging"
-            ])
-        elif color == "RØD":
-            lines.extend([
-                f"- [ ] Gjennomfør full Oslomodell-vurdering",
-                f"- [ ] Vurder miljøkrav",
-                f"- [ ] Utarbeid detaljert konkurransegrunnlag",
-                f"- [ ] Etabler evalueringskomité",
-                f"- [ ] Planlegg prekvalifisering",
-                f"- [ ] Forbered kontraktsoppfølgingsplan",
-                f"- [ ] Vurder behov for ekstern bistand"
-            ])
-        
-        lines.extend(["", "---", ""])
+        f.write("## 5. Spesielle hensyn\n\n")
+        if requires_attention:
+            f.write(SPECIAL_ATTENTION_BLOCK)
+        if escalation:
+            f.write(ESCALATION_BLOCK)
+        if not requires_attention and not escalation:
+            f.write(NO_SPECIAL_CONSIDERATIONS_BLOCK)
+        
+        # Seksjon 6 og 7 avhenger kun av fargen
+        f.write("\n---\n\n## 6. Anbefalt videre prosess\n\n")
+        f.write(PROCESS_BLOCKS.get(color, ""))
+        f.write("\n---\n\n## 7. Sjekkliste for videre arbeid\n\n")
+        f.write(CHECKLIST_BLOCKS.get(color, ""))
         
         # Seksjon 8: Metadata
-        lines.extend([
-            f"## 8. Metadata",
-            f"",
-            f"**Vurdert av:** {triage.get('assessed_by', 'triage_agent')}",
-            f"**Dokumentversjon:** 1.0",
-            f"**Status:** FERDIG",
-            f"**Triage-ID:** {triage.get('assessment_id', 'Ikke oppgitt')}"
-        ])
-        
-        return "\n".join(lines)
+        f.write(f"""
+---
+
+## 8. Metadata
+
+**Vurdert av:** {triage.get('assessed_by', 'triage_agent')}
+**Dokumentversjon:** 1.0
+**Status:** FERDIG
+**Triage-ID:** {triage.get('assessment_id', 'Ikke oppgitt')}""")
     
     def generate_summary_table(self, assessments: List[Dict[str, Any]]) -> str:
         """Genererer oppsummeringstabell for flere triage-vurderinger."""
-        lines = []
-        lines.extend([
-            "| Anskaffelse | Verdi (NOK) | Klassifisering | Konfidens | Eskalering |",
-            "|-------------|-------------|----------------|-----------|------------|"
-        ])
-        
-        for a in assessments:
-            proc = a.get('procurement', {})
-            triage = a.get('triage', {})
-            
-            name = proc.get('name', 'Ukjent')[:30]
-            value = f"{proc.get('value', 0):,}"
-            color = triage.get('color', 'UKJENT')
-            confidence = f"{triage.get('confidence', 0)*100:.0f}%"
-            escalation = "Ja" if triage.get('escalation_recommended', False) else "Nei"
-            
-            lines.append(f"| {name} | {value} | {color} | {confidence} | {escalation} |")
-        
-        return "\n".join(lines)
\ No newline at end of file
+        rows = (
+            SUMMARY_ROW_FORMAT(
+                name=proc.get('name', 'Ukjent'),
+                value=proc.get('value', 0),
+                color=triage.get('color', 'UKJENT'),
+                confidence=triage.get('confidence', 0) * 100,
+                escalation='Ja' if triage.get('escalation_recommended', False) else 'Nei',
+            )
+            for proc, triage in ((a.get('procurement', {}), a.get('triage', {})) for a in assessments)
+        )
+        return "\n".join((SUMMARY_TABLE_HEADER, *rows))
@@ -0,0 +1,65 @@
+# agent_result_cache.py
+"""
+Diskcache for agentresultater i integrasjonstestene.
+Gjentatte kjøringer med samme payload henter resultatet fra tests/.cache/
+i stedet for å kalle LLM-en på nytt.
+"""
+import hashlib
+import inspect
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_ROOT = Path(__file__).resolve().parent / ".cache"
+
+
+def cache_key(payload: Dict[str, Any], version: str) -> str:
+    """SHA-256 av kanonisk JSON for payload pluss cacheversjon."""
+    return hashlib.sha256(
+        (json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str) + version).encode("utf-8")
+    ).hexdigest()
+
+
+def agent_fingerprint(agent) -> str:
+    """
+    Fingeravtrykk av agentens kildekode (inkl. prompter) og LLM-modellene den bruker.
+    Endres agenten, prompten eller modellvalget, gir det en ny cachenøkkel.
+    """
+    try:
+        source = inspect.getsource(inspect.getmodule(type(agent)))
+    except (OSError, TypeError):
+        source = type(agent).__qualname__
+    model_map = getattr(getattr(agent, "llm_gateway", None), "model_map", None)
+    return hashlib.sha256(
+        (source + json.dumps(model_map, sort_keys=True, default=str)).encode("utf-8")
+    ).hexdigest()
+
+
+async def cached_execute(agent,
+                         payload: Dict[str, Any],
+                         namespace: str,
+                         version: str = "1",
+                         use_cache: bool = True,
+                         key_payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Kjør agenten, eller hent resultatet fra disk hvis samme payload er kjørt før
+    med samme agentkode, prompt og modell (se agent_fingerprint).
+
+    Args:
+        namespace: Undermappe under tests/.cache/, f.eks. "oslomodell"
+        version: Økes ved endringer som ikke fanges av agent_fingerprint
+        key_payload: Brukes som nøkkel i stedet for payload, f.eks. uten genererte id-er
+    """
+    if not use_cache:
+        return await agent.execute(payload)
+
+    cache_dir = CACHE_ROOT / namespace
+    cache_file = cache_dir / f"{cache_key(payload if key_payload is None else key_payload, version + agent_fingerprint(agent))}.json"
+
+    if cache_file.exists():
+        return json.loads(cache_file.read_text(encoding="utf-8"))
+
+    result = await agent.execute(payload)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(json.dumps(result, ensure_ascii=False, default=str), encoding="utf-8")
+    return result
@@ -87,4 +87,5 @@ async def test_database_orchestration():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    asyncio.run(test_database_orchestration())
\ No newline at end of file
+    from src.tools.event_loop import run
+    run(test_database_orchestration())
\ No newline at end of file
@@ -1,7 +1,11 @@
 # test_discovery.py - Kjør dette for å teste at discovery endpoint fungerer
 import httpx
 import asyncio
-import json
+import orjson
+
+def _dumps(obj) -> str:
+    """Pretty-printer JSON via orjson (kun 2-mellomroms innrykk støttes)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
 
 async def test_discovery():
     """Test discovery endpoint for reasoning_orchestrator"""
@@ -26,7 +30,7 @@ async def test_discovery():
                     print(f"   Type: {tool['service_type']}")
                     print(f"   Description: {tool['description']}")
                     if tool.get('input_schema'):
-                        print(f"   Input Schema: {json.dumps(tool['input_schema'], indent=4)}")
+                        print(f"   Input Schema: {_dumps(tool['input_schema'])}")
             else:
                 print(f"Error: {response.text}")
                 
@@ -40,7 +44,7 @@ async def test_health():
         try:
             response = await client.get("http://localhost:8000/health")
             print("\n=== Health Check ===")
-            print(json.dumps(response.json(), indent=2))
+            print(_dumps(response.json()))
         except Exception as e:
             print(f"Health check failed: {e}")
 
@@ -71,10 +71,11 @@ async def test_with_real_assessment():
         print("\n2️⃣ Kjører Oslomodell-vurdering...")
         
         procurement = ProcurementRequest(**test_case)
+        procurement_dict = procurement.model_dump()
         
         try:
             assessment = await oslomodell_agent.execute({
-                "procurement": procurement.model_dump()
+                "procurement": procurement_dict
             })
             
             print(f"✅ Vurdering fullført:")
@@ -87,7 +88,7 @@ async def test_with_real_assessment():
             print("\n3️⃣ Genererer dokument...")
             
             filepath = document_generator.generate_document(
-                procurement_data=procurement.model_dump(),
+                procurement_data=procurement_dict,
                 oslomodell_assessment=assessment,
                 additional_context={
                     "generated_by": "test_document_generation.py",
@@ -1,11 +1,20 @@
 # test_gateway.py (endelig versjon)
 import asyncio
 import httpx
+import orjson
 import uuid
 
-GATEWAY_URL = "http://localhost:8000/rpc"
+BASE_URL = "http://localhost:8000"
 AGENT_ID = "anskaffelsesassistenten"
 
+# Én klient med keep-alive gjenbrukes for alle RPC-kall i testkjøringen
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
+
+
+def create_client() -> httpx.AsyncClient:
+    """Lager den delte HTTP-klienten mot gatewayen."""
+    return httpx.AsyncClient(base_url=BASE_URL, timeout=30, limits=HTTP_LIMITS)
+
 
 async def call_rpc(client: httpx.AsyncClient, method: str, params: dict, agent_id: str = AGENT_ID) -> dict:
     """En hjelpefunksjon for å gjøre RPC-kall."""
@@ -17,16 +26,16 @@ async def call_rpc(client: httpx.AsyncClient, method: str, params: dict, agent_i
     }
     
     response = await client.post(
-        GATEWAY_URL,
-        json=rpc_request,
-        headers={"X-Agent-ID": agent_id}
+        "/rpc",
+        content=orjson.dumps(rpc_request),
+        headers={"Content-Type": "application/json", "X-Agent-ID": agent_id}
     )
-    return response.json()
+    return orjson.loads(response.content)
 
 
 async def run_procurement_workflow_test():
     """Kjører en komplett test av arbeidsflyten."""
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with create_client() as client:
         print("--- Starter test av RPC Gateway ---")
         
         # --- Steg 1: Opprett en ny anskaffelsessak ---
@@ -64,4 +73,10 @@ async def run_procurement_workflow_test():
 
 
 if __name__ == "__main__":
-    asyncio.run(run_procurement_workflow_test())
\ No newline at end of file
+    # Selvstendig skript: ingen import fra src, uvloop brukes hvis installert
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_procurement_workflow_test())
+    else:
+        uvloop.run(run_procurement_workflow_test())
\ No newline at end of file
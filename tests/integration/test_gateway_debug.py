@@ -1,37 +1,45 @@
 # test_gateway_debug.py
 import httpx
 import asyncio
-import json
+import orjson
+
+BASE_URL = "http://localhost:8000"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _dumps(obj) -> str:
+    """Pretty-printer JSON via orjson (kun 2-mellomroms innrykk støttes)."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+# Alle stegene deler én klient med keep-alive mot gatewayen
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128)
 
 async def test_gateway():
     """Test gateway endpoints direkte"""
-    base_url = "http://localhost:8000"
-    
-    async with httpx.AsyncClient() as client:
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=30, limits=HTTP_LIMITS) as client:
         # 1. Test health
         print("=== Testing Health Endpoint ===")
         try:
-            response = await client.get(f"{base_url}/health")
+            response = await client.get("/health")
             print(f"Health Status: {response.status_code}")
-            print(json.dumps(response.json(), indent=2))
+            print(_dumps(orjson.loads(response.content)))
         except Exception as e:
             print(f"Health check failed: {e}")
         
         # 2. Test metrics
         print("\n=== Testing Metrics Endpoint ===")
         try:
-            response = await client.get(f"{base_url}/metrics")
+            response = await client.get("/metrics")
             print(f"Metrics Status: {response.status_code}")
-            print(json.dumps(response.json(), indent=2))
+            print(_dumps(orjson.loads(response.content)))
         except Exception as e:
             print(f"Metrics failed: {e}")
         
         # 3. Test discover for reasoning_orchestrator
         print("\n=== Testing Discover Endpoint ===")
         try:
-            response = await client.get(f"{base_url}/discover/reasoning_orchestrator")
+            response = await client.get("/discover/reasoning_orchestrator")
             print(f"Discover Status: {response.status_code}")
-            data = response.json()
+            data = orjson.loads(response.content)
             print(f"Agent: {data['agent_id']}")
             print(f"Number of tools: {len(data['tools'])}")
             
@@ -62,16 +70,22 @@ async def test_gateway():
             }
             
             response = await client.post(
-                f"{base_url}/rpc",
-                json=rpc_request,
-                headers={"X-Agent-ID": "reasoning_orchestrator"}
+                "/rpc",
+                content=orjson.dumps(rpc_request),
+                headers={**JSON_HEADERS, "X-Agent-ID": "reasoning_orchestrator"}
             )
             print(f"RPC Status: {response.status_code}")
-            print(json.dumps(response.json(), indent=2))
+            print(_dumps(orjson.loads(response.content)))
             
         except Exception as e:
             print(f"RPC test failed: {e}")
 
 if __name__ == "__main__":
     print("Testing Gateway Endpoints...\n")
-    asyncio.run(test_gateway())
\ No newline at end of file
+    # Selvstendig skript: ingen import fra src, uvloop brukes hvis installert
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(test_gateway())
+    else:
+        uvloop.run(test_gateway())
\ No newline at end of file
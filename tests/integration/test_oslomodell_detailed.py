@@ -8,9 +8,11 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
 from typing import Dict, Any, List
 import json
+import orjson
+import re
+from collections import Counter
 from datetime import datetime
 
 
@@ -19,8 +21,8 @@ from src.tools.enhanced_llm_gateway import LLMGateway
 from src.tools.embedding_gateway import EmbeddingGateway
 from src.specialists.oslomodell_agent import OslomodellAgent
 from src.models.procurement_models import ProcurementCategory
+from tests.agent_result_cache import cached_execute
 
-load_dotenv()
 
 # Definisjon av korrekte krav basert på Instruksen
 INSTRUKS_KRAV = {
@@ -149,16 +151,35 @@ TEST_CASES = [
     }
 ]
 
-async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any]) -> Dict[str, Any]:
+# Forventede krav som frozenset, bygget én gang ved import
+for tc in TEST_CASES:
+    tc["_expected_krav_set"] = frozenset(tc["expected"]["krav_codes"])
+
+# Maks antall caser som kjører samtidig mot LLM-gatewayen
+MAX_CONCURRENT_CASES = int(os.getenv("OSLOMODELL_TEST_CONCURRENCY", "4"))
+
+# Diskcache for agentresultatet (tests/.cache/oslomodell), slått på med LLM_CACHE=1 eller --cache.
+# Nøkkelen inkluderer agentens kode, prompt og modell; øk versjonen ved andre endringer.
+USE_AGENT_CACHE = os.getenv("LLM_CACHE") == "1"
+AGENT_CACHE_VERSION = "1"
+
+# Nøkkelord i feilmeldinger -> feilkategori i "Vanlige mønstre"
+_CATEGORIES = {"krav": "seriøsitetskrav", "risiko": "risikovurdering"}
+
+# Feltene fra agentresultatet som tas med i resultatfilen
+RESULT_SUMMARY_KEYS = (
+    "vurdert_risiko_for_akrim",
+    "påkrevde_seriøsitetskrav",
+    "anbefalt_antall_underleverandørledd",
+    "krav_om_lærlinger",
+    "confidence",
+)
+
+async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any], timestamp: str, use_cache: bool = USE_AGENT_CACHE) -> Dict[str, Any]:
     """Test en enkelt case og returner detaljert analyse."""
     
-    print(f"\n{'='*60}")
-    print(f"Testing: {test_case['name']}")
-    print(f"Verdi: {test_case['value']:,} NOK | Kategori: {test_case['category']} | Varighet: {test_case['duration_months']} mnd")
-    print("-"*60)
-    
     # Execute agent
-    result = await agent.execute({
+    result = await cached_execute(agent, {
         "procurement": {
             "name": test_case["name"],
             "value": test_case["value"],
@@ -166,7 +187,16 @@ async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any]) ->
             "duration_months": test_case["duration_months"],
             "description": test_case["description"]
         }
-    })
+    }, namespace="oslomodell", version=AGENT_CACHE_VERSION, use_cache=use_cache)
+    
+    # Utskriften samles og skrives i én operasjon, slik at samtidige caser ikke blandes i loggen
+    lines: list[str] = []
+    out = lines.append
+    
+    out(f"\n{'='*60}")
+    out(f"Testing: {test_case['name']}")
+    out(f"Verdi: {test_case['value']:,} NOK | Kategori: {test_case['category']} | Varighet: {test_case['duration_months']} mnd")
+    out("-"*60)
     
     # Analyze results
     analysis = {
@@ -180,28 +210,31 @@ async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any]) ->
     actual_risk = result.get("vurdert_risiko_for_akrim", "").lower()
     expected_risk = test_case["expected"]["risk"]
     
-    print(f"\n📊 Risikovurdering:")
-    print(f"   Forventet: {expected_risk}")
-    print(f"   Faktisk: {actual_risk}")
+    out(f"\n📊 Risikovurdering:")
+    out(f"   Forventet: {expected_risk}")
+    out(f"   Faktisk: {actual_risk}")
     
     if actual_risk != expected_risk:
         analysis["errors"].append(f"Feil risiko: {actual_risk} (forventet {expected_risk})")
         analysis["passed"] = False
-        print(f"   ❌ FEIL")
+        out(f"   ❌ FEIL")
     else:
-        print(f"   ✅ Korrekt")
+        out(f"   ✅ Korrekt")
     
     # 2. Check requirements (seriøsitetskrav)
     actual_krav = result.get("påkrevde_seriøsitetskrav", [])
     expected_krav = test_case["expected"]["krav_codes"]
     
-    print(f"\n📋 Seriøsitetskrav:")
-    print(f"   Forventet: {expected_krav} ({len(expected_krav)} krav)")
-    print(f"   Faktisk: {actual_krav} ({len(actual_krav)} krav)")
+    out(f"\n📋 Seriøsitetskrav:")
+    out(f"   Forventet: {expected_krav} ({len(expected_krav)} krav)")
+    out(f"   Faktisk: {actual_krav} ({len(actual_krav)} krav)")
+    
+    expected_krav_set = test_case["_expected_krav_set"]
+    actual_krav_set = frozenset(actual_krav)
     
-    if set(actual_krav) != set(expected_krav):
-        missing = set(expected_krav) - set(actual_krav)
-        extra = set(actual_krav) - set(expected_krav)
+    if actual_krav_set != expected_krav_set:
+        missing = expected_krav_set - actual_krav_set
+        extra = actual_krav_set - expected_krav_set
         
         if missing:
             analysis["errors"].append(f"Mangler krav: {sorted(missing)}")
@@ -209,50 +242,50 @@ async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any]) ->
             analysis["errors"].append(f"Ekstra krav: {sorted(extra)}")
         
         analysis["passed"] = False
-        print(f"   ❌ FEIL - Antall: {len(actual_krav)} vs {len(expected_krav)}")
+        out(f"   ❌ FEIL - Antall: {len(actual_krav)} vs {len(expected_krav)}")
         if missing:
-            print(f"      Mangler: {sorted(missing)}")
+            out(f"      Mangler: {sorted(missing)}")
         if extra:
-            print(f"      For mye: {sorted(extra)}")
+            out(f"      For mye: {sorted(extra)}")
     else:
-        print(f"   ✅ Korrekt")
+        out(f"   ✅ Korrekt")
     
     # 3. Check subcontractor levels
     actual_underlev = result.get("anbefalt_antall_underleverandørledd", -1)
     expected_underlev = test_case["expected"]["underleverandør"]
     
-    print(f"\n🔗 Underleverandørledd:")
-    print(f"   Forventet: {expected_underlev}")
-    print(f"   Faktisk: {actual_underlev}")
+    out(f"\n🔗 Underleverandørledd:")
+    out(f"   Forventet: {expected_underlev}")
+    out(f"   Faktisk: {actual_underlev}")
     
     if actual_underlev != expected_underlev:
         analysis["errors"].append(f"Feil underleverandørledd: {actual_underlev} (forventet {expected_underlev})")
         analysis["passed"] = False
-        print(f"   ❌ FEIL")
+        out(f"   ❌ FEIL")
     else:
-        print(f"   ✅ Korrekt")
+        out(f"   ✅ Korrekt")
     
     # 4. Check apprentice requirements
     actual_lærling = result.get("krav_om_lærlinger", {}).get("status", False)
     expected_lærling = test_case["expected"]["lærlinger"]
     
-    print(f"\n👷 Lærlingkrav:")
-    print(f"   Forventet: {'Ja' if expected_lærling else 'Nei'}")
-    print(f"   Faktisk: {'Ja' if actual_lærling else 'Nei'}")
-    print(f"   Begrunnelse: {result.get('krav_om_lærlinger', {}).get('begrunnelse', 'Ingen')}")
+    out(f"\n👷 Lærlingkrav:")
+    out(f"   Forventet: {'Ja' if expected_lærling else 'Nei'}")
+    out(f"   Faktisk: {'Ja' if actual_lærling else 'Nei'}")
+    out(f"   Begrunnelse: {result.get('krav_om_lærlinger', {}).get('begrunnelse', 'Ingen')}")
     
     if actual_lærling != expected_lærling:
         analysis["errors"].append(f"Feil lærlingkrav: {actual_lærling} (forventet {expected_lærling})")
         analysis["passed"] = False
-        print(f"   ❌ FEIL")
+        out(f"   ❌ FEIL")
     else:
-        print(f"   ✅ Korrekt")
+        out(f"   ✅ Korrekt")
     
     # 5. Check if Krav V is mentioned when relevant
     if test_case["expected"].get("krav_v"):
         has_v = "V" in actual_krav
-        print(f"\n📌 Krav V (lærlinger):")
-        print(f"   {'✅ Inkludert' if has_v else '❌ Mangler'}")
+        out(f"\n📌 Krav V (lærlinger):")
+        out(f"   {'✅ Inkludert' if has_v else '❌ Mangler'}")
         
         if not has_v:
             analysis["errors"].append("Mangler krav V for lærlinger")
@@ -261,27 +294,36 @@ async def test_single_case(agent: OslomodellAgent, test_case: Dict[str, Any]) ->
     # 6. Display recommendations
     recommendations = result.get("recommendations", [])
     if recommendations:
-        print(f"\n💡 Anbefalinger fra agent:")
+        out(f"\n💡 Anbefalinger fra agent:")
         for rec in recommendations[:3]:
-            print(f"   • {rec}")
+            out(f"   • {rec}")
     
     # 7. Context retrieved
-    print(f"\n📚 Kontekst hentet:")
-    print(f"   Confidence: {result.get('confidence', 0):.0%}")
+    out(f"\n📚 Kontekst hentet:")
+    out(f"   Confidence: {result.get('confidence', 0):.0%}")
     
     # Summary for this case
-    print(f"\n{'='*60}")
+    out(f"\n{'='*60}")
     if analysis["passed"]:
-        print(f"✅ {test_case['name']}: BESTÅTT")
+        out(f"✅ {test_case['name']}: BESTÅTT")
     else:
-        print(f"❌ {test_case['name']}: FEILET")
+        out(f"❌ {test_case['name']}: FEILET")
         for error in analysis["errors"]:
-            print(f"   - {error}")
+            out(f"   - {error}")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+    
+    # Kun et sammendrag i resultatfilen; fullt resultat lagres separat ved feil
+    analysis["result_summary"] = {key: result.get(key) for key in RESULT_SUMMARY_KEYS}
+    if not analysis["passed"]:
+        case_slug = re.sub(r"\W+", "_", test_case["name"]).strip("_").lower()
+        with open(f"oslomodell_fail_{case_slug}_{timestamp}.json", "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
     
-    analysis["result"] = result
     return analysis
 
-async def main():
+async def main(use_cache: bool = USE_AGENT_CACHE):
     """Run comprehensive Oslomodell tests."""
     
     print("\n" + "="*80)
@@ -294,24 +336,35 @@ async def main():
     llm_gateway = LLMGateway()
     embedding_gateway = EmbeddingGateway(api_key=os.getenv("GEMINI_API_KEY"))
     agent = OslomodellAgent(llm_gateway, embedding_gateway)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Run all test cases concurrently, capped by MAX_CONCURRENT_CASES
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CASES)
+    
+    async def run_case(test_case: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await test_single_case(agent, test_case, timestamp, use_cache=use_cache)
+    
+    analyses = await asyncio.gather(
+        *(run_case(tc) for tc in TEST_CASES),
+        return_exceptions=True
+    )
     
-    # Run all test cases
     results = []
     passed_count = 0
     
-    for test_case in TEST_CASES:
-        try:
-            analysis = await test_single_case(agent, test_case)
-            results.append(analysis)
-            if analysis["passed"]:
-                passed_count += 1
-        except Exception as e:
-            print(f"\n❌ Exception for {test_case['name']}: {e}")
+    for test_case, analysis in zip(TEST_CASES, analyses):
+        if isinstance(analysis, Exception):
+            print(f"\n❌ Exception for {test_case['name']}: {analysis}")
             results.append({
                 "case": test_case["name"],
                 "passed": False,
-                "errors": [f"Exception: {str(e)}"]
+                "errors": [f"Exception: {analysis}"]
             })
+        else:
+            results.append(analysis)
+            if analysis["passed"]:
+                passed_count += 1
     
     # Final summary
     print("\n" + "="*80)
@@ -332,20 +385,22 @@ async def main():
     
     # Common patterns
     print("\n📈 Vanlige mønstre:")
-    krav_errors = [r for r in results if any("krav" in e.lower() for e in r.get("errors", []))]
-    risk_errors = [r for r in results if any("risiko" in e.lower() for e in r.get("errors", []))]
+    pattern_counts = Counter()
+    for result in results:
+        errors_lower = [e.lower() for e in result.get("errors", [])]
+        for keyword, label in _CATEGORIES.items():
+            if any(keyword in e for e in errors_lower):
+                pattern_counts[label] += 1
     
-    if krav_errors:
-        print(f"   • Feil i seriøsitetskrav: {len(krav_errors)} tilfeller")
-    if risk_errors:
-        print(f"   • Feil i risikovurdering: {len(risk_errors)} tilfeller")
+    for label in _CATEGORIES.values():
+        if pattern_counts[label]:
+            print(f"   • Feil i {label}: {pattern_counts[label]} tilfeller")
     
     # Save detailed results to file
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"oslomodell_test_results_{timestamp}.json"
     
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump({
+    with open(filename, "wb") as f:
+        f.write(orjson.dumps({
             "timestamp": timestamp,
             "summary": {
                 "total": len(TEST_CASES),
@@ -353,7 +408,7 @@ async def main():
                 "failed": len(TEST_CASES) - passed_count
             },
             "results": results
-        }, f, indent=2, ensure_ascii=False)
+        }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     print(f"\n💾 Detaljerte resultater lagret til: {filename}")
     
@@ -361,5 +416,15 @@ async def main():
     return 0 if passed_count == len(TEST_CASES) else 1
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    from src.tools.event_loop import run
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Grundig test av Oslomodell-agenten")
+    parser.add_argument("--cache", action="store_true", help="Gjenbruk agentresultater fra diskcachen (samme som LLM_CACHE=1)")
+    args = parser.parse_args()
+    
+    exit_code = run(main(use_cache=args.cache or USE_AGENT_CACHE))
     sys.exit(exit_code)
\ No newline at end of file
@@ -8,89 +8,86 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
 import json
 
 
 
-from src.tools.enhanced_llm_gateway import LLMGateway
+from src.tools.llm_gateway import LLMGateway
 from src.tools.embedding_gateway import EmbeddingGateway
 from src.tools.rpc_gateway_client import RPCGatewayClient
 from src.orchestrators.reasoning_orchestrator import ReasoningOrchestrator, Goal, GoalStatus
 from src.models.procurement_models import ProcurementRequest, ProcurementCategory
 
-load_dotenv()
 
-async def test_knowledge_base():
+# Test queries for the vector search, embedded together in one request
+SEARCH_QUERIES = (
+    "seriøsitetskrav bygge anlegg over 500000",
+    "risiko for arbeidslivskriminalitet renhold",
+    "krav om lærlinger utførende fag",
+)
+
+async def _check_knowledge_base(client: RPCGatewayClient):
     """Test 1: Verify knowledge base is accessible."""
     print("\n📚 Test 1: Knowledge Base")
     print("-" * 40)
     
-    async with RPCGatewayClient(
-        agent_id="oslomodell_agent",
-        gateway_url="http://localhost:8000"
-    ) as client:
-        
-        # List documents
-        result = await client.call("database.list_knowledge_documents", {})
-        
-        if result.get('status') == 'success':
-            docs = result.get('documents', [])
-            print(f"✅ Found {len(docs)} documents in knowledge base")
-            for doc in docs:
-                print(f"   - {doc['documentId']}: {doc['contentLength']} chars")
-            return len(docs) >= 3
-        else:
-            print(f"❌ Failed to list documents: {result.get('message')}")
-            return False
+    # List documents
+    result = await client.call("database.list_knowledge_documents", {})
+    
+    if result.get('status') == 'success':
+        docs = result.get('documents', [])
+        print(f"✅ Found {len(docs)} documents in knowledge base")
+        for doc in docs:
+            print(f"   - {doc['documentId']}: {doc['contentLength']} chars")
+        return len(docs) >= 3
+    else:
+        print(f"❌ Failed to list documents: {result.get('message')}")
+        return False
 
-async def test_knowledge_search():
+async def _check_knowledge_search(client: RPCGatewayClient, embedding_gateway: EmbeddingGateway):
     """Test 2: Verify vector search works."""
     print("\n🔍 Test 2: Knowledge Search")
     print("-" * 40)
     
-    embedding_gateway = EmbeddingGateway(api_key=os.getenv("GEMINI_API_KEY"))
-    
-    # Generate test query embedding
-    test_query = "seriøsitetskrav bygge anlegg over 500000"
-    query_embedding = await embedding_gateway.create_embedding(
-        text=test_query,
+    # Embed all test queries in one batch request
+    query_embeddings = await embedding_gateway.create_batch_embeddings(
+        texts=list(SEARCH_QUERIES),
         task_type="RETRIEVAL_QUERY",
         output_dimensionality=1536
     )
     
-    async with RPCGatewayClient(
-        agent_id="oslomodell_agent",
-        gateway_url="http://localhost:8000"
-    ) as client:
-        
-        result = await client.call("database.search_knowledge_documents", {
+    # Run all searches in one JSON-RPC batch
+    results = await client.call_batch([
+        ("database.search_knowledge_documents", {
             "queryEmbedding": query_embedding,
             "threshold": 0.5,
             "limit": 3,
             "metadataFilter": {}
         })
-        
+        for query_embedding in query_embeddings
+    ])
+    
+    all_found = True
+    for query, result in zip(SEARCH_QUERIES, results):
         if result.get('status') == 'success':
             docs = result.get('results', [])
-            print(f"✅ Search returned {len(docs)} relevant documents")
+            print(f"✅ '{query}': {len(docs)} relevant documents")
             for doc in docs:
                 print(f"   - {doc['documentId']}: similarity={doc['similarity']:.3f}")
-            return len(docs) > 0
+            all_found = all_found and len(docs) > 0
         else:
-            print(f"❌ Search failed: {result.get('message')}")
-            return False
+            print(f"❌ Search failed for '{query}': {result.get('message')}")
+            all_found = False
+    
+    return all_found
 
-async def test_oslomodell_agent():
+async def test_oslomodell_agent(llm_gateway: LLMGateway, embedding_gateway: EmbeddingGateway):
     """Test 3: Test Oslomodell agent directly."""
     print("\n🏛️ Test 3: Oslomodell Agent")
     print("-" * 40)
     
     from src.specialists.oslomodell_agent import OslomodellAgent
     
-    llm_gateway = LLMGateway()
-    embedding_gateway = EmbeddingGateway(api_key=os.getenv("GEMINI_API_KEY"))
-    
     agent = OslomodellAgent(llm_gateway, embedding_gateway)
     
     # Test procurement
@@ -117,12 +114,11 @@ async def test_oslomodell_agent():
         print(f"❌ Agent failed: {result}")
         return False
 
-async def test_full_orchestration():
+async def test_full_orchestration(llm_gateway: LLMGateway):
     """Test 4: Full orchestration with Oslomodell."""
     print("\n🎭 Test 4: Full Orchestration")
     print("-" * 40)
     
-    llm_gateway = LLMGateway()
     orchestrator = ReasoningOrchestrator(llm_gateway)
     
     # Create test procurement
@@ -181,32 +177,33 @@ async def main():
     print("🧪 OSLOMODELL INTEGRATION TEST SUITE")
     print("="*60)
     
-    results = {}
-    
-    # Test 1: Knowledge base
-    try:
-        results['knowledge_base'] = await test_knowledge_base()
-    except Exception as e:
-        print(f"❌ Exception: {e}")
-        results['knowledge_base'] = False
+    # One client and one set of gateways are shared by all tests
+    llm_gateway = LLMGateway()
+    embedding_gateway = EmbeddingGateway(api_key=os.getenv("GEMINI_API_KEY"))
     
-    # Test 2: Search
-    try:
-        results['search'] = await test_knowledge_search()
-    except Exception as e:
-        print(f"❌ Exception: {e}")
-        results['search'] = False
+    async with RPCGatewayClient(
+        agent_id="oslomodell_agent",
+        gateway_url="http://localhost:8000"
+    ) as client:
+        # Test 1-3 are independent of each other, so run them concurrently
+        independent = {
+            'knowledge_base': _check_knowledge_base(client),
+            'search': _check_knowledge_search(client, embedding_gateway),
+            'agent': test_oslomodell_agent(llm_gateway, embedding_gateway),
+        }
+        outcomes = await asyncio.gather(*independent.values(), return_exceptions=True)
     
-    # Test 3: Agent
-    try:
-        results['agent'] = await test_oslomodell_agent()
-    except Exception as e:
-        print(f"❌ Exception: {e}")
-        results['agent'] = False
+    results = {}
+    for test_name, outcome in zip(independent, outcomes):
+        if isinstance(outcome, Exception):
+            print(f"❌ Exception in {test_name}: {outcome}")
+            results[test_name] = False
+        else:
+            results[test_name] = outcome
     
     # Test 4: Orchestration
     try:
-        results['orchestration'] = await test_full_orchestration()
+        results['orchestration'] = await test_full_orchestration(llm_gateway)
     except Exception as e:
         print(f"❌ Exception: {e}")
         results['orchestration'] = False
@@ -233,5 +230,9 @@ async def main():
         return 1
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    from src.tools.event_loop import run
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    exit_code = run(main())
     sys.exit(exit_code)
\ No newline at end of file
@@ -5,25 +5,22 @@ import pytest
 from dotenv import load_dotenv
 
 # Imports are now pointing to the refactored models and components
-from src.orchestrators.reasoning_orchestrator import ReasoningOrchestrator, Goal, GoalStatus
-from src.tools.gemini_gateway import GeminiGateway
+from src.orchestrators.reasoning_orchestrator import Goal, GoalStatus
 from src.models.procurement_models import ProcurementRequest # <-- Refactored
 
 load_dotenv()
 
 @pytest.mark.asyncio
-async def test_full_triage_orchestration():
+async def test_full_triage_orchestration(discovered_orchestrator):
     """
     Tests a complete, refactored orchestration flow.
+    Tool discovery is done once per session by the `discovered_orchestrator` fixture.
     """
     print("\n=== Testing Refactored Full Triage Orchestration ===\n")
 
     # Setup
-    gemini_api_key = os.getenv("GEMINI_API_KEY")
-    assert gemini_api_key, "GEMINI_API_KEY is not set"
-
-    gateway = GeminiGateway(gemini_api_key)
-    orchestrator = ReasoningOrchestrator(gateway)
+    assert os.getenv("GEMINI_API_KEY"), "GEMINI_API_KEY is not set"
+    orchestrator = discovered_orchestrator
 
     # Use the refactored ProcurementRequest model
     request = ProcurementRequest(
@@ -32,10 +29,13 @@ async def test_full_triage_orchestration():
         description="Vi skal erstatte vårt gamle saksbehandlingssystem..." # Norwegian content is OK
     )
 
+    # Serialise the request once; the goal context and prompts reuse this dict
+    request_payload = request.model_dump()
+
     goal = Goal(
         id=request.id,
         description=f"Complete a standard procurement process for: '{request.name}'.",
-        context={"request": request.model_dump()},
+        context={"request": request_payload},
         success_criteria=[
             "The procurement case has been created in the database.",
             "A triage assessment (GRØNN, GUL, or RØD) has been performed.",
@@ -81,7 +81,10 @@ async def test_full_triage_orchestration():
 
 
 if __name__ == "__main__":
+    from src.tools.event_loop import run
     # To run this file directly for debugging
     print("NOTE: This script assumes the database has been set up with the refactored schema.")
     print("Run 'python scripts/setup/run_db_setup.py setup' first.")
-    asyncio.run(test_full_triage_orchestration())
+    from src.orchestrators.reasoning_orchestrator import ReasoningOrchestrator
+    from src.tools.llm_gateway import LLMGateway
+    run(test_full_triage_orchestration(ReasoningOrchestrator(LLMGateway())))
@@ -1,7 +1,7 @@
 # mock_procurement_generator.py
 
 import json
-import uuid
+import os
 from typing import List, Dict, Any
 from enum import Enum
 
@@ -15,52 +15,54 @@ class ProcurementCategory(str, Enum):
     KONSULENT = "konsulent"
 
 
+# Scenarioene det roteres gjennom
+_SCENARIOS = [
+    {
+        "name": "Oppgradering av Storgata", "category": ProcurementCategory.BYGGE_OG_ANLEGG,
+        "value": 25_000_000, "duration_months": 24, "involves_construction": True,
+        "description": "Total rehabilitering av gate, inkludert vann og avløp."
+    },
+    {
+        "name": "Nytt saksbehandlingssystem", "category": ProcurementCategory.IKT,
+        "value": 1_200_000, "duration_months": 18, "involves_construction": False,
+        "description": "Implementering av en skybasert løsning for saksbehandling."
+    },
+    {
+        "name": "Rammeavtale konsulenttjenester (strategi)", "category": ProcurementCategory.KONSULENT,
+        "value": 750_000, "duration_months": 12, "involves_construction": False,
+        "description": "Innkjøp av strategisk rådgivning for digital transformasjon."
+    },
+    {
+        "name": "Innkjøp av kontorrekvisita", "category": ProcurementCategory.VARE,
+        "value": 80_000, "duration_months": 12, "involves_construction": False,
+        "description": "Løpende levering av kontorrekvisita til kommunens etater."
+    },
+    {
+        "name": "Vaktmestertjenester for skoler", "category": ProcurementCategory.TJENESTE,
+        "value": 950_000, "duration_months": 36, "involves_construction": False,
+        "description": "Drift og vedlikehold av 5 skoler i bydel Nord."
+    },
+     {
+        "name": "Kantine- og renholdstjenester", "category": ProcurementCategory.RENHOLD,
+        "value": 490_000, "duration_months": 24, "involves_construction": False,
+        "description": "Daglig renhold og kantinedrift for et kommunalt kontorbygg."
+    }
+]
+
+# Maler med kategori allerede konvertert fra Enum til string for JSON-output
+_SCENARIO_TEMPLATES = tuple({**s, "category": s["category"].value} for s in _SCENARIOS)
+
+
 def generate_mock_procurements(count: int = 5) -> List[Dict[str, Any]]:
     """
     Genererer en liste med varierte, fiktive anskaffelsesdata for testing.
     """
     
-    scenarios = [
-        {
-            "name": "Oppgradering av Storgata", "category": ProcurementCategory.BYGGE_OG_ANLEGG,
-            "value": 25_000_000, "duration_months": 24, "involves_construction": True,
-            "description": "Total rehabilitering av gate, inkludert vann og avløp."
-        },
-        {
-            "name": "Nytt saksbehandlingssystem", "category": ProcurementCategory.IKT,
-            "value": 1_200_000, "duration_months": 18, "involves_construction": False,
-            "description": "Implementering av en skybasert løsning for saksbehandling."
-        },
-        {
-            "name": "Rammeavtale konsulenttjenester (strategi)", "category": ProcurementCategory.KONSULENT,
-            "value": 750_000, "duration_months": 12, "involves_construction": False,
-            "description": "Innkjøp av strategisk rådgivning for digital transformasjon."
-        },
-        {
-            "name": "Innkjøp av kontorrekvisita", "category": ProcurementCategory.VARE,
-            "value": 80_000, "duration_months": 12, "involves_construction": False,
-            "description": "Løpende levering av kontorrekvisita til kommunens etater."
-        },
-        {
-            "name": "Vaktmestertjenester for skoler", "category": ProcurementCategory.TJENESTE,
-            "value": 950_000, "duration_months": 36, "involves_construction": False,
-            "description": "Drift og vedlikehold av 5 skoler i bydel Nord."
-        },
-         {
-            "name": "Kantine- og renholdstjenester", "category": ProcurementCategory.RENHOLD,
-            "value": 490_000, "duration_months": 24, "involves_construction": False,
-            "description": "Daglig renhold og kantinedrift for et kommunalt kontorbygg."
-        }
-    ]
-    
-    # Velg fra listen, og gi unik ID
+    # Velg fra malene, og gi unik ID
     generated_mocks = []
     for i in range(count):
-        mock = scenarios[i % len(scenarios)].copy() # Roter gjennom scenarioene
-        mock["id"] = f"mock-proc-{uuid.uuid4()}"
-        
-        # Konverter Enum til string for JSON-output
-        mock["category"] = mock["category"].value
+        mock = _SCENARIO_TEMPLATES[i % len(_SCENARIO_TEMPLATES)].copy() # Roter gjennom scenarioene
+        mock["id"] = f"mock-proc-{os.urandom(16).hex()}"
         generated_mocks.append(mock)
         
     return generated_mocks
@@ -18,19 +18,15 @@ def pytest_configure(config):
     # Bare bruk asyncio, ikke trio
     config.option.asyncio_mode = "auto"
 
-# Marker for å hoppe over trio-tester
-def pytest_collection_modifyitems(config, items):
-    """Modifier test collection"""
-    for item in items:
-        # Skip trio variants av asyncio tester
-        if "[trio]" in item.name:
-            item.add_marker(pytest.mark.skip(reason="Trio not installed"))
-
 # Global fixture for event loop
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """Create an event loop for the test session (uvloop when installed)."""
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
 
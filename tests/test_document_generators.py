@@ -3,19 +3,16 @@
 Test-skript for alle dokumentgeneratorer.
 Demonstrerer hvordan hver generator brukes med eksempeldata.
 """
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 
-# Import all generators
-from src.tools.oslomodel_document_generator import OslomodelDocumentGenerator
-from src.tools.triage_document_generator import TriageDocumentGenerator
-from src.tools.environmental_document_generator import EnvironmentalDocumentGenerator
-from src.tools.orchestrated_document_generator import OrchestratedDocumentGenerator
-from src.tools.comprehensive_document_generator import ComprehensiveDocumentGenerator
+_SEP60 = "=" * 60
 
-def create_test_data():
-    """Oppretter testdata for alle generatorene."""
+def _build_test_data():
+    """Bygger testdataene for alle generatorene (kjøres én gang ved import)."""
     
     # Felles procurement data
     procurement_data = {
@@ -122,6 +119,15 @@ def create_test_data():
         "assessed_by": "environmental_agent"
     }
     
+    # (metode, parameternavn, resultat) for hvert steg i den simulerte kjøringen.
+    # Generatorene leser historikken med .get(), så stegene forblir dicts.
+    history_steps = (
+        ("database.create_procurement", "data", {"id": "test-2025-001"}),
+        ("agent.run_triage", "procurement", triage_result),
+        ("agent.run_oslomodell", "procurement", oslomodell_result),
+        ("agent.run_environmental", "procurement", environmental_result),
+    )
+
     # Simulert orchestration context
     orchestration_context = {
         "goal": {
@@ -134,139 +140,185 @@ def create_test_data():
         },
         "execution_history": [
             {
-                "action": {"method": "database.create_procurement", "parameters": {"data": procurement_data}},
-                "result": {"status": "success", "result": {"id": "test-2025-001"}}
-            },
-            {
-                "action": {"method": "agent.run_triage", "parameters": {"procurement": procurement_data}},
-                "result": {"status": "success", "result": triage_result}
-            },
-            {
-                "action": {"method": "agent.run_oslomodell", "parameters": {"procurement": procurement_data}},
-                "result": {"status": "success", "result": oslomodell_result}
-            },
-            {
-                "action": {"method": "agent.run_environmental", "parameters": {"procurement": procurement_data}},
-                "result": {"status": "success", "result": environmental_result}
+                "action": {"method": method, "parameters": {param: procurement_data}},
+                "result": {"status": "success", "result": result}
             }
+            for method, param, result in history_steps
         ]
     }
     
-    return {
-        "procurement": procurement_data,
-        "triage": triage_result,
-        "oslomodell": oslomodell_result,
-        "environmental": environmental_result,
-        "context": orchestration_context
-    }
+    # Skrivebeskyttede visninger, siden dataene deles mellom alle testene
+    return MappingProxyType({
+        "procurement": MappingProxyType(procurement_data),
+        "triage": MappingProxyType(triage_result),
+        "oslomodell": MappingProxyType(oslomodell_result),
+        "environmental": MappingProxyType(environmental_result),
+        "context": MappingProxyType(orchestration_context)
+    })
+
+# Testdataene er statiske og leses bare av generatorene, så de bygges én gang
+_TEST_DATA = _build_test_data()
+
+def create_test_data():
+    """
+    Returnerer testdata for alle generatorene.
+    Dataene deles mellom testene og må ikke endres; lag kopier ved behov.
+    """
+    return _TEST_DATA
 
 def test_all_generators():
     """Tester alle dokumentgeneratorene."""
+    # Generatorene importeres her, så modulen (og batch-testen) lastes uten dem
+    from src.tools.oslomodel_document_generator import OslomodelDocumentGenerator
+    from src.tools.triage_document_generator import TriageDocumentGenerator
+    from src.tools.environmental_document_generator import EnvironmentalDocumentGenerator
+    from src.tools.orchestrated_document_generator import OrchestratedDocumentGenerator
+    from src.tools.comprehensive_document_generator import ComprehensiveDocumentGenerator
     
-    print("="*60)
+    print(_SEP60)
     print("TESTING ALL DOCUMENT GENERATORS")
-    print("="*60)
+    print(_SEP60)
     
     # Opprett testdata
     test_data = create_test_data()
     
     # Opprett output-mappe
-    output_dir = "test_documents"
-    Path(output_dir).mkdir(exist_ok=True)
-    
-    generated_files = []
-    
-    # Test 1: Oslomodell Generator
-    print("\n1. Testing OslomodelDocumentGenerator...")
-    oslo_gen = OslomodelDocumentGenerator(output_dir)
-    oslo_file = oslo_gen.generate_document(
-        test_data["procurement"], 
-        test_data["oslomodell"]
-    )
-    print(f"   ✅ Generated: {oslo_file}")
-    generated_files.append(oslo_file)
-    
-    # Test 2: Triage Generator
-    print("\n2. Testing TriageDocumentGenerator...")
-    triage_gen = TriageDocumentGenerator(output_dir)
-    triage_file = triage_gen.generate_document(
-        test_data["procurement"],
-        test_data["triage"]
-    )
-    print(f"   ✅ Generated: {triage_file}")
-    generated_files.append(triage_file)
+    output_dir = Path("test_documents")
+    output_dir.mkdir(exist_ok=True)
     
-    # Test 3: Environmental Generator
-    print("\n3. Testing EnvironmentalDocumentGenerator...")
-    env_gen = EnvironmentalDocumentGenerator(output_dir)
-    env_file = env_gen.generate_document(
-        test_data["procurement"],
-        test_data["environmental"]
-    )
-    print(f"   ✅ Generated: {env_file}")
-    generated_files.append(env_file)
+    # Generatorene skriver til hver sin fil, så de kjøres parallelt
+    jobs = [
+        ("OslomodelDocumentGenerator", OslomodelDocumentGenerator(output_dir).generate_document,
+         (test_data["procurement"], test_data["oslomodell"])),
+        ("TriageDocumentGenerator", TriageDocumentGenerator(output_dir).generate_document,
+         (test_data["procurement"], test_data["triage"])),
+        ("EnvironmentalDocumentGenerator", EnvironmentalDocumentGenerator(output_dir).generate_document,
+         (test_data["procurement"], test_data["environmental"])),
+        ("OrchestratedDocumentGenerator", OrchestratedDocumentGenerator(output_dir).generate_from_context,
+         (test_data["context"],)),
+        ("ComprehensiveDocumentGenerator", ComprehensiveDocumentGenerator(output_dir).generate_from_context,
+         (test_data["context"],)),
+    ]
     
-    # Test 4: Orchestrated Generator
-    print("\n4. Testing OrchestratedDocumentGenerator...")
-    orch_gen = OrchestratedDocumentGenerator(output_dir)
-    orch_file = orch_gen.generate_from_context(test_data["context"])
-    print(f"   ✅ Generated: {orch_file}")
-    generated_files.append(orch_file)
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(fn, *args) for _, fn, args in jobs]
     
-    # Test 5: Comprehensive Generator
-    print("\n5. Testing ComprehensiveDocumentGenerator...")
-    comp_gen = ComprehensiveDocumentGenerator(output_dir)
-    comp_file = comp_gen.generate_from_context(test_data["context"])
-    print(f"   ✅ Generated: {comp_file}")
-    generated_files.append(comp_file)
+    generated_files = []
+    for i, ((name, _, _), future) in enumerate(zip(jobs, futures), 1):
+        print(f"\n{i}. Testing {name}...")
+        generated_file = future.result()
+        print(f"   ✅ Generated: {generated_file}")
+        generated_files.append(generated_file)
     
     # Generer oppsummering
-    print("\n" + "="*60)
+    print("\n" + _SEP60)
     print("SUMMARY")
-    print("="*60)
+    print(_SEP60)
     print(f"\n✅ Successfully generated {len(generated_files)} documents:")
     for f in generated_files:
-        print(f"   - {Path(f).name}")
+        print(f"   - {os.path.basename(f)}")
     
     print(f"\n📁 All documents saved to: {output_dir}/")
     
     # Lag en README i output-mappen
-    readme_content = f"""# Test Documents Generated
-
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## Documents Created:
-
-1. **Oslomodell Assessment** - Full seriøsitetskrav assessment
-2. **Triage Assessment** - Risk classification (RED/YELLOW/GREEN)
-3. **Environmental Assessment** - Climate and environmental requirements
-4. **Orchestrated Assessment** - Combined assessment from all agents
-5. **Comprehensive Assessment** - Full ComprehensiveAssessment model
-
-## Test Procurement:
-- **Name:** {test_data['procurement']['name']}
-- **Value:** {test_data['procurement']['value']:,} NOK
-- **Category:** {test_data['procurement']['category']}
-
-## Results:
-- **Triage:** {test_data['triage']['color']}
-- **Crime Risk:** {test_data['oslomodell']['vurdert_risiko_for_akrim']}
-- **Environmental Risk:** {test_data['environmental']['environmental_risk_level']}
-- **Total Requirements:** {len(test_data['oslomodell']['påkrevde_seriøsitetskrav'])}
-"""
+    proc = test_data['procurement']
+    oslo = test_data['oslomodell']
+    readme_content = "\n".join([
+        "# Test Documents Generated",
+        "",
+        f"**Generated:** {datetime.now().isoformat(sep=' ', timespec='seconds')}",
+        "",
+        "## Documents Created:",
+        "",
+        "1. **Oslomodell Assessment** - Full seriøsitetskrav assessment",
+        "2. **Triage Assessment** - Risk classification (RED/YELLOW/GREEN)",
+        "3. **Environmental Assessment** - Climate and environmental requirements",
+        "4. **Orchestrated Assessment** - Combined assessment from all agents",
+        "5. **Comprehensive Assessment** - Full ComprehensiveAssessment model",
+        "",
+        "## Test Procurement:",
+        f"- **Name:** {proc['name']}",
+        f"- **Value:** {proc['value']:,} NOK",
+        f"- **Category:** {proc['category']}",
+        "",
+        "## Results:",
+        f"- **Triage:** {test_data['triage']['color']}",
+        f"- **Crime Risk:** {oslo['vurdert_risiko_for_akrim']}",
+        f"- **Environmental Risk:** {test_data['environmental']['environmental_risk_level']}",
+        f"- **Total Requirements:** {len(oslo['påkrevde_seriøsitetskrav'])}",
+        "",
+    ])
     
-    readme_path = Path(output_dir) / "README.md"
-    with open(readme_path, 'w', encoding='utf-8') as f:
-        f.write(readme_content)
+    readme_path = output_dir / "README.md"
+    readme_path.write_bytes(readme_content.encode('utf-8'))
     
     print(f"\n📝 README created: {readme_path}")
     
     return generated_files
 
+def test_triage_generator_batch(triage_document_generator):
+    """Tester batch-generering og oppsummeringstabell for triage-notater."""
+    test_data = create_test_data()
+    green_procurement = {**test_data["procurement"], "id": "test-2025-002", "value": 80_000}
+    green_triage = {**test_data["triage"], "color": "GRØNN", "risk_factors": [], "mitigation_measures": []}
+    
+    files = triage_document_generator.generate_documents([
+        (test_data["procurement"], test_data["triage"]),
+        (green_procurement, green_triage)
+    ])
+    
+    assert len(files) == 2
+    assert all(Path(f).exists() for f in files)
+    
+    red_content = Path(files[0]).read_text(encoding='utf-8')
+    assert "### Resultat: 🔴 **RØD**" in red_content
+    assert "## 3. Identifiserte risikofaktorer" in red_content
+    assert "⚠️ **KREVER SPESIELL OPPMERKSOMHET**" in red_content
+    
+    green_content = Path(files[1]).read_text(encoding='utf-8')
+    assert "### Forenklet prosess" in green_content
+    assert "## 3. Identifiserte risikofaktorer" not in green_content
+    
+    table = triage_document_generator.generate_summary_table([
+        {"procurement": test_data["procurement"], "triage": test_data["triage"]},
+        {"procurement": green_procurement, "triage": green_triage}
+    ])
+    lines = table.split("\n")
+    assert len(lines) == 4
+    assert lines[2] == "| Totalentreprise ny barnehage M | 35,000,000 | RØD | 95% | Nei |"
+
 if __name__ == "__main__":
-    # Kjør tester
-    files = test_all_generators()
+    import argparse
+    import subprocess
+    import sys
     
-    print("\n" + "="*60)
+    parser = argparse.ArgumentParser(description="Kjør dokumentgeneratorene")
+    parser.add_argument("--with-orchestrator", action="store_true",
+                        help="Kjør også orkestratorsuiten (krever Gemini og gatewayen) i en egen pytest-prosess")
+    args = parser.parse_args()
+    
+    # Orkestratortestene deler verken tilstand eller filer med generatorene,
+    # så de kan kjøres i en egen pytest-prosess samtidig, men bare når det bes om
+    orchestrator_suite = None
+    if args.with_orchestrator:
+        orchestrator_suite = subprocess.Popen([
+            sys.executable, "-m", "pytest", "-q",
+            str(Path(__file__).with_name("test_reasoning_orchestrator_comprehensive.py"))
+        ])
+    
+    # Kjør tester; stopp orkestratorsuiten hvis generatortestene feiler
+    try:
+        files = test_all_generators()
+    except BaseException:
+        if orchestrator_suite is not None:
+            orchestrator_suite.terminate()
+            orchestrator_suite.wait()
+        raise
+    
+    print("\n" + _SEP60)
     print("✅ ALL TESTS COMPLETED SUCCESSFULLY!")
-    print("="*60)
\ No newline at end of file
+    print(_SEP60)
+    
+    # Generatorenes resultat bestemmer exit-koden; orkestratorsuiten rapporteres bare
+    if orchestrator_suite is not None and orchestrator_suite.wait() != 0:
+        print(f"⚠️  Orkestratorsuiten feilet (exit-kode {orchestrator_suite.returncode})")
\ No newline at end of file
@@ -1,19 +1,32 @@
 # chunk_agent.py -
 
+import asyncio
+import hashlib
 import pandas as pd
-import json
+import orjson
 import uuid
 import os
-from typing import List, Dict, Optional, Any, Literal
-from pydantic import BaseModel, Field, ValidationError
+import re
+import sqlite3
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any, Literal, Tuple
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 from enum import Enum
 
+try:
+    from enum import StrEnum
+except ImportError:  # Python 3.10
+    class StrEnum(str, Enum):
+        """Samme oppførsel som enum.StrEnum fra Python 3.11: str(medlem) gir verdien."""
+        def __str__(self) -> str:
+            return self.value
+
 # ==============================================================================
 # 1. DEFINISJON AV Pydantic-MODELLEN (CompleteChunkMetadata)
 # ==============================================================================
 # Dette er "malen" som LLM-en skal fylle ut for hver tekst-chunk.
 
-class DocumentType(str, Enum):
+class DocumentType(StrEnum):
     INSTRUKS = "instruks"
     BYRADSSAK = "byrådssak"
     KONTRAKTSMAL = "kontraktsmal"
@@ -21,7 +34,7 @@ class DocumentType(str, Enum):
     RAPPORT = "rapport"
     ANNET = "annet"
 
-class ChunkLevel(str, Enum):
+class ChunkLevel(StrEnum):
     DOCUMENT = "dokument"
     SECTION = "seksjon"
     SUBSECTION = "underseksjon"
@@ -29,7 +42,7 @@ class ChunkLevel(str, Enum):
     EXAMPLE = "eksempel"
     DEFINITION = "definisjon"
 
-class RiskType(str, Enum):
+class RiskType(StrEnum):
     ARBEIDSLIVSKRIMINALITET = "arbeidslivskriminalitet"
     SOSIAL_DUMPING = "sosial_dumping"
     MILJO = "miljø"
@@ -37,7 +50,7 @@ class RiskType(str, Enum):
     MENNESKERETTIGHETER = "menneskerettigheter"
     INGEN = "ingen"
 
-class Actor(str, Enum):
+class Actor(StrEnum):
     UKE = "Utviklings- og kompetanseetaten"
     LEVERANDOR = "Leverandør"
     OPPDRAGSGIVER = "Oppdragsgiver"
@@ -45,7 +58,7 @@ class Actor(str, Enum):
     VIRKSOMHET = "Virksomhet"
     BYM = "Bymiljøetaten"
 
-class RuleStatus(str, Enum):
+class RuleStatus(StrEnum):
     ACTIVE = "aktiv"
     PROPOSED = "foreslått"
     EXPIRED = "utløpt"
@@ -77,28 +90,73 @@ class CompleteChunkMetadata(BaseModel):
     parent_chunk_id: Optional[str] = Field(None, description="ID til overordnet chunk.")
     references_to_other_docs: List[str] = Field(default_factory=list, description="Referanser til andre dokumenter.")
 
+# Maks antall LLM-responser ChunkAgent holder i minnet for gjentatte tekster
+RESPONSE_CACHE_SIZE = 4096
+
+# Tabell for ferdige rader i checkpoint-databasen (se ChunkAgent.checkpoint_path)
+CHECKPOINT_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    schema_version TEXT NOT NULL,
+    input_hash TEXT,
+    status TEXT NOT NULL,
+    llm_output_json TEXT,
+    qa_notes TEXT
+)
+"""
+
+# Validator for LLM-responsene, bygget én gang for modulen
+CHUNK_METADATA_VALIDATOR = TypeAdapter(CompleteChunkMetadata)
+
+# JSON schema for modellen, generert én gang ved import i stedet for per ChunkAgent
+CHUNK_METADATA_SCHEMA = CompleteChunkMetadata.model_json_schema()
+CHUNK_METADATA_SCHEMA_JSON = orjson.dumps(CHUNK_METADATA_SCHEMA, option=orjson.OPT_INDENT_2).decode()
+# Fingeravtrykk av schemaet; lagrede resultater fra et annet schema gjenbrukes ikke
+CHUNK_METADATA_SCHEMA_VERSION = hashlib.blake2b(
+    CHUNK_METADATA_SCHEMA_JSON.encode('utf-8'), digest_size=8
+).hexdigest()
+
 # ==============================================================================
 # 2. MOCK LLM GATEWAY
 # ==============================================================================
 # Denne klassen simulerer din faktiske LLMGateway for å gjøre skriptet kjørbart.
 # I ditt prosjekt, vil du importere din faktiske LLMGateway her.
 
+# Teksten mellom markørene i ChunkAgent-prompten, funnet i ett søk
+_PROMPT_TEXT_RE = re.compile(r"Tekstutdrag som skal analyseres:(.*?)Din oppgave:", re.DOTALL)
+
 class MockLLMGateway:
     """
     En mock-klasse for å simulere LLM-kall.
     Den returnerer en forhåndsdefinert JSON-struktur for å teste arbeidsflyten.
     """
+    # Forhåndsgenererte chunk-id-er; fylles opp med ett os.urandom-kall om gangen
+    _uuid_pool: List[str] = []
+    UUID_POOL_SIZE = 1024
+
+    @classmethod
+    def _next_uuid(cls) -> str:
+        """Returnerer en tilfeldig UUID4-streng fra poolen."""
+        if not cls._uuid_pool:
+            raw = os.urandom(16 * cls.UUID_POOL_SIZE)
+            cls._uuid_pool = [
+                str(uuid.UUID(bytes=raw[i:i + 16], version=4))
+                for i in range(0, len(raw), 16)
+            ]
+        return cls._uuid_pool.pop()
+
     async def generate_structured(self, prompt: str, response_schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         print("\n--- Kaller MockLLMGateway ---")
         print(f"Temperatur: {kwargs.get('temperature', 'N/A')}")
         
         # Simulerer at LLM-en fyller ut data basert på input-teksten
         # I en ekte applikasjon ville dette vært et nettverkskall til OpenAI/Azure e.l.
-        raw_text_from_prompt = prompt.split("Tekstutdrag som skal analyseres:")[1].split("Din oppgave:")[0].strip()
+        match = _PROMPT_TEXT_RE.search(prompt)
+        raw_text_from_prompt = match.group(1).strip() if match else ""
 
         # Enkel logikk for å returnere en gyldig, men simpel, JSON-respons
         mock_response = {
-            "chunk_id": str(uuid.uuid4()),
+            "chunk_id": self._next_uuid(),
             "document_type": "instruks",
             "source_document_name": "Instruks_oslomodellen.pdf",
             "source_page": 1,
@@ -132,21 +190,26 @@ class ChunkAgent:
     Agent for å prosessere tekst-chunks, berike dem med metadata via en LLM,
     og lagre resultatet i en strukturert tabell (CSV).
     """
-    def __init__(self, llm_gateway):
+    def __init__(self, llm_gateway, max_concurrency: int = 8, batch_size: int = 1024,
+                 checkpoint_path: Optional[str] = None):
         self.llm_gateway = llm_gateway
-        # Hent JSON schema fra Pydantic-modellen én gang for gjenbruk
-        self.response_schema = CompleteChunkMetadata.model_json_schema()
-
-    def _build_prompt(self, raw_text: str) -> str:
-        """Bygger en detaljert og robust prompt for LLM-en."""
-        
-        # Bruker f-strings for å enkelt sette inn schema og tekst
-        return f"""
+        # Maks antall samtidige LLM-kall, for å holde oss innenfor rate limits
+        self.max_concurrency = max_concurrency
+        # Antall CSV-rader som leses, prosesseres og skrives om gangen
+        self.batch_size = batch_size
+        # Valgfri SQLite-database med ferdige rader; en ny kjøring gjenbruker dem i stedet for å kalle LLM-en
+        self.checkpoint_path = checkpoint_path
+        # LLM-kall per tekst (blake2b-hash), så identiske chunks bare sendes én gang
+        self._response_cache: "OrderedDict[bytes, asyncio.Future]" = OrderedDict()
+        # JSON schema fra Pydantic-modellen, delt av alle instanser
+        self.response_schema = CHUNK_METADATA_SCHEMA
+        # Den faste delen av prompten bygges én gang, ikke for hver rad
+        self._prompt_prefix = f"""
 Du er en ekspert på å analysere juridiske og administrative dokumenter for Oslo kommune. 
 Din oppgave er å lese et tekstutdrag, analysere det i dybden, og fylle ut et JSON-objekt basert på Pydantic-modellen som er spesifisert under \"Målformat\".
 
 **Målformat (JSON Schema):**
-{json.dumps(self.response_schema, indent=2)}
+{CHUNK_METADATA_SCHEMA_JSON}
 
 Instruksjoner:
 	1	Analyser teksten nøye.
@@ -155,62 +218,225 @@ Instruksjoner:
 	4	Din respons MÅ være et rent JSON-objekt som kan valideres mot schemaet ovenfor. Ikke inkluder noe annet tekst eller forklaringer.
 
 
-Tekstutdrag som skal analyseres: {raw_text}
+Tekstutdrag som skal analyseres: """
+        # Fingeravtrykk av prompt-malen; nøkkel for input-hashen i checkpointen
+        self._prompt_digest = hashlib.blake2b(self._build_prompt("").encode('utf-8'), digest_size=32).digest()
+
+    def _build_prompt(self, raw_text: str) -> str:
+        """Bygger en detaljert og robust prompt for LLM-en."""
+        
+        # Den faste delen er bygget én gang i __init__; kun teksten settes inn per rad
+        return f"""{self._prompt_prefix}{raw_text}
 
 Din oppgave: Returner ETT komplett JSON-objekt som representerer denne teksten, i henhold til Pydantic-modellen.
 """
 
+    def _input_hash(self, raw_text: Any) -> str:
+        """Hash av teksten og prompt-malen; et lagret resultat gjenbrukes bare hvis begge er uendret."""
+        # Tomme CSV-celler gir NaN (og tall gir ikke-str); de skal bare feile i sin egen rad
+        text = "" if pd.isna(raw_text) else str(raw_text)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16, key=self._prompt_digest).hexdigest()
+
+    async def _generate(self, raw_text: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Henter strukturert metadata for en tekst. Identiske tekster deler ett LLM-kall,
+        også når de prosesseres samtidig.
+        """
+        key = self._response_key(raw_text)
+        future = self._response_cache.get(key)
+        if future is not None:
+            self._response_cache.move_to_end(key)
+            return await future
+        
+        async def call_llm() -> Dict[str, Any]:
+            async with semaphore:
+                return await self.llm_gateway.generate_structured(
+                    prompt=self._build_prompt(raw_text),
+                    response_schema=self.response_schema,
+                    purpose="metadata_extraction",
+                    temperature=0.1
+                )
+        
+        future = self._response_cache[key] = asyncio.ensure_future(call_llm())
+        if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        try:
+            result = await future
+        except Exception:
+            # Feilede kall caches ikke, så neste forekomst av teksten prøver på nytt
+            self._evict_response(key, future)
+            raise
+        # Gatewayen returnerer {"error": ...} i stedet for å kaste; det skal heller ikke caches
+        if "error" in result:
+            self._evict_response(key, future)
+        return result
+
+    @staticmethod
+    def _response_key(raw_text: str) -> bytes:
+        """Nøkkel i responscachen for en tekst."""
+        return hashlib.blake2b(raw_text.encode('utf-8'), digest_size=16).digest()
+
+    def _evict_response(self, key: bytes, future: Optional[asyncio.Future] = None) -> None:
+        """Fjerner en cachet respons (kun hvis den fortsatt er `future`, når den er oppgitt)."""
+        if future is None or self._response_cache.get(key) is future:
+            self._response_cache.pop(key, None)
+
+    async def _process_row(self, index, chunk_id: str, raw_text: str,
+                           semaphore: asyncio.Semaphore) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Prosesserer én rad og returnerer (status, llm_output_json, qa_notes).
+        """
+        print(f"\nProsesserer rad {index} (chunk_id: {chunk_id})...")
+        
+        try:
+            # Kall LLM-en. Responsen deles med andre rader med samme tekst, så
+            # radens egen chunk_id settes på en kopi i stedet for den LLM-genererte
+            structured_response = {**await self._generate(raw_text, semaphore), "chunk_id": str(chunk_id)}
+            
+            # Valider responsen mot Pydantic-modellen
+            try:
+                CHUNK_METADATA_VALIDATOR.validate_python(structured_response)
+            except ValidationError as e:
+                print(f"Valideringsfeil for rad {index}: {e}")
+                # En ugyldig respons skal ikke gjenbrukes for senere rader med samme tekst
+                self._evict_response(self._response_key(raw_text))
+                return 'validation_error', None, f"Pydantic valideringsfeil: {e}"
+            
+            output_json = orjson.dumps(structured_response).decode()
+            print(f"Suksess for rad {index}.")
+            return 'processed', output_json, None
+
+        except Exception as e:
+            print(f"Feil under prosessering av rad {index}: {e}")
+            return 'llm_error', None, f"Feil under LLM-kall: {e}"
+
+    def _open_checkpoint(self) -> sqlite3.Connection:
+        """Åpner checkpoint-databasen i WAL-modus og oppretter tabellen ved behov."""
+        # Brukes fra trådpoolen via asyncio.to_thread, ett kall om gangen
+        conn = sqlite3.connect(self.checkpoint_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(CHECKPOINT_TABLE_SQL)
+        return conn
+
+    @staticmethod
+    def _load_checkpoint(conn: sqlite3.Connection,
+                         input_hash_by_chunk_id: Dict[str, str]) -> Dict[str, Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Henter (status, llm_output_json, qa_notes) for rader som allerede er prosessert med dagens
+        schema og med samme tekst og prompt-mal (input_hash).
+        """
+        chunk_ids = list(input_hash_by_chunk_id)
+        found = {}
+        # Holder oss under SQLites grense for antall parametre per spørring
+        for start in range(0, len(chunk_ids), 500):
+            part = chunk_ids[start:start + 500]
+            rows = conn.execute(
+                "SELECT chunk_id, input_hash, status, llm_output_json, qa_notes FROM chunks "
+                "WHERE status = 'processed' AND schema_version = ? "
+                f"AND chunk_id IN ({','.join('?' * len(part))})",
+                [CHUNK_METADATA_SCHEMA_VERSION, *part]
+            )
+            found.update((row[0], row[2:]) for row in rows if row[1] == input_hash_by_chunk_id[row[0]])
+        return found
+
+    @staticmethod
+    def _save_checkpoint(conn: sqlite3.Connection, rows: List[Tuple[str, str, str, Optional[str], Optional[str]]]):
+        """Lagrer en batch med (chunk_id, input_hash, status, llm_output_json, qa_notes) i én transaksjon."""
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunks (chunk_id, schema_version, input_hash, status, llm_output_json, qa_notes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(chunk_id, CHUNK_METADATA_SCHEMA_VERSION, *rest) for chunk_id, *rest in rows]
+            )
+
+    async def _process_batch(self, df: pd.DataFrame, semaphore: asyncio.Semaphore,
+                             checkpoint: Optional[sqlite3.Connection] = None) -> pd.DataFrame:
+        """
+        Prosesserer radene med status 'pending' i én batch og returnerer den oppdaterte batchen.
+        """
+        # Sørg for at output-kolonnene finnes, som object-dtype så tekst kan settes inn direkte
+        for column in ('llm_output_json', 'qa_notes'):
+            if column not in df.columns:
+                df[column] = None
+            df[column] = df[column].astype(object)
+
+        pending_index = df.index[df['status'].values == 'pending']
+        results: Dict[Any, Tuple[str, Optional[str], Optional[str]]] = {}
+        
+        # Rader som ble ferdige i en tidligere kjøring hentes fra checkpointen
+        if checkpoint is not None and len(pending_index):
+            index_by_chunk_id = {str(df.at[index, 'chunk_id']): index for index in pending_index}
+            input_hash_by_chunk_id = {
+                chunk_id: self._input_hash(df.at[index, 'raw_text']) for chunk_id, index in index_by_chunk_id.items()
+            }
+            saved = await asyncio.to_thread(self._load_checkpoint, checkpoint, input_hash_by_chunk_id)
+            for chunk_id, result in saved.items():
+                results[index_by_chunk_id[chunk_id]] = result
+        
+        # Radene er uavhengige, så LLM-kallene kjøres samtidig (begrenset av semaforen)
+        to_process = [index for index in pending_index if index not in results]
+        outcomes = await asyncio.gather(
+            *(self._process_row(index, df.at[index, 'chunk_id'], df.at[index, 'raw_text'], semaphore)
+              for index in to_process),
+            return_exceptions=True
+        )
+        for index, outcome in zip(to_process, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = ('llm_error', None, f"Feil under LLM-kall: {outcome}")
+            results[index] = outcome
+        
+        if checkpoint is not None and to_process:
+            await asyncio.to_thread(
+                self._save_checkpoint, checkpoint,
+                [(str(df.at[index, 'chunk_id']), self._input_hash(df.at[index, 'raw_text']), *results[index])
+                 for index in to_process]
+            )
+        
+        # Samle oppdateringene per kolonne, og skriv hver kolonne i én tilordning
+        updates: Dict[str, Dict[Any, str]] = {'status': {}, 'llm_output_json': {}, 'qa_notes': {}}
+        for index, result in results.items():
+            for column, value in zip(('status', 'llm_output_json', 'qa_notes'), result):
+                if value is not None:
+                    updates[column][index] = value
+        
+        for column, values in updates.items():
+            if values:
+                df.loc[list(values), column] = list(values.values())
+        
+        return df
+
     async def process_csv(self, input_filepath: str, output_filepath: str):
         """
-        Leser en CSV-fil, prosesserer rader med status 'pending', og lagrer 
+        Leser en CSV-fil i batcher, prosesserer rader med status 'pending', og lagrer 
         resultatet til en ny CSV-fil.
         """
         try:
-            df = pd.read_csv(input_filepath)
+            reader = await asyncio.to_thread(pd.read_csv, input_filepath, chunksize=self.batch_size)
         except FileNotFoundError:
             print(f"Feil: Finner ikke filen {input_filepath}")
             return
 
-        # Sørg for at output-kolonnene finnes
-        if 'llm_output_json' not in df.columns:
-            df['llm_output_json'] = None
-        if 'qa_notes' not in df.columns:
-            df['qa_notes'] = None
-
-        # Iterer kun gjennom rader som trenger prosessering
-        for index, row in df[df['status'] == 'pending'].iterrows():
-            print(f"\nProsesserer rad {index} (chunk_id: {row['chunk_id']})...")
-            
-            raw_text = row['raw_text']
-            prompt = self._build_prompt(raw_text)
-            
-            try:
-                # Kall LLM-en
-                structured_response = await self.llm_gateway.generate_structured(
-                    prompt=prompt,
-                    response_schema=self.response_schema,
-                    purpose="metadata_extraction",
-                    temperature=0.1
-                )
-                
-                # Valider responsen mot Pydantic-modellen
-                try:
-                    CompleteChunkMetadata.model_validate(structured_response)
-                    df.loc[index, 'llm_output_json'] = json.dumps(structured_response, ensure_ascii=False)
-                    df.loc[index, 'status'] = 'processed'
-                    print(f"Suksess for rad {index}.")
-                except ValidationError as e:
-                    df.loc[index, 'status'] = 'validation_error'
-                    df.loc[index, 'qa_notes'] = f"Pydantic valideringsfeil: {e}"
-                    print(f"Valideringsfeil for rad {index}: {e}")
-
-            except Exception as e:
-                df.loc[index, 'status'] = 'llm_error'
-                df.loc[index, 'qa_notes'] = f"Feil under LLM-kall: {e}"
-                print(f"Feil under prosessering av rad {index}: {e}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        checkpoint = await asyncio.to_thread(self._open_checkpoint) if self.checkpoint_path else None
+        
+        # Hver batch skrives til output-filen før neste leses, så ferdige rader er lagret
+        # underveis og minnebruken holdes på batch-størrelse
+        # CSV-parsing og -skriving kjøres i en tråd, så event-loopen (og LLM-kallene) ikke blokkeres
+        first_batch = True
+        try:
+            with reader:
+                while (batch_df := await asyncio.to_thread(next, reader, None)) is not None:
+                    batch_df = await self._process_batch(batch_df, semaphore, checkpoint)
+                    await asyncio.to_thread(
+                        batch_df.to_csv, output_filepath,
+                        mode='w' if first_batch else 'a', header=first_batch, index=False
+                    )
+                    first_batch = False
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
         
-        # Lagre den oppdaterte DataFrame til en ny fil
-        df.to_csv(output_filepath, index=False)
         print(f"\nProsessering fullført. Resultatet er lagret i {output_filepath}")
 
 # ==============================================================================
@@ -254,6 +480,11 @@ async def main():
     print(processed_df.to_string(index=False))
 
 if __name__ == "__main__":
-    import asyncio
-    # Kjører den asynkrone main-funksjonen
-    asyncio.run(main())
+    # Kjører den asynkrone main-funksjonen, på uvloop hvis tilgjengelig.
+    # Ingen import fra src, så skriptet kan kjøres direkte fra tests/unit.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -7,10 +7,10 @@ import pytest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
+from types import MappingProxyType
 from pydantic import ValidationError
 
-from src.specialists.environmental_agent_refactored import EnvironmentalAgent
-from src.models.procurement_models_refactored import (
+from src.models.procurement_models import (
     ProcurementRequest, 
     ProcurementCategory,
     EnvironmentalRiskLevel,
@@ -18,32 +18,88 @@ from src.models.procurement_models_refactored import (
     TransportType
 )
 
+# Uforanderlig embedding-vektor, bygget én gang ved import og delt av alle mock-kall
+_MOCK_EMBEDDING = (0.1,) * 1536
+
+# Temaene agenten skal kjenne fra kunnskapsbasen, i fast rekkefølge
+_EXPECTED_THEMES = (
+    "Standard klima- og miljøkrav",
+    "Utslippsfri massetransport",
+    "Kjøretøy over 3,5 tonn",
+    "Unntak",
+    "Oppfølging og sanksjonering",
+    "Planlegging og markedsdialog"
+)
+
+# Felles mal for mockede LLM-vurderinger; testene overstyrer bare feltene som varierer
+_BASE_MOCK_ASSESSMENT = MappingProxyType({
+    "assessed_by": "environmental_agent",
+    "environmental_risk": "høy",
+    "climate_impact_assessed": True,
+    "transport_requirements": [],
+    "exceptions_recommended": [],
+    "minimum_biofuel_required": False,
+    "important_deadlines": {},
+    "documentation_requirements": ["Test"],
+    "follow_up_points": [],
+    "market_dialogue_recommended": False,
+    "award_criteria_recommended": [],
+    "recommendations": [],
+    "confidence": 0.9
+})
+
+# The async tests are marked one by one to share a session-wide event loop (loop_scope needs
+# pytest-asyncio >= 0.24); a module-level pytestmark would also mark the sync tests and warn.
 class TestEnvironmentalAgent:
     """Test suite for EnvironmentalAgent with validation."""
     
     @pytest.fixture
     def mock_llm_gateway(self):
-        """Mock LLM gateway."""
-        gateway = AsyncMock()
-        return gateway
+        """Mock LLM gateway, spec'd so misspelled methods fail."""
+        from src.tools.llm_gateway import LLMGateway
+        return AsyncMock(spec=LLMGateway)
     
     @pytest.fixture
     def mock_embedding_gateway(self):
-        """Mock embedding gateway."""
-        gateway = AsyncMock()
-        gateway.create_embedding.return_value = [0.1] * 1536  # Mock embedding vector
+        """Mock embedding gateway, spec'd so misspelled methods fail."""
+        from src.tools.embedding_gateway import EmbeddingGateway
+        gateway = AsyncMock(spec=EmbeddingGateway)
+        gateway.create_batch_embeddings.side_effect = lambda texts, **kwargs: [_MOCK_EMBEDDING for _ in texts]  # Mock embedding vectors
         return gateway
     
     @pytest.fixture
     def environmental_agent(self, mock_llm_gateway, mock_embedding_gateway):
         """Create EnvironmentalAgent instance with mocked dependencies."""
-        agent = EnvironmentalAgent(mock_llm_gateway, mock_embedding_gateway)
-        return agent
+        # Importeres her så innsamlingen slipper å laste agenten med LLM-, embedding- og RPC-avhengighetene
+        from src.specialists.environmental_agent import EnvironmentalAgent
+        return EnvironmentalAgent(mock_llm_gateway, mock_embedding_gateway)
+    
+    @pytest.fixture(scope="class")
+    @classmethod
+    def patched_rpc(cls):
+        """Patch RPCGatewayClient once for the whole class and yield the shared client mock."""
+        with patch('src.specialists.environmental_agent.RPCGatewayClient') as rpc_client_class:
+            client = AsyncMock()
+            client.__aenter__ = AsyncMock(return_value=client)
+            client.__aexit__ = AsyncMock(return_value=None)
+            rpc_client_class.return_value = client
+            yield client
     
     @pytest.fixture
+    def rpc_client_mock(self, patched_rpc):
+        """The patched RPC client, reset to the default empty search result for each test."""
+        patched_rpc.call.reset_mock(return_value=True, side_effect=True)
+        patched_rpc.call.return_value = {"status": "success", "results": []}
+        return patched_rpc
+    
+    @pytest.fixture(scope="session")
     def sample_construction_procurement(self):
-        """Sample construction procurement for testing."""
-        return ProcurementRequest(
+        """Sample construction procurement for testing (read-only, shared by the session).
+        
+        Built with model_construct since the values are known-valid; input
+        validation itself is covered by test_execute_validates_input.
+        """
+        return ProcurementRequest.model_construct(
             name="Totalentreprise ny barneskole",
             value=25_000_000,
             description="Bygging av ny barneskole med idrettshall og uteområder",
@@ -52,10 +108,15 @@ class TestEnvironmentalAgent:
             includes_construction=True
         )
     
+    @pytest.fixture(scope="session")
+    def sample_construction_procurement_dump(self, sample_construction_procurement):
+        """model_dump() of the sample construction procurement, computed once."""
+        return sample_construction_procurement.model_dump()
+    
     @pytest.fixture
     def sample_small_procurement(self):
         """Sample small procurement for testing."""
-        return ProcurementRequest(
+        return ProcurementRequest.model_construct(
             name="Innkjøp av kontorutstyr",
             value=50_000,
             description="Stoler og skrivepulter til kontorer",
@@ -64,7 +125,7 @@ class TestEnvironmentalAgent:
             includes_construction=False
         )
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_execute_validates_input(self, environmental_agent, mock_llm_gateway):
         """Test that execute validates input using Pydantic."""
         # Test with invalid input
@@ -78,48 +139,14 @@ class TestEnvironmentalAgent:
             await environmental_agent.execute(invalid_params)
         assert "Invalid procurement data" in str(exc_info.value)
     
-    @pytest.mark.asyncio
-    async def test_execute_validates_output(self, environmental_agent, mock_llm_gateway, mock_embedding_gateway):
-        """Test that execute validates output using Pydantic."""
-        # Mock RPC client
-        mock_rpc_client = AsyncMock()
-        mock_rpc_client.call.return_value = {"status": "success", "results": []}
-        mock_rpc_client.__aenter__ = AsyncMock(return_value=mock_rpc_client)
-        mock_rpc_client.__aexit__ = AsyncMock(return_value=None)
-        
-        with patch('src.specialists.environmental_agent_refactored.RPCGatewayClient', return_value=mock_rpc_client):
-            # Mock LLM responses
-            mock_llm_gateway.generate_structured.side_effect = [
-                # Planning response
-                {
-                    "themes": ["Standard klima- og miljøkrav"],
-                    "value_above_threshold": True,
-                    "involves_mass_transport": False,
-                    "involves_heavy_vehicles": False,
-                    "exception_likely": False
-                },
-                # Assessment with valid enum value
-                {
-                    "procurement_id": "test-id",
-                    "procurement_name": "Test",
-                    "assessed_by": "environmental_agent",
-                    "environmental_risk": "høy",  # Valid enum value
-                    "climate_impact_assessed": True,
-                    "transport_requirements": [],
-                    "exceptions_recommended": [],
-                    "minimum_biofuel_required": False,
-                    "important_deadlines": {},
-                    "documentation_requirements": ["Test requirement"],
-                    "follow_up_points": [],
-                    "market_dialogue_recommended": False,
-                    "award_criteria_recommended": [],
-                    "recommendations": [],
-                    "confidence": 0.9
-                }
-            ]
-            
-            params = {
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize(
+        "params_factory",
+        [
+            # Minimal procurement dict
+            lambda dump: {
                 "procurement": {
+                    "id": "test-id",
                     "name": "Test Procurement",
                     "value": 1000000,
                     "description": "Test",
@@ -127,20 +154,51 @@ class TestEnvironmentalAgent:
                     "duration_months": 12,
                     "includes_construction": False
                 }
+            },
+            # Full Pydantic object dict
+            lambda dump: {"procurement": dump}
+        ],
+        ids=["minimal", "construction"]
+    )
+    async def test_execute_full_workflow(self, environmental_agent, mock_llm_gateway, mock_embedding_gateway, sample_construction_procurement_dump, rpc_client_mock, params_factory):
+        """Test the complete execute workflow, validating both input and output."""
+        params = params_factory(sample_construction_procurement_dump)
+        procurement = params["procurement"]
+        
+        # Mock planning and assessment responses
+        mock_llm_gateway.generate_structured.side_effect = [
+            # Planning response
+            {
+                "themes": ["Standard klima- og miljøkrav"],
+                "value_above_threshold": True,
+                "involves_mass_transport": True,
+                "involves_heavy_vehicles": False,
+                "exception_likely": False
+            },
+            # Assessment with valid enum value
+            {
+                **_BASE_MOCK_ASSESSMENT,
+                "procurement_id": procurement["id"],
+                "procurement_name": procurement["name"],
+                "market_dialogue_recommended": True,
+                "confidence": 0.80
             }
-            
-            result = await environmental_agent.execute(params)
-            
-            # Verify result is a valid dict that could be validated
-            assert isinstance(result, dict)
-            assert result["environmental_risk"] == "høy"
-            assert result["confidence"] == 0.9
-            
-            # Verify the result can be validated as EnvironmentalAssessmentResult
-            validated = EnvironmentalAssessmentResult.model_validate(result)
-            assert validated.environmental_risk == EnvironmentalRiskLevel.HIGH
+        ]
+        
+        result = await environmental_agent.execute(params)
+        
+        # execute() has already validated the assessment and returned its model_dump();
+        # the mocked confidence (not the default 0.5) shows the validated path was taken
+        assert isinstance(result, dict)
+        expected = {
+            "environmental_risk": EnvironmentalRiskLevel.HIGH.value,
+            "market_dialogue_recommended": True,
+            "confidence": 0.80,
+            "procurement_id": procurement["id"]
+        }
+        assert expected.items() <= result.items()
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_plan_retrieval_with_pydantic_object(self, environmental_agent, mock_llm_gateway, sample_construction_procurement):
         """Test retrieval planning with Pydantic ProcurementRequest object."""
         # Mock LLM response for planning
@@ -166,12 +224,11 @@ class TestEnvironmentalAgent:
         assert str(sample_construction_procurement.value) in prompt
         assert sample_construction_procurement.category.value in prompt
     
-    @pytest.mark.asyncio
-    async def test_fetch_relevant_context_with_pydantic(self, environmental_agent, mock_embedding_gateway, sample_construction_procurement):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_fetch_relevant_context_with_pydantic(self, environmental_agent, mock_embedding_gateway, sample_construction_procurement, rpc_client_mock):
         """Test context fetching with Pydantic object."""
-        # Mock RPC client and response
-        mock_rpc_client = AsyncMock()
-        mock_rpc_client.call.return_value = {
+        # Mock RPC response
+        rpc_client_mock.call.return_value = {
             "status": "success",
             "results": [
                 {
@@ -181,37 +238,33 @@ class TestEnvironmentalAgent:
                 }
             ]
         }
-        mock_rpc_client.__aenter__ = AsyncMock(return_value=mock_rpc_client)
-        mock_rpc_client.__aexit__ = AsyncMock(return_value=None)
         
-        with patch('src.specialists.environmental_agent_refactored.RPCGatewayClient', return_value=mock_rpc_client):
-            plan = {
-                "themes": ["Standard klima- og miljøkrav"],
-                "value_above_threshold": True
-            }
-            
-            # Pass Pydantic object
-            result = await environmental_agent._fetch_relevant_context(plan, sample_construction_procurement)
-            
-            assert len(result) == 1
-            assert result[0]["documentId"] == "miljokrav-001"
-            
-            # Verify search query used Pydantic fields
-            embedding_call_args = mock_embedding_gateway.create_embedding.call_args
-            search_text = embedding_call_args[1]['text']
-            assert sample_construction_procurement.category.value in search_text
-            assert str(sample_construction_procurement.value) in search_text
+        plan = {
+            "themes": ["Standard klima- og miljøkrav"],
+            "value_above_threshold": True
+        }
+        
+        # Pass Pydantic object
+        result = await environmental_agent._fetch_relevant_context(plan, sample_construction_procurement)
+        
+        assert len(result) == 1
+        assert result[0]["documentId"] == "miljokrav-001"
+        
+        # Verify search query used Pydantic fields
+        embedding_call_args = mock_embedding_gateway.create_batch_embeddings.call_args
+        search_text = embedding_call_args[1]['texts'][0]
+        assert sample_construction_procurement.category.value in search_text
+        assert str(sample_construction_procurement.value) in search_text
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_generate_assessment_with_pydantic(self, environmental_agent, mock_llm_gateway, sample_construction_procurement):
         """Test assessment generation with Pydantic object."""
         # Mock LLM response
         mock_assessment = {
+            **_BASE_MOCK_ASSESSMENT,
             "procurement_id": sample_construction_procurement.id,
             "procurement_name": sample_construction_procurement.name,
-            "assessed_by": "environmental_agent",
             "environmental_risk": "middels",
-            "climate_impact_assessed": True,
             "transport_requirements": [
                 {
                     "type": "massetransport",
@@ -221,8 +274,6 @@ class TestEnvironmentalAgent:
                     "incentive_applicable": True
                 }
             ],
-            "exceptions_recommended": [],
-            "minimum_biofuel_required": False,
             "important_deadlines": {
                 "massetransport": "2030-01-01",
                 "kjøretøy_35tonn": "2027-01-01"
@@ -259,9 +310,12 @@ class TestEnvironmentalAgent:
             context
         )
         
-        assert result["environmental_risk"] == "middels"
-        assert result["market_dialogue_recommended"] is True
-        assert result["confidence"] == 0.85
+        expected = {
+            "environmental_risk": "middels",
+            "market_dialogue_recommended": True,
+            "confidence": 0.85
+        }
+        assert expected.items() <= result.items()
         
         # Verify prompt used Pydantic fields
         call_args = mock_llm_gateway.generate_structured.call_args
@@ -270,70 +324,11 @@ class TestEnvironmentalAgent:
         assert sample_construction_procurement.name in prompt
         assert str(sample_construction_procurement.value) in prompt
     
-    @pytest.mark.asyncio
-    async def test_execute_full_workflow_with_validation(self, environmental_agent, mock_llm_gateway, mock_embedding_gateway, sample_construction_procurement):
-        """Test the complete execute workflow with full validation."""
-        # Mock RPC client
-        mock_rpc_client = AsyncMock()
-        mock_rpc_client.call.return_value = {"status": "success", "results": []}
-        mock_rpc_client.__aenter__ = AsyncMock(return_value=mock_rpc_client)
-        mock_rpc_client.__aexit__ = AsyncMock(return_value=None)
-        
-        with patch('src.specialists.environmental_agent_refactored.RPCGatewayClient', return_value=mock_rpc_client):
-            # Mock planning and assessment responses
-            mock_llm_gateway.generate_structured.side_effect = [
-                # Planning response
-                {
-                    "themes": ["Standard klima- og miljøkrav"],
-                    "value_above_threshold": True,
-                    "involves_mass_transport": True,
-                    "involves_heavy_vehicles": False,
-                    "exception_likely": False
-                },
-                # Assessment response
-                {
-                    "procurement_id": sample_construction_procurement.id,
-                    "procurement_name": sample_construction_procurement.name,
-                    "assessed_by": "environmental_agent",
-                    "environmental_risk": "høy",
-                    "climate_impact_assessed": True,
-                    "transport_requirements": [],
-                    "exceptions_recommended": [],
-                    "minimum_biofuel_required": False,
-                    "important_deadlines": {},
-                    "documentation_requirements": ["Test"],
-                    "follow_up_points": [],
-                    "market_dialogue_recommended": True,
-                    "award_criteria_recommended": [],
-                    "recommendations": [],
-                    "confidence": 0.80
-                }
-            ]
-            
-            # Execute with Pydantic object dict
-            params = {"procurement": sample_construction_procurement.model_dump()}
-            result = await environmental_agent.execute(params)
-            
-            assert result["environmental_risk"] == "høy"
-            assert result["market_dialogue_recommended"] is True
-            assert result["confidence"] == 0.80
-            assert result["procurement_id"] == sample_construction_procurement.id
-            
-            # Verify result is valid according to schema
-            validated = EnvironmentalAssessmentResult.model_validate(result)
-            assert validated.environmental_risk == EnvironmentalRiskLevel.HIGH
-            assert validated.confidence == 0.80
-    
-    @pytest.mark.asyncio
-    async def test_default_assessment_on_validation_error(self, environmental_agent, mock_llm_gateway, mock_embedding_gateway, sample_construction_procurement):
-        """Test that default assessment is used when validation fails."""
-        # Mock RPC client
-        mock_rpc_client = AsyncMock()
-        mock_rpc_client.call.return_value = {"status": "success", "results": []}
-        mock_rpc_client.__aenter__ = AsyncMock(return_value=mock_rpc_client)
-        mock_rpc_client.__aexit__ = AsyncMock(return_value=None)
-        
-        with patch('src.specialists.environmental_agent_refactored.RPCGatewayClient', return_value=mock_rpc_client):
+    @pytest.mark.asyncio(loop_scope="session")
+    @pytest.mark.parametrize("via_execute", [False, True], ids=["direct", "invalid_llm_response"])
+    async def test_falls_back_to_default_assessment(self, environmental_agent, mock_llm_gateway, sample_construction_procurement, sample_construction_procurement_dump, rpc_client_mock, via_execute):
+        """Test the default assessment, built directly and as execute()'s fallback when validation fails."""
+        if via_execute:
             # Mock planning and invalid assessment responses
             mock_llm_gateway.generate_structured.side_effect = [
                 # Planning response
@@ -352,28 +347,24 @@ class TestEnvironmentalAgent:
                 }
             ]
             
-            params = {"procurement": sample_construction_procurement.model_dump()}
+            params = {"procurement": sample_construction_procurement_dump}
             result = await environmental_agent.execute(params)
-            
-            # Should return default assessment
-            assert result["confidence"] == 0.5  # Default confidence
-            assert result["procurement_id"] == sample_construction_procurement.id
-            assert result["procurement_name"] == sample_construction_procurement.name
-            assert "documentation_requirements" in result
-            assert len(result["documentation_requirements"]) > 0
-    
-    def test_create_default_assessment(self, environmental_agent, sample_construction_procurement):
-        """Test creation of default assessment."""
-        assessment = environmental_agent._create_default_assessment(sample_construction_procurement)
+        else:
+            assessment = environmental_agent._create_default_assessment(sample_construction_procurement)
+            assert isinstance(assessment, EnvironmentalAssessmentResult)
+            result = assessment.model_dump()
         
-        assert isinstance(assessment, EnvironmentalAssessmentResult)
-        assert assessment.procurement_id == sample_construction_procurement.id
-        assert assessment.procurement_name == sample_construction_procurement.name
-        assert assessment.environmental_risk == EnvironmentalRiskLevel.MEDIUM  # 25M > 5M
-        assert assessment.confidence == 0.5
-        assert assessment.market_dialogue_recommended is True  # 25M > 10M
-        assert len(assessment.documentation_requirements) > 0
-        assert len(assessment.follow_up_points) > 0
+        # Should be the default assessment
+        expected = {
+            "confidence": 0.5,  # Default confidence
+            "procurement_id": sample_construction_procurement.id,
+            "procurement_name": sample_construction_procurement.name,
+            "environmental_risk": EnvironmentalRiskLevel.MEDIUM,  # 25M > 5M
+            "market_dialogue_recommended": True  # 25M > 10M
+        }
+        assert expected.items() <= result.items()
+        assert len(result["documentation_requirements"]) > 0
+        assert len(result["follow_up_points"]) > 0
     
     def test_key_dates_configuration(self, environmental_agent):
         """Test that key dates are properly configured."""
@@ -393,16 +384,7 @@ class TestEnvironmentalAgent:
     
     def test_valid_themes_configuration(self, environmental_agent):
         """Test that valid themes are properly configured."""
-        expected_themes = [
-            "Standard klima- og miljøkrav",
-            "Utslippsfri massetransport", 
-            "Kjøretøy over 3,5 tonn",
-            "Unntak",
-            "Oppfølging og sanksjonering",
-            "Planlegging og markedsdialog"
-        ]
-        
-        assert environmental_agent.valid_themes == expected_themes
+        assert tuple(environmental_agent.valid_themes) == _EXPECTED_THEMES
 
 if __name__ == "__main__":
     # Run tests directly for debugging
@@ -0,0 +1,33 @@
+# tests/unit/test_llm_gateway.py
+"""
+Unit tests for LLMGateway's per-event-loop state. No requests are sent to Gemini.
+"""
+import asyncio
+import pytest
+
+from src.tools.llm_gateway import LLMGateway
+
+
+@pytest.fixture
+def llm_gateway(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "3")
+    return LLMGateway()
+
+
+async def _get_concurrency(gateway):
+    return gateway._get_concurrency()
+
+
+def test_concurrency_semaphore_is_created_lazily_per_loop(llm_gateway):
+    assert len(llm_gateway._concurrency_by_loop) == 0
+
+    first = asyncio.run(_get_concurrency(llm_gateway))
+    second = asyncio.run(_get_concurrency(llm_gateway))
+
+    assert first is not second
+    assert first._value == second._value == 3
+
+
+async def test_concurrency_semaphore_is_reused_within_a_loop(llm_gateway):
+    assert llm_gateway._get_concurrency() is llm_gateway._get_concurrency()
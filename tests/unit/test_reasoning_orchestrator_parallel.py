@@ -0,0 +1,134 @@
+# tests/unit/test_reasoning_orchestrator_parallel.py
+"""
+Unit tests for parallel agent actions in ReasoningOrchestrator.
+LLMGateway, RPCGatewayClient and the specialist agents are mocked, so no network is used.
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.tools.llm_gateway import LLMGateway
+from src.orchestrators.reasoning_orchestrator import ReasoningOrchestrator, ExecutionContext, Goal, GoalStatus
+
+# Simulert kjøretid per agent; den første planlagte agenten er tregest, så fullføringsrekkefølgen blir motsatt
+AGENT_DELAYS = {
+    "agent.run_triage": 0.15,
+    "agent.run_oslomodell": 0.10,
+    "agent.run_environmental": 0.05,
+}
+
+
+def _plan(method, parallel_actions):
+    """LLM response for one planning step."""
+    return {
+        "method": method,
+        "parameters": {"procurement": {"name": "Test"}},
+        "reasoning": "Test",
+        "expected_outcome": "Test",
+        "parallel_actions": parallel_actions,
+    }
+
+
+@pytest.fixture
+def mock_llm_gateway():
+    return AsyncMock(spec=LLMGateway)
+
+
+@pytest.fixture
+def orchestrator(mock_llm_gateway):
+    return ReasoningOrchestrator(llm_gateway=mock_llm_gateway)
+
+
+@pytest.fixture
+def rpc_client():
+    """Patches RPCGatewayClient in the orchestrator with an async context manager mock."""
+    with patch('src.orchestrators.reasoning_orchestrator.RPCGatewayClient') as rpc_client_class:
+        client = AsyncMock()
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock(return_value=None)
+        client.call.return_value = {"status": "success"}
+        rpc_client_class.return_value = client
+        yield client
+
+
+def _context():
+    """Fresh execution context with an empty goal."""
+    goal = Goal(id="goal-1", description="Test", context={}, success_criteria=["Test"])
+    return ExecutionContext(goal=goal, available_tools=[])
+
+
+@pytest.mark.asyncio
+async def test_parallel_actions_keep_only_unique_agent_methods(orchestrator, mock_llm_gateway):
+    mock_llm_gateway.generate_structured.return_value = _plan("agent.run_triage", [
+        {"method": "agent.run_oslomodell", "parameters": {"a": 1}},
+        {"method": "database.save_triage_result", "parameters": {}},  # not an agent call
+        {"method": "agent.run_oslomodell", "parameters": {"a": 2}},   # duplicate
+        {"method": "agent.run_triage", "parameters": {}},             # same as the main action
+        {"parameters": {}},                                           # no method
+        {"method": "agent.run_environmental"},
+    ])
+
+    action = await orchestrator._plan_next_action(_context())
+
+    assert action.method == "agent.run_triage"
+    assert [a.method for a in action.parallel] == ["agent.run_oslomodell", "agent.run_environmental"]
+    assert action.parallel[0].parameters == {"a": 1}
+    assert action.parallel[1].parameters == {}
+
+
+@pytest.mark.asyncio
+async def test_parallel_actions_absent_gives_single_action(orchestrator, mock_llm_gateway):
+    plan = _plan("database.create_procurement", [])
+    del plan["parallel_actions"]
+    mock_llm_gateway.generate_structured.return_value = plan
+
+    action = await orchestrator._plan_next_action(_context())
+
+    assert action.method == "database.create_procurement"
+    assert action.parallel == []
+
+
+@pytest.mark.asyncio
+async def test_achieve_goal_runs_parallel_agents_concurrently_in_planned_order(orchestrator, mock_llm_gateway, rpc_client):
+    timings = {}
+
+    async def slow_agent(method, parameters):
+        start = time.perf_counter()
+        await asyncio.sleep(AGENT_DELAYS[method])
+        timings[method] = (start, time.perf_counter())
+        return {"color": "GRØNN"} if method == "agent.run_triage" else {"status": "ok"}
+
+    async def llm_response(prompt, purpose, **kwargs):
+        if purpose == "action_planning":
+            return _plan("agent.run_triage", [
+                {"method": "agent.run_oslomodell", "parameters": {}},
+                {"method": "agent.run_environmental", "parameters": {}},
+            ])
+        return {"all_criteria_met": True, "unmet_criteria": [], "reasoning": "Done"}
+
+    mock_llm_gateway.generate_structured.side_effect = llm_response
+    goal = Goal(id="goal-1", description="Test", context={}, success_criteria=["Test"])
+
+    with patch.object(orchestrator, "_discover_tools", AsyncMock(return_value=[])), \
+         patch.object(orchestrator, "_call_specialist_agent", side_effect=slow_agent):
+        context = await orchestrator.achieve_goal(goal)
+
+    assert goal.status == GoalStatus.COMPLETED
+
+    # The calls overlap: every agent started before the first one finished
+    starts = [start for start, _ in timings.values()]
+    ends = [end for _, end in timings.values()]
+    assert len(timings) == 3
+    assert max(starts) < min(ends)
+
+    # History follows the planned order even though the agents finished in reverse
+    assert timings["agent.run_environmental"][1] < timings["agent.run_triage"][1]
+    assert [entry["action"]["method"] for entry in context.execution_history] == [
+        "agent.run_triage", "agent.run_oslomodell", "agent.run_environmental"
+    ]
+
+    # Every successful result reached the state
+    assert context.current_state["triage_completed"] is True
+    assert context.current_state["oslomodell_completed"] is True
+    assert context.current_state["environmental_completed"] is True
@@ -0,0 +1,91 @@
+# tests/unit/test_rpc_gateway_client.py
+"""
+Unit tests for the shared RPCGatewayClient instances. The gateway is never contacted.
+"""
+import asyncio
+import orjson
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.tools import rpc_gateway_client
+from src.tools.rpc_gateway_client import (
+    RPCBatchError, RPCError, RPCGatewayClient, get_shared_client, close_shared_clients
+)
+
+
+@pytest.fixture
+def entered_clients():
+    """Skips the health probe and records which clients are closed."""
+    async def enter(client):
+        return client
+
+    closed = []
+
+    async def exit_(client, *exc_info):
+        closed.append(client)
+
+    with patch.object(RPCGatewayClient, "__aenter__", enter), patch.object(RPCGatewayClient, "__aexit__", exit_):
+        yield closed
+
+
+async def test_shared_client_is_reused_on_the_same_loop(entered_clients):
+    first, second = await asyncio.gather(get_shared_client("agent"), get_shared_client("agent"))
+
+    assert first is second
+    assert first is not await get_shared_client("other-agent")
+
+    await close_shared_clients()
+    assert len(entered_clients) == 2
+
+
+def test_shared_clients_are_per_loop(entered_clients):
+    async def use_and_close():
+        client = await get_shared_client("agent")
+        await close_shared_clients()
+        return client
+
+    async def use_only():
+        return await get_shared_client("agent")
+
+    first = asyncio.run(use_and_close())
+    second = asyncio.run(use_and_close())
+
+    assert first is not second
+    assert entered_clients == [first, second]
+    assert len(rpc_gateway_client._SHARED_CLIENTS) == 0
+
+
+def test_clients_of_closed_loops_are_dropped(entered_clients):
+    async def use_only():
+        return await get_shared_client("agent")
+
+    loop = asyncio.new_event_loop()
+    leftover = loop.run_until_complete(use_only())
+    loop.close()
+    assert rpc_gateway_client._SHARED_CLIENTS[loop] == {("agent", leftover.base_url): leftover}
+
+    # The next lookup on another loop forgets the closed loop without closing on it
+    asyncio.run(use_only())
+    assert loop not in rpc_gateway_client._SHARED_CLIENTS
+    assert loop not in rpc_gateway_client._SHARED_CLIENTS_LOCKS
+    assert entered_clients == []
+    rpc_gateway_client._SHARED_CLIENTS.clear()
+
+
+async def test_call_batch_keeps_results_of_successful_calls():
+    client = RPCGatewayClient("agent")
+    response = MagicMock(content=orjson.dumps([
+        {"jsonrpc": "2.0", "result": {"ok": 1}, "id": 1},
+        {"jsonrpc": "2.0", "error": {"code": -32000, "message": "boom"}, "id": 2},
+        {"jsonrpc": "2.0", "result": {"ok": 3}, "id": 3},
+    ]))
+    client.client.post = AsyncMock(return_value=response)
+
+    with pytest.raises(RPCBatchError) as excinfo:
+        await client.call_batch([("a", None), ("b", None), ("c", None)])
+
+    results = excinfo.value.results
+    assert results[0] == {"ok": 1} and results[2] == {"ok": 3}
+    assert isinstance(results[1], RPCError) and results[1].message == "boom"
+    assert excinfo.value.errors == [results[1]] and excinfo.value.code == -32000
+    await client.client.aclose()
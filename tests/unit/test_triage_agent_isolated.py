@@ -1,89 +1,160 @@
 # tests/standalone/test_triage_agent_isolated.py
+"""
+Isolert test av TriageAgent.
+
+Under pytest kjøres agenten mot en mocket LLMGateway, så testene er hermetiske og
+raske. Kjøres filen direkte (`python tests/unit/test_triage_agent_isolated.py`)
+brukes den ekte gatewayen mot Gemini, som før.
+"""
 import asyncio
 import os
 import json
-from dotenv import load_dotenv
+import pytest
+from unittest.mock import AsyncMock
 
 # --- Importer nødvendige komponenter fra prosjektet ditt ---
-from src.tools.enhanced_llm_gateway import LLMGateway
+from src.tools.llm_gateway import LLMGateway
 from src.specialists.triage_agent import TriageAgent
-from src.models.procurement_models_refactored import TriageResult
+from src.models.procurement_models import TriageResult
+
+# --- Test-scenarioer ---
+
+# Scenario 1: Enkel, lav-verdi anskaffelse (forventer GRØNN)
+GREEN_DATA = {
+    "id": "test-green-001",
+    "name": "Kaffe og te til kontoret",
+    "value": 50000,
+    "description": "Årlig innkjøp av kaffe, te og melk.",
+    "category": "vare"
+}
+
+# Scenario 2: Høy-verdi IT-system (forventer RØD)
+RED_DATA = {
+    "id": "test-red-001",
+    "name": "Nytt HR-system med sensitive data",
+    "value": 2500000,
+    "description": "Implementering av skybasert HR-system for alle ansatte.",
+    "category": "it"
+}
+
+# Ferdigbygde LLM-svar per scenario, slått opp på anskaffelsesnavnet i prompten
+MOCK_TRIAGE_RESPONSES = {
+    GREEN_DATA["name"]: {
+        "color": "GRØNN",
+        "reasoning": "Lav verdi og standard varekjøp uten særlige risikoer.",
+        "confidence": 0.9,
+        "risk_factors": [],
+        "mitigation_measures": [],
+        "requires_special_attention": False,
+        "escalation_recommended": False
+    },
+    RED_DATA["name"]: {
+        "color": "RØD",
+        "reasoning": "Høy verdi og behandling av sensitive personopplysninger.",
+        "confidence": 0.85,
+        "risk_factors": ["Sensitive personopplysninger", "Skytjeneste"],
+        "mitigation_measures": ["Databehandleravtale", "ROS-analyse"],
+        "requires_special_attention": True,
+        "escalation_recommended": True
+    }
+}
+
+
+def _mock_generate_structured(prompt: str, **kwargs) -> dict:
+    """Returnerer det forhåndsbygde LLM-svaret for scenarioet som står i prompten."""
+    for name, response in MOCK_TRIAGE_RESPONSES.items():
+        if name in prompt:
+            return dict(response)
+    raise AssertionError("Ukjent scenario i triage-prompten")
+
+
+@pytest.fixture(scope="session")
+def triage_agent():
+    """TriageAgent mot en mocket LLMGateway, delt av hele test-økten."""
+    llm_gateway = AsyncMock(spec=LLMGateway)
+    llm_gateway.generate_structured.side_effect = _mock_generate_structured
+    return TriageAgent(llm_gateway)
 
 # --- Test-funksjonalitet ---
 
-async def run_agent_test(agent: TriageAgent, test_name: str, procurement_data: dict):
-    """Kjører en enkelt test mot agenten og printer resultatet."""
-    print(f"\n--- 🧪 Kjører test: {test_name} ---")
-    
+async def run_agent_test(agent: TriageAgent, test_name: str, procurement_data: dict, verbose: bool = False) -> TriageResult:
+    """
+    Kjører en enkelt test mot agenten og returnerer det validerte resultatet.
+    Med verbose=True (manuell kjøring) printes input og rått resultat som JSON;
+    under pytest holder assertion-meldingene.
+    """
+    if verbose:
+        print(f"\n--- 🧪 Kjører test: {test_name} ---")
+        print(f"Input til agent: {json.dumps(procurement_data, indent=2, ensure_ascii=False)}")
+
     # Agentens `execute`-metode forventer en 'procurement'-nøkkel i parameterne
     params = {"procurement": procurement_data}
-    
-    try:
-        print(f"Input til agent: {json.dumps(procurement_data, indent=2, ensure_ascii=False)}")
-        
-        # Kjør selve agenten
-        result_dict = await agent.execute(params)
-        
+
+    # Kjør selve agenten
+    result_dict = await agent.execute(params)
+
+    # Verifiser at resultatet samsvarer med Pydantic-modellen
+    result = TriageResult.model_validate(result_dict)
+
+    if verbose:
         print("\n✅ Agenten kjørte vellykket!")
         print("Rått resultat fra agent:")
         print(json.dumps(result_dict, indent=2, ensure_ascii=False))
-        
-        # Verifiser at resultatet samsvarer med Pydantic-modellen
-        try:
-            TriageResult.model_validate(result_dict)
-            print("\n✅ Pydantic-validering: Suksess! Resultatet følger TriageResult-modellen.")
-        except Exception as pydantic_error:
-            print(f"\n❌ Pydantic-validering: FEIL! {pydantic_error}")
+        print("\n✅ Pydantic-validering: Suksess! Resultatet følger TriageResult-modellen.")
+        print("-" * (len(test_name) + 20))
+    return result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "test_name, scenario, expected_color, expected_escalation",
+    [
+        ("GRØNN Scenario", GREEN_DATA, "GRØNN", False),
+        ("RØD Scenario", RED_DATA, "RØD", True),
+    ],
+    ids=["green", "red"]
+)
+async def test_triage_scenario(triage_agent, test_name, scenario, expected_color, expected_escalation):
+    result = await run_agent_test(triage_agent, test_name, scenario)
 
-    except Exception as e:
-        print(f"\n❌ Testen feilet med en exception: {e}")
-        
-    print("-" * (len(test_name) + 20))
+    assert result.color.value == expected_color
+    assert result.procurement_id == scenario["id"]
+    assert result.escalation_recommended is expected_escalation
 
 
 async def main():
-    """Hovedfunksjon for å sette opp og kjøre testene."""
+    """Kjører scenarioene mot den ekte LLM-gatewayen (manuell røyktest)."""
     print("=============================================")
     print("  Isolert test av TriageAgent 🕵️")
     print("=============================================")
-    
+
     # --- Oppsett ---
+    # .env leses bare ved manuell kjøring; pytest-stien bruker mocket gateway og trenger ingen nøkkel
+    from dotenv import load_dotenv
     load_dotenv()
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print("❌ Fant ikke GEMINI_API_KEY. Sjekk din .env-fil.")
         return
-        
+
     print("1. Setter opp LLM Gateway...")
     llm_gateway = LLMGateway()
-    
+
     print("2. Initialiserer TriageAgent...")
     triage_agent = TriageAgent(llm_gateway)
-    
-    # --- Test-scenarioer ---
-    
-    # Scenario 1: Enkel, lav-verdi anskaffelse (forventer GRØNN)
-    test_data_green = {
-        "id": "test-green-001",
-        "name": "Kaffe og te til kontoret",
-        "value": 50000,
-        "description": "Årlig innkjøp av kaffe, te og melk.",
-        "category": "vare"
-    }
 
-    # Scenario 2: Høy-verdi IT-system (forventer RØD)
-    test_data_red = {
-        "id": "test-red-001",
-        "name": "Nytt HR-system med sensitive data",
-        "value": 2500000,
-        "description": "Implementering av skybasert HR-system for alle ansatte.",
-        "category": "it"
-    }
-    
     # --- Kjøring ---
-    await run_agent_test(triage_agent, "GRØNN Scenario", test_data_green)
-    await run_agent_test(triage_agent, "RØD Scenario", test_data_red)
+    # Scenarioene er uavhengige, så LLM-kallene sendes samtidig
+    results = await asyncio.gather(
+        run_agent_test(triage_agent, "GRØNN Scenario", GREEN_DATA, verbose=True),
+        run_agent_test(triage_agent, "RØD Scenario", RED_DATA, verbose=True),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"\n❌ Testen feilet med en exception: {result}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    from src.tools.event_loop import run
+    run(main())
@@ -0,0 +1,45 @@
+# tests/unit/test_triage_document_generator.py
+"""
+Unit tests for TriageDocumentGenerator file handling.
+"""
+import shutil
+from pathlib import Path
+
+from src.tools.triage_document_generator import TriageDocumentGenerator
+
+GREEN_TRIAGE = {"color": "GRØNN", "reasoning": "Lav verdi", "confidence": 0.9}
+
+
+def test_generate_document_recreates_deleted_output_dir(tmp_path):
+    """Writes succeed even if the output directory is removed after __init__."""
+    output_dir = tmp_path / "triage"
+    generator = TriageDocumentGenerator(str(output_dir))
+    shutil.rmtree(output_dir)
+
+    filepath = generator.generate_document({"id": "abc"}, GREEN_TRIAGE)
+
+    assert Path(filepath).is_file()
+
+
+def test_relative_output_dir_follows_cwd(tmp_path, monkeypatch):
+    """A relative output_dir is created under the current cwd, also after a chdir."""
+    monkeypatch.chdir(tmp_path)
+    TriageDocumentGenerator("triage")
+
+    other = tmp_path / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    filepath = TriageDocumentGenerator("triage").generate_document({"id": "abc"}, GREEN_TRIAGE)
+
+    assert (other / filepath).is_file()
+
+
+def test_generate_documents_keeps_batch_filenames_unique(tmp_path):
+    """Batch items with the same or a missing id do not overwrite each other."""
+    generator = TriageDocumentGenerator(str(tmp_path))
+    batch = [({"id": "same"}, GREEN_TRIAGE), ({"id": "same"}, GREEN_TRIAGE), ({}, GREEN_TRIAGE), ({}, GREEN_TRIAGE)]
+
+    filepaths = generator.generate_documents(batch)
+
+    assert len(set(filepaths)) == len(batch)
+    assert all(Path(filepath).is_file() for filepath in filepaths)